@@ -42,6 +42,7 @@ from astrality import compiler, utils
 from astrality import config
 from astrality.context import Context
 from astrality import persistence
+from astrality import tracing
 from astrality.xdg import XDG
 
 Replacer = Callable[[str], str]
@@ -59,9 +60,13 @@ class Action(abc.ABC):
     :param context_store: A reference to the global context store.
     :param creation_store: ModuleCreatedFiles object which stores which files
         that are created by the different module actions.
+
+    :ivar bytes_written: Bytes written during the last execution.
+    :ivar files_touched: Files created or modified during the last execution.
     """
 
     directory: Path
+    identifier: str
     priority: int
     Options = Union[
         'CompileDict',
@@ -91,6 +96,13 @@ class Action(abc.ABC):
         self.creation_store = creation_store
         self._options = options
         self._replace = replacer
+        self.bytes_written = 0
+        self.files_touched = 0
+
+    @property
+    def module_name(self) -> str:
+        """Return name of module which the action belongs to."""
+        return self.creation_store.module
 
     def replace(self, string: str) -> str:
         """
@@ -181,9 +193,11 @@ class ImportContextAction(Action):
     See :class:`Action` for documentation for the other parameters.
     """
 
+    identifier = 'import_context'
     priority = 100
     context_store: compiler.Context
 
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> None:
         """
         Import context section(s) according to user configuration block.
@@ -221,6 +235,7 @@ class CompileAction(Action):
 
     _options: CompileDict
 
+    identifier = 'compile'
     priority = 400
 
     def __init__(self, *args, **kwargs) -> None:
@@ -229,6 +244,15 @@ class CompileAction(Action):
         self._performed_compilations: DefaultDict[Path, Set[Path]] = \
             defaultdict(set)
 
+        # Targets created by Astrality are deduplicated by content
+        self.implicit_target = False
+
+        # Callable moving a pre-rendered template to target, returning its
+        # MD5 hexdigest, or None if the template must be compiled
+        self.prerendered: Optional[Callable[[Path, Path], Optional[str]]] = \
+            None
+
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> Dict[Path, Path]:
         """
         Compile template source to target destination.
@@ -239,29 +263,13 @@ class CompileAction(Action):
         if self.null_object:
             # Null objects do nothing
             return {}
-        elif 'target' not in self._options:
-            # If no target is specified, we create a deterministic target.
-            template = self.option(key='content', path=True)
-            target = self.create_compilation_target(template=template)
-            self._options['target'] = str(target)
-
-        # These might either be file paths or directory paths
-        template_source = self.option(key='content', path=True)
-        target_source = self.option(key='target', path=True)
-        if not template_source.exists():
-            logger = logging.getLogger(__name__)
-            logger.error(
-                f'Could not compile template "{template_source}" '
-                f'to target "{target_source}". No such path!',
-            )
-            return {}
 
-        compile_pairs = utils.resolve_targets(
-            content=template_source,
-            target=target_source,
-            include=self.option(key='include', default=r'(.+)'),
-        )
+        compile_pairs = self.compile_pairs()
         permissions = self.option(key='permissions')
+        if not dry_run:
+            self.creation_store.backup_all(paths=compile_pairs.values())
+        store = persistence.CompilationStore() if self.implicit_target \
+            else None
 
         for content_file, target_file in compile_pairs.items():
             if dry_run:
@@ -272,24 +280,64 @@ class CompileAction(Action):
                     f'-> Target: "{target_file}"',
                 )
             else:
-                self.creation_store.backup(path=target_file)
-                compiler.compile_template(
-                    template=content_file,
-                    target=target_file,
-                    context=self.context_store,
-                    shell_command_working_directory=self.directory,
-                    permissions=permissions,
-                )
+                content_hash = None
+                if self.prerendered:
+                    content_hash = self.prerendered(content_file, target_file)
+                if not content_hash:
+                    content_hash = compiler.compile_template(
+                        template=content_file,
+                        target=target_file,
+                        context=self.context_store,
+                        shell_command_working_directory=self.directory,
+                        permissions=permissions,
+                        checksum=True,
+                    )
+                self.bytes_written += target_file.stat().st_size
+                self.files_touched += 1
+                if store:
+                    store.add(target=target_file, content_hash=content_hash)
                 self.creation_store.insert_creation(
                     content=content_file,
                     target=target_file,
                     method=persistence.CreationMethod.COMPILE,
+                    content_hash=content_hash,
                 )
 
             self._performed_compilations[content_file].add(target_file)
 
         return compile_pairs
 
+    def compile_pairs(self) -> Dict[Path, Path]:
+        """
+        Return templates to be compiled and their targets.
+
+        :return: Dictionary with template keys and target values. Empty if
+            the template does not exist.
+        """
+        if 'target' not in self._options:
+            # If no target is specified, we create a deterministic target.
+            template = self.option(key='content', path=True)
+            target = self.create_compilation_target(template=template)
+            self._options['target'] = str(target)
+            self.implicit_target = True
+
+        # These might either be file paths or directory paths
+        template_source = self.option(key='content', path=True)
+        target_source = self.option(key='target', path=True)
+        if not template_source.exists():
+            logger = logging.getLogger(__name__)
+            logger.error(
+                f'Could not compile template "{template_source}" '
+                f'to target "{target_source}". No such path!',
+            )
+            return {}
+
+        return utils.resolve_targets(
+            content=template_source,
+            target=target_source,
+            include=self.option(key='include', default=r'(.+)'),
+        )
+
     def performed_compilations(self) -> DefaultDict[Path, Set[Path]]:
         """
         Return dictionary containing all performed compilations.
@@ -304,6 +352,7 @@ class CompileAction(Action):
         Create compilation target for template with unspecified target.
 
         Compilation targets are stored in $XDG_DATA_HOME/astrality/compilations.
+        The compiled content is deduplicated by the CompilationStore.
         For details regarding the implementation see:
         https://www.peterbe.com/plog/best-hashing-function-in-python
 
@@ -354,6 +403,7 @@ class SymlinkDict(RequiredSymlinkDict, total=False):
 class SymlinkAction(Action):
     """Symlink files Action sub-class."""
 
+    identifier = 'symlink'
     priority = 200
 
     _options: SymlinkDict
@@ -364,6 +414,7 @@ class SymlinkAction(Action):
         self.symlinked_files: DefaultDict[Path, Set[Path]] = \
             defaultdict(set)
 
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> Dict[Path, Path]:
         """
         Symlink to `content` path from `target` path.
@@ -383,30 +434,60 @@ class SymlinkAction(Action):
             include=include,
         )
 
-        logger = logging.getLogger(__name__)
         for content, symlink in links.items():
             self.symlinked_files[content].add(symlink)
-            log_msg = f'[symlink] Content "{content}" -> Target: "{symlink}".'
 
-            if symlink.resolve() == content.resolve():
-                continue
+        plan = utils.plan_symlinks(links)
+        self.apply(plan=plan, dry_run=dry_run)
+        return links
 
-            if dry_run:
-                logger.info('SKIPPED: ' + log_msg)
-                continue
+    def apply(self, plan: utils.SymlinkPlan, dry_run: bool = False) -> None:
+        """
+        Create all symlinks which are not already correct.
 
-            logger.info(log_msg)
-            symlink.parent.mkdir(parents=True, exist_ok=True)
+        Existing files are backed up before being replaced, and all created
+        symlinks are persisted at once.
 
-            self.creation_store.backup(path=symlink)
-            symlink.symlink_to(content)
-            self.creation_store.insert_creation(
-                content=content,
-                target=symlink,
-                method=persistence.CreationMethod.SYMLINK,
+        :param plan: SymlinkPlan returned by :func:`utils.plan_symlinks`.
+        :param dry_run: If True, skip and log symlink creation(s).
+        """
+        logger = logging.getLogger(__name__)
+        pending = {**plan.create, **plan.replace}
+        if not pending:
+            return
+
+        if dry_run:
+            for content, symlink in pending.items():
+                logger.info(
+                    'SKIPPED: '
+                    f'[symlink] Content "{content}" -> Target: "{symlink}".',
+                )
+            return
+
+        # Backups are persisted before any symlink replaces them
+        self.creation_store.backup_all(paths=plan.replace.values())
+        for symlink in plan.replace.values():
+            if os.path.lexists(symlink):
+                # Outdated symlink previously created by Astrality
+                symlink.unlink()
+
+        for parent in {symlink.parent for symlink in plan.create.values()}:
+            parent.mkdir(parents=True, exist_ok=True)
+
+        for content, symlink in pending.items():
+            logger.info(
+                f'[symlink] Content "{content}" -> Target: "{symlink}".',
             )
+            symlink.symlink_to(content)
 
-        return links
+        self.files_touched += len(pending)
+        self.creation_store.insert_creations(
+            contents=list(pending.keys()),
+            targets=list(pending.values()),
+            method=persistence.CreationMethod.SYMLINK,
+            write=False,
+        )
+        self.creation_store.write()
 
 
 class RequiredCopyDict(TypedDict):
@@ -421,21 +502,34 @@ class CopyDict(RequiredCopyDict, total=False):
 
     include: str
     permissions: str
+    compare: str
 
 
 class CopyAction(Action):
-    """Copy files Action sub-class."""
+    """
+    Copy files Action sub-class.
+
+    :ivar bytes_copied: Number of bytes copied during last execution.
+    :ivar bytes_skipped: Number of bytes skipped during last execution, as the
+        target already was identical to the content.
+    """
 
+    identifier = 'copy'
     priority = 300
 
     _options: CopyDict
 
+    compare_methods = ('metadata', 'content', 'none')
+
     def __init__(self, *args, **kwargs) -> None:
         """Construct copy action object."""
         super().__init__(*args, **kwargs)
         self.copied_files: DefaultDict[Path, Set[Path]] = \
             defaultdict(set)
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
 
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> Dict[Path, Path]:
         """
         Copy from `content` path to `target` path.
@@ -450,13 +544,25 @@ class CopyAction(Action):
         target = self.option(key='target', path=True)
         include = self.option(key='include', default=r'(.+)')
         permissions = self.option(key='permissions', default=None)
+        compare = self.option(key='compare', default='metadata')
+
+        logger = logging.getLogger(__name__)
+        if compare not in self.compare_methods:
+            logger.error(
+                f'Invalid copy compare parameter: "{compare}". '
+                f'Should be one of {self.compare_methods}! '
+                'Using "none" instead.',
+            )
+            compare = 'none'
 
         copies = utils.resolve_targets(
             content=content,
             target=target,
             include=include,
         )
-        logger = logging.getLogger(__name__)
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+        pending: Dict[Path, Path] = {}
         for content, copy in copies.items():
             self.copied_files[content].add(copy)
 
@@ -465,19 +571,45 @@ class CopyAction(Action):
                 logger.info('SKIPPED: ' + log_msg)
                 continue
 
+            if utils.identical_files(
+                source=content,
+                destination=copy,
+                compare=compare,
+            ):
+                logger.debug(f'[copy] Target "{copy}" is up to date.')
+                self.bytes_skipped += copy.stat().st_size
+                continue
+
             logger.info(log_msg)
-            copy.parent.mkdir(parents=True, exist_ok=True)
+            pending[content] = copy
 
-            self.creation_store.backup(path=copy)
+        # Existing files are backed up and persisted before any copy replaces
+        # them, while copies are persisted all at once afterwards
+        self.creation_store.backup_all(paths=pending.values())
+        for content, copy in pending.items():
+            copy.parent.mkdir(parents=True, exist_ok=True)
             utils.copy(
                 source=content,
                 destination=copy,
                 follow_symlinks=False,
             )
-            self.creation_store.insert_creation(
-                content=content,
-                target=copy,
+            self.bytes_copied += copy.lstat().st_size
+            self.files_touched += 1
+
+        if pending:
+            self.creation_store.insert_creations(
+                contents=list(pending.keys()),
+                targets=list(pending.values()),
                 method=persistence.CreationMethod.COPY,
+                write=False,
+            )
+            self.creation_store.write()
+
+        self.bytes_written = self.bytes_copied
+        if copies and not dry_run:
+            logger.info(
+                f'[copy] Copied {self.bytes_copied} bytes, skipped '
+                f'{self.bytes_skipped} bytes of identical content.',
             )
 
         if permissions and not dry_run:
@@ -523,6 +655,7 @@ class StowAction(Action):
     non_templates_action: Union[CopyAction, SymlinkAction]
     _options: StowDict
 
+    identifier = 'stow'
     priority = 500
 
     def __init__(self, *args, **kwargs) -> None:
@@ -591,6 +724,7 @@ class StowAction(Action):
             creation_store=self.creation_store,
         )
 
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> Dict[Path, Path]:
         """
         Stow directory source to target destination.
@@ -604,12 +738,17 @@ class StowAction(Action):
             return {}
 
         if self.ignore_non_templates:
-            return self.compile_action.execute(dry_run=dry_run)
+            compilations = self.compile_action.execute(dry_run=dry_run)
         else:
             copies_or_links = self.non_templates_action.execute(dry_run=dry_run)
             compilations = self.compile_action.execute(dry_run=dry_run)
             compilations.update(copies_or_links)
-            return compilations
+            self.bytes_written += self.non_templates_action.bytes_written
+            self.files_touched += self.non_templates_action.files_touched
+
+        self.bytes_written += self.compile_action.bytes_written
+        self.files_touched += self.compile_action.files_touched
+        return compilations
 
     def managed_files(self) -> Dict[Path, Set[Path]]:
         """
@@ -656,8 +795,10 @@ class RunAction(Action):
 
     _options: RunDict
 
+    identifier = 'run'
     priority = 600
 
+    @tracing.traced
     def execute(  # type: ignore
         self,
         default_timeout: Union[int, float] = 0,
@@ -743,8 +884,10 @@ class TriggerAction(Action):
 
     _options: TriggerDict
 
+    identifier = 'trigger'
     priority = 0
 
+    @tracing.traced
     def execute(self, dry_run: bool = False) -> Optional[Trigger]:
         """
         Return trigger instruction.
@@ -794,6 +937,9 @@ class ActionBlock:
     """
     Class representing a module action block, e.g. 'on_startup'.
 
+    Action objects are constructed on first access, such that action blocks
+    which are never executed are cheap to instantiate.
+
     :param action_block: Dictionary containing all actions to be performed.
     :param directory: The directory used as anchor for relative paths. This
         must be an absolute path.
@@ -842,27 +988,51 @@ class ActionBlock:
         self.action_block = action_block
         self.module_name = module_name
         self.run_timeout = global_modules_config.run_timeout
+        self.constructed = False
 
-        creation_store = global_modules_config.created_files.wrapper_for(
+        self._directory = directory
+        self._replacer = replacer
+        self._context_store = context_store
+        self._creation_store = global_modules_config.created_files.wrapper_for(
             module=self.module_name,
         )
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Construct action objects when action lists are first accessed.
+
+        :param name: Attribute name, for example '_compile_actions'.
+        :return: List of action objects of the given type.
+        """
+        if name.startswith('_') and name.endswith('_actions') \
+                and name[1:-len('_actions')] in self.action_types \
+                and not self.__dict__.get('constructed', True):
+            self.construct_actions()
+            return getattr(self, name)
+
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'",
+        )
+
+    def construct_actions(self) -> None:
+        """Create and persist lists of action objects for each action type."""
         for identifier, action_type in self.action_types.items():
-            # Create and persist a list of all ImportContextAction objects
             setattr(
                 self,
                 f'_{identifier}_actions',
                 [
                     action_type(
                         options=action_options,
-                        directory=directory,
-                        replacer=replacer,
-                        context_store=context_store,
-                        creation_store=creation_store,
+                        directory=self._directory,
+                        replacer=self._replacer,
+                        context_store=self._context_store,
+                        creation_store=self._creation_store,
                     )
                     for action_options
                     in self.action_options(identifier=identifier)
                 ],
             )
+        self.constructed = True
 
     def action_options(self, identifier: str) -> List[Action.Options]:
         """
@@ -875,31 +1045,37 @@ class ActionBlock:
             self.action_block.get(identifier, {}),  # type: ignore
         )
 
+    @tracing.traced_block
     def import_context(self, dry_run: bool = False) -> None:
         """Import context into global context store."""
         for import_context_action in self._import_context_actions:
             import_context_action.execute(dry_run=dry_run)
 
+    @tracing.traced_block
     def symlink(self, dry_run: bool = False) -> None:
         """Symlink files."""
         for symlink_action in self._symlink_actions:
             symlink_action.execute(dry_run=dry_run)
 
+    @tracing.traced_block
     def copy(self, dry_run: bool = False) -> None:
         """Copy files."""
         for copy_action in self._copy_actions:
             copy_action.execute(dry_run=dry_run)
 
+    @tracing.traced_block
     def compile(self, dry_run: bool = False) -> None:
         """Compile templates."""
         for compile_action in self._compile_actions:
             compile_action.execute(dry_run=dry_run)
 
+    @tracing.traced_block
     def stow(self, dry_run: bool = False) -> None:
         """Stow directory contents."""
         for stow_action in self._stow_actions:
             stow_action.execute(dry_run=dry_run)
 
+    @tracing.traced_block
     def run(
         self,
         default_timeout: Optional[Union[int, float]] = None,
@@ -937,6 +1113,7 @@ class ActionBlock:
             if not trigger_action.null_object
         )
 
+    @tracing.traced_block
     def execute(
         self,
         default_timeout: Union[int, float],
@@ -961,6 +1138,10 @@ class ActionBlock:
         :return: Dictionary with template keys and target path set.
         """
         all_compilations: DefaultDict[Path, Set[Path]] = defaultdict(set)
+        if not self.constructed:
+            # Actions that have never been constructed can not have compiled
+            return all_compilations
+
         for compile_action in self._compile_actions:
             compilations = compile_action.performed_compilations()
             for template, targets in compilations.items():
@@ -980,6 +1161,9 @@ class SetupActionBlock(ActionBlock):
         :return: List of action options of that type.
         """
         action_options = super().action_options(identifier)
+        if not any(action_options):
+            # Avoid reading setup.yml for modules without setup actions
+            return []
 
         if not hasattr(self, 'executed_setup_actions'):
             self.executed_setup_actions = persistence.ExecutedActions(
@@ -7,13 +7,16 @@ import os
 import signal
 import sys
 import time
-from typing import List
+from pathlib import Path
+from typing import List, Optional
 
 import psutil
 
-from astrality import utils
+from astrality import tracing, utils
 from astrality.config import user_configuration
+from astrality.control import ControlServer, request_handoff
 from astrality.module import ModuleManager
+from astrality.profiler import profiler
 from astrality.xdg import XDG
 
 
@@ -25,6 +28,9 @@ def main(
     logging_level: str = 'INFO',
     dry_run: bool = False,
     test: bool = False,
+    profile: Optional[Path] = None,
+    cprofile: Optional[Path] = None,
+    metrics_file: Optional[Path] = None,
 ):
     """
     Run the main process for Astrality.
@@ -33,7 +39,16 @@ def main(
     :param logging_level: Loging level.
     :param dry_run: If file system actions should be printed and skipped.
     :param test: If True, return after one iteration loop.
+    :param profile: If given, write JSON profiling report of startup to path.
+    :param cprofile: If given, write cProfile statistics of startup to path.
+    :param metrics_file: If given, append JSON lines of all executed actions.
     """
+    if profile or cprofile:
+        profiler.enable(cprofile=bool(cprofile))
+
+    if metrics_file:
+        tracing.hooks.register(tracing.JSONLinesExporter(path=metrics_file))
+
     if 'ASTRALITY_LOGGING_LEVEL' in os.environ:
         # Override logging level if env variable is set
         logging_level = os.environ['ASTRALITY_LOGGING_LEVEL']
@@ -43,9 +58,8 @@ def main(
         level=logging.getLevelName(logging_level),  # type: ignore
     )
 
-    if not modules and not dry_run and not test:
-        # Quit old astrality instances
-        kill_old_astrality_processes()
+    # Old astrality instances are quit after the configuration is loaded
+    replace_old_process = not modules and not dry_run and not test
 
     # How to quit this process
     def exit_handler(signal=None, frame=None) -> None:
@@ -62,6 +76,13 @@ def main(
         logger.critical('Astrality was interrupted')
         logger.info('Cleaning up temporary files before exiting...')
 
+        try:
+            # Stop accepting control commands and run module exit handlers
+            control_server.stop()
+        except NameError:
+            # The control_server instance has not been assigned yet.
+            pass
+
         try:
             # Run all the module exit handlers
             module_manager.exit()
@@ -89,12 +110,13 @@ def main(
         signal.signal(signal.SIGTERM, exit_handler)
 
     try:
-        (
-            config,
-            module_configs,
-            global_context,
-            directory,
-        ) = user_configuration()
+        with profiler.measure('phases', 'user_configuration'):
+            (
+                config,
+                module_configs,
+                global_context,
+                directory,
+            ) = user_configuration()
 
         if modules:
             config['modules']['enabled_modules'] = [
@@ -106,14 +128,40 @@ def main(
         # Delay further actions if configuration says so
         time.sleep(config['astrality']['startup_delay'])
 
-        module_manager = ModuleManager(
-            config=config,
-            modules=module_configs,
-            context=global_context,
-            directory=directory,
-            dry_run=dry_run,
-        )
+        with profiler.measure('phases', 'module_manager'):
+            module_manager = ModuleManager(
+                config=config,
+                modules=module_configs,
+                context=global_context,
+                directory=directory,
+                dry_run=dry_run,
+                metrics=bool(profile or cprofile or metrics_file),
+            )
+
+        if replace_old_process:
+            # Take over unchanged modules from the old astrality instance,
+            # and quit it if it could not hand them off
+            if config['astrality']['control_socket']:
+                with profiler.measure('phases', 'handoff'):
+                    request_handoff(module_manager=module_manager)
+            kill_old_astrality_processes()
+
         module_manager.finish_tasks()
+        module_manager.log_startup_timings()
+
+        # Listen for commands sent by `astrality control`
+        control_server = ControlServer(module_manager=module_manager)
+        if config['astrality']['control_socket'] and not test \
+                and not dry_run:
+            control_server.start()
+
+        if profiler.enabled:
+            profiler.disable()
+            profiler.dump(
+                report=profile,
+                cprofile=cprofile,
+                action_metrics=module_manager.enable_metrics().summary(),
+            )
 
         while True:
             if module_manager.has_unfinished_tasks():
@@ -130,6 +178,7 @@ def main(
                     'No more tasks to be performed. '
                     'Executing on_exit blocks.',
                 )
+                control_server.stop()
                 module_manager.exit()
                 return
             else:
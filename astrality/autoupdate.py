@@ -0,0 +1,146 @@
+"""
+Module for updating GitHub modules in the background.
+
+GitHub module sources with `autoupdate: true` are pulled at most once every
+`autoupdate_interval` seconds, as recorded in
+$XDG_DATA_HOME/astrality/autoupdates.yml. This interval is respected across
+restarts of Astrality. When new commits are pulled, a callback is invoked with
+the updated module source, allowing its modules to be replaced while running.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Union
+
+from astrality.config import EnabledModules, GithubModuleSource
+from astrality.persistence import RepositoryUpdates
+
+
+class Autoupdater:
+    """
+    Background job which periodically pulls GitHub module sources.
+
+    :param enabled_modules: Enabled modules containing GitHub module sources.
+    :param interval: Minimum number of seconds between pulls of a repository.
+    :param on_update: Callable invoked with each module source where new
+        commits have been pulled.
+    """
+
+    def __init__(
+        self,
+        enabled_modules: EnabledModules,
+        interval: Union[int, float],
+        on_update: Callable[[GithubModuleSource], None],
+    ) -> None:
+        """Construct stopped autoupdater."""
+        self.enabled_modules = enabled_modules
+        self.interval = interval
+        self.on_update = on_update
+        self.repository_updates = RepositoryUpdates()
+        self.sources = [
+            source
+            for source
+            in enabled_modules.github_sources()
+            if source.autoupdate
+        ]
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def repository(source: GithubModuleSource) -> str:
+        """Return unique string id of the repository of source."""
+        return f'{source.github_user}/{source.github_repo}'
+
+    def due_sources(self) -> List[GithubModuleSource]:
+        """Return sources which have not been updated within the interval."""
+        now = time.time()
+        return [
+            source
+            for source
+            in self.sources
+            if now - self.repository_updates.last_update(
+                self.repository(source),
+            ) >= self.interval
+        ]
+
+    def seconds_until_due(self) -> float:
+        """Return seconds until the next source should be updated."""
+        if not self.sources:
+            return float('inf')
+
+        now = time.time()
+        return max(
+            0.0,
+            min(
+                self.repository_updates.last_update(self.repository(source))
+                + self.interval
+                - now
+                for source
+                in self.sources
+            ),
+        )
+
+    def update(self) -> List[GithubModuleSource]:
+        """
+        Pull all due sources, and invoke callback for updated sources.
+
+        :return: Sources where new commits have been pulled.
+        """
+        due_sources = self.due_sources()
+        if not due_sources:
+            return []
+
+        updated = self.enabled_modules.update_github_sources(
+            sources=due_sources,
+        )
+
+        now = time.time()
+        for source in due_sources:
+            self.repository_updates.record(
+                repository=self.repository(source),
+                timestamp=now,
+            )
+
+        logger = logging.getLogger(__name__)
+        for source in updated:
+            logger.info(
+                f'[autoupdate] New commits in "{self.repository(source)}".',
+            )
+            try:
+                self.on_update(source)
+            except Exception:
+                logger.exception(
+                    '[autoupdate] Could not reload modules from '
+                    f'"{self.repository(source)}".',
+                )
+
+        return updated
+
+    def run(self) -> None:
+        """Update due sources until stopped."""
+        while not self._stopped.is_set():
+            self.update()
+            self._stopped.wait(timeout=max(
+                1.0,
+                min(self.seconds_until_due(), self.interval),
+            ))
+
+    def start(self) -> None:
+        """Start updating sources in a background thread."""
+        if not self.sources or self._thread:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self.run,
+            name='astrality-autoupdate',
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background updates."""
+        self._stopped.set()
+        self._thread = None
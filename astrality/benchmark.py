@@ -0,0 +1,510 @@
+"""
+Module for benchmarking Astrality with synthetic configurations.
+
+A configuration directory with N modules, each compiling M templates which
+refer to K context sections, is generated in a temporary directory. The
+benchmarks are run against this directory with $ASTRALITY_CONFIG_HOME and
+$XDG_DATA_HOME pointing into the same temporary directory, so the user's own
+configuration and data are never touched, and no network access is needed.
+
+Results can be stored as JSON and compared against earlier results in order
+to detect performance regressions:
+
+$ python -m astrality.benchmark --output new.json --compare old.json
+
+The time spent importing the modules needed by short maintenance commands,
+such as `astrality --cleanup`, is measured with `python -X importtime`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from astrality import utils
+from astrality.config import user_configuration
+from astrality.context import Context
+from astrality.module import ModuleManager
+from astrality.persistence import CreatedFiles, CreationMethod
+
+Statistics = Dict[str, float]
+Results = Dict[str, Statistics]
+
+# Setup function returning the function to be timed and a teardown function
+Setup = Callable[[Path], Tuple[Callable[[], Any], Callable[[], None]]]
+
+# Modules imported by maintenance commands, such as --cleanup
+MAINTENANCE_MODULES = ('astrality.config', 'astrality.persistence')
+
+# Dependencies which maintenance commands should not import
+LAZY_DEPENDENCIES = (
+    'astral',
+    'distutils',
+    'jinja2',
+    'psutil',
+    'pytz',
+    'watchdog',
+)
+
+# Seconds maintenance commands may spend importing Astrality modules
+MAINTENANCE_IMPORT_BUDGET = 0.15
+
+
+class ImportTime(NamedTuple):
+    """Import time of a module reported by `python -X importtime`."""
+
+    module: str
+    depth: int
+    cumulative: float
+
+
+def import_times(statement: str) -> List[ImportTime]:
+    """
+    Return import times of all modules imported by statement.
+
+    The statement is executed in a new interpreter, such that no modules have
+    been imported beforehand.
+
+    :param statement: Python statement, for example 'import astrality.utils'.
+    :return: List of import times in seconds, in the order reported by the
+        interpreter. Modules imported by other modules have depth > 0.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+
+        module = name.strip()
+        times.append(ImportTime(
+            module=module,
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            cumulative=int(cumulative) / 1e6,
+        ))
+
+    return times
+
+
+def synthesize_configuration(
+    directory: Path,
+    modules: int,
+    templates: int,
+    sections: int,
+) -> Path:
+    """
+    Create configuration directory with synthetic modules.
+
+    Each module compiles its own directory of templates, and each template
+    refers to an integer index of every context section.
+
+    :param directory: Directory to create configuration in.
+    :param modules: Number of modules.
+    :param templates: Number of templates per module.
+    :param sections: Number of context sections.
+    :return: Path to configuration directory.
+    """
+    config_directory = directory / 'config'
+    config_directory.mkdir(parents=True, exist_ok=True)
+
+    utils.dump_yaml(
+        path=config_directory / 'astrality.yml',
+        data={
+            'astrality': {'hot_reload_config': False},
+            'modules': {
+                'reprocess_modified_files': True,
+                'enabled_modules': [{'name': '*'}],
+            },
+        },
+    )
+    utils.dump_yaml(
+        path=config_directory / 'context.yml',
+        data={
+            f'section{section}': {
+                index: f'value{section}-{index}'
+                for index
+                in range(1, 5)
+            }
+            for section
+            in range(sections)
+        },
+    )
+
+    template_content = '\n'.join(
+        f'{{{{ section{section}.{section % 8 + 1} }}}}'
+        for section
+        in range(sections)
+    ) + '\n'
+    module_definitions = {}
+    for module in range(modules):
+        templates_directory = config_directory / 'templates' / f'module{module}'
+        templates_directory.mkdir(parents=True, exist_ok=True)
+        for template in range(templates):
+            (templates_directory / f'template{template}').write_text(
+                template_content,
+            )
+
+        module_definitions[f'module{module}'] = {
+            'on_startup': {
+                'compile': {
+                    'content': f'templates/module{module}',
+                    'target': str(directory / 'targets' / f'module{module}'),
+                },
+            },
+        }
+
+    utils.dump_yaml(
+        path=config_directory / 'modules.yml',
+        data=module_definitions,
+    )
+    return config_directory
+
+
+@contextmanager
+def isolated_environment(directory: Path) -> Iterator[None]:
+    """
+    Point $ASTRALITY_CONFIG_HOME and $XDG_DATA_HOME into directory.
+
+    :param directory: Directory containing the synthesized configuration.
+    """
+    environment = {
+        'ASTRALITY_CONFIG_HOME': str(directory / 'config'),
+        'XDG_DATA_HOME': str(directory / 'data'),
+    }
+    original = {key: os.environ.get(key) for key in environment}
+    os.environ.update(environment)
+    try:
+        yield
+    finally:
+        for key, value in original.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def module_manager(config_directory: Path) -> ModuleManager:
+    """Return module manager for configuration directory."""
+    config, modules, context, directory = user_configuration(
+        config_directory=config_directory,
+    )
+    return ModuleManager(
+        config=config,
+        modules=modules,
+        context=context,
+        directory=directory,
+    )
+
+
+def setup_user_configuration(directory: Path):
+    """Benchmark compilation of configuration files."""
+    def run():
+        return user_configuration(config_directory=directory / 'config')
+
+    return run, lambda: None
+
+
+def setup_module_manager(directory: Path):
+    """Benchmark construction of the module manager."""
+    config, modules, context, config_directory = user_configuration(
+        config_directory=directory / 'config',
+    )
+
+    def run():
+        return ModuleManager(
+            config=config,
+            modules=modules,
+            context=Context(context),
+            directory=config_directory,
+        )
+
+    return run, lambda: None
+
+
+def setup_finish_tasks(directory: Path):
+    """Benchmark startup of all modules, compiling all templates."""
+    manager = module_manager(config_directory=directory / 'config')
+    return manager.finish_tasks, manager.exit
+
+
+def setup_file_system_modified(directory: Path):
+    """Benchmark recompilation of a modified template."""
+    manager = module_manager(config_directory=directory / 'config')
+    manager.finish_tasks()
+    manager.directory_watcher.stop()
+    template = directory / 'config' / 'templates' / 'module0' / 'template0'
+
+    def run():
+        manager.file_system_modified(template)
+
+    return run, manager.exit
+
+
+def setup_resolve_targets(directory: Path):
+    """Benchmark resolving compilation targets of all templates."""
+    def run():
+        return utils.resolve_targets(
+            content=directory / 'config' / 'templates',
+            target=directory / 'targets',
+            include=r'(.+)',
+        )
+
+    return run, lambda: None
+
+
+def setup_maintenance_imports(directory: Path):
+    """Benchmark importing the modules needed by maintenance commands."""
+    statement = 'import ' + ', '.join(MAINTENANCE_MODULES)
+
+    def run():
+        return import_times(statement)
+
+    return run, lambda: None
+
+
+def setup_created_files(directory: Path):
+    """Benchmark persisting and querying created files."""
+    targets_directory = directory / 'created'
+    targets_directory.mkdir(exist_ok=True)
+    targets = []
+    for number in range(100):
+        target = targets_directory / f'target{number}'
+        target.write_text(str(number))
+        targets.append(target)
+
+    def run():
+        created_files = CreatedFiles()
+        created_files.insert(
+            module='benchmark',
+            creation_method=CreationMethod.COMPILE,
+            contents=targets,
+            targets=targets,
+            write=False,
+        )
+        created_files.write()
+        created_files.by(module='benchmark')
+        created_files.cleanup(module='benchmark', dry_run=True)
+
+    def teardown():
+        CreatedFiles().cleanup(module='benchmark')
+
+    return run, teardown
+
+
+BENCHMARKS: Dict[str, Setup] = {
+    'user_configuration': setup_user_configuration,
+    'ModuleManager.__init__': setup_module_manager,
+    'ModuleManager.finish_tasks': setup_finish_tasks,
+    'ModuleManager.file_system_modified': setup_file_system_modified,
+    'resolve_targets': setup_resolve_targets,
+    'maintenance imports': setup_maintenance_imports,
+    'CreatedFiles': setup_created_files,
+}
+
+
+def summarize(durations: List[float]) -> Statistics:
+    """Return statistics of benchmark durations in seconds."""
+    return {
+        'repeat': len(durations),
+        'min': min(durations),
+        'median': statistics.median(durations),
+        'mean': statistics.mean(durations),
+        'max': max(durations),
+    }
+
+
+def run_benchmarks(
+    modules: int = 20,
+    templates: int = 10,
+    sections: int = 10,
+    repeat: int = 5,
+    names: Optional[List[str]] = None,
+) -> Results:
+    """
+    Run benchmarks against a synthetic configuration.
+
+    Each repetition is run against a freshly synthesized configuration and an
+    empty data directory, so all repetitions measure a cold start.
+
+    :param modules: Number of modules.
+    :param templates: Number of templates per module.
+    :param sections: Number of context sections.
+    :param repeat: Number of times to run each benchmark.
+    :param names: Names of benchmarks to run. All are run if not given.
+    :return: Dictionary with statistics keyed by benchmark name.
+    """
+    results: Results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+
+        durations = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as temporary_directory:
+                directory = Path(temporary_directory)
+                synthesize_configuration(
+                    directory=directory,
+                    modules=modules,
+                    templates=templates,
+                    sections=sections,
+                )
+                with isolated_environment(directory):
+                    function, teardown = setup(directory)
+                    start = time.perf_counter()
+                    function()
+                    durations.append(time.perf_counter() - start)
+                    teardown()
+
+        results[name] = summarize(durations)
+
+    return results
+
+
+def save_results(
+    results: Results,
+    path: Path,
+    parameters: Dict[str, int],
+) -> None:
+    """
+    Write benchmark results to JSON file.
+
+    :param results: Results returned by :func:`run_benchmarks`.
+    :param path: Path to JSON file.
+    :param parameters: Size parameters of the synthetic configuration.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(
+        {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'parameters': parameters,
+            'results': results,
+        },
+        indent=2,
+        sort_keys=True,
+    ))
+
+
+def compare_results(
+    baseline: Results,
+    results: Results,
+    tolerance: float = 0.2,
+) -> Dict[str, float]:
+    """
+    Return benchmarks which have regressed compared to baseline.
+
+    Median durations are compared, since they are least affected by noise.
+
+    :param baseline: Earlier results.
+    :param results: New results.
+    :param tolerance: Allowed relative slowdown before regarding a benchmark
+        as regressed.
+    :return: Dictionary with the ratio between new and baseline median,
+        keyed by regressed benchmark name.
+    """
+    regressions = {}
+    for name, statistics_ in results.items():
+        if name not in baseline or not baseline[name]['median']:
+            continue
+
+        ratio = statistics_['median'] / baseline[name]['median']
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    """Run benchmarks from the command line, returning the exit code."""
+    parser = argparse.ArgumentParser(
+        prog='python -m astrality.benchmark',
+        description='Benchmark Astrality with a synthetic configuration.',
+    )
+    parser.add_argument('--modules', type=int, default=20)
+    parser.add_argument('--templates', type=int, default=10)
+    parser.add_argument('--sections', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--benchmark',
+        help='Only run specific benchmark.',
+        action='append',
+        choices=BENCHMARKS.keys(),
+    )
+    parser.add_argument(
+        '--output',
+        help='Write results to JSON file.',
+        type=Path,
+    )
+    parser.add_argument(
+        '--compare',
+        help='Compare with results in JSON file, failing on regressions.',
+        type=Path,
+    )
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(arguments)
+
+    parameters = {
+        'modules': args.modules,
+        'templates': args.templates,
+        'sections': args.sections,
+    }
+    results = run_benchmarks(
+        repeat=args.repeat,
+        names=args.benchmark,
+        **parameters,
+    )
+    for name, statistics_ in results.items():
+        print(
+            f'{name:<40} median {statistics_["median"] * 1000:9.2f} ms '
+            f'min {statistics_["min"] * 1000:9.2f} ms',
+        )
+
+    if args.output:
+        save_results(results=results, path=args.output, parameters=parameters)
+
+    if not args.compare:
+        return 0
+
+    baseline = json.loads(args.compare.read_text())
+    if baseline.get('parameters') != parameters:
+        print('Warning: Baseline was run with different parameters.')
+
+    regressions = compare_results(
+        baseline=baseline['results'],
+        results=results,
+        tolerance=args.tolerance,
+    )
+    for name, ratio in regressions.items():
+        print(f'Regression: {name} is {ratio:.2f} times slower.')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Module for caching compiled and parsed configuration files.
+
+Configuration files are Jinja2 templates which are compiled and then parsed
+as YAML. The result only depends on the template source and the context used
+for compilation, as long as the template does not use environment variables,
+shell filters, or other templates. Such deterministic results are stored in a
+pickle file in $XDG_DATA_HOME/astrality, keyed by the hashes of both, so warm
+starts skip both Jinja2 and YAML.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from astrality.xdg import XDG
+
+
+class CompiledYAMLCache:
+    """
+    Persisted cache of compiled YAML templates.
+
+    Only the newest result of each template is kept.
+
+    :param path: Path to pickle file used for persisting cached results.
+    """
+
+    _entries: Dict[str, Tuple[str, bytes]]
+
+    def __init__(self, path: Path) -> None:
+        """Construct cache persisted to path."""
+        self.path = path
+
+    @property
+    def entries(self) -> Dict[str, Tuple[str, bytes]]:
+        """Return cached (key, pickled result) tuples, keyed by template."""
+        if hasattr(self, '_entries'):
+            return self._entries
+
+        try:
+            with open(self.path, 'rb') as cache_file:
+                self._entries = pickle.load(cache_file)
+            assert isinstance(self._entries, dict)
+        except Exception:
+            self._entries = {}
+
+        return self._entries
+
+    @staticmethod
+    def key(source: bytes, context: Any) -> Optional[str]:
+        """
+        Return cache key for template source compiled with context.
+
+        :param source: Template source.
+        :param context: Context used for compiling template.
+        :return: String key, or None if context can not be hashed.
+        """
+        try:
+            pickled_context = pickle.dumps(
+                context,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception:
+            return None
+
+        return hashlib.md5(source).hexdigest() \
+            + hashlib.md5(pickled_context).hexdigest()
+
+    def get(self, template: Path, key: str) -> Any:
+        """
+        Return cached result of compiled template.
+
+        A new copy is returned for each lookup, which the caller is free to
+        modify.
+
+        :param template: Path to compiled template.
+        :param key: Cache key returned by CompiledYAMLCache.key().
+        :return: Parsed YAML data.
+        :raises KeyError: If there is no cached result for key.
+        """
+        cached_key, data = self.entries[str(template)]
+        if cached_key != key:
+            raise KeyError(key)
+
+        return pickle.loads(data)
+
+    def set(self, template: Path, key: str, data: Any) -> None:
+        """
+        Insert result of compiled template into cache, and persist it.
+
+        :param template: Path to compiled template.
+        :param key: Cache key returned by CompiledYAMLCache.key().
+        :param data: Parsed YAML data.
+        """
+        self.entries[str(template)] = (
+            key,
+            pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self.write()
+
+    def write(self) -> None:
+        """Atomically write cache to disk."""
+        temporary_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with open(temporary_path, 'wb') as cache_file:
+                pickle.dump(
+                    self.entries,
+                    cache_file,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(temporary_path, self.path)
+        except OSError as error:  # pragma: no cover
+            logger = logging.getLogger(__name__)
+            logger.warning(
+                f'Could not write configuration cache "{self.path}": {error}',
+            )
+
+
+_caches: Dict[Path, CompiledYAMLCache] = {}
+
+
+def compiled_yaml_cache() -> CompiledYAMLCache:
+    """Return application wide cache of compiled YAML templates."""
+    path = XDG().data_home / 'compiled_configuration.pickle'
+    if path not in _caches:
+        _caches[path] = CompiledYAMLCache(path=path)
+    return _caches[path]
@@ -1,8 +1,10 @@
 """Module for compilation of templates."""
 
+import hashlib
 import logging
 import os
 import shutil
+import tempfile
 from functools import partial
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -10,12 +12,16 @@ from typing import Any, Dict, Optional
 from jinja2 import (
     Environment,
     FileSystemLoader,
+    Template,
+    TemplateSyntaxError,
     Undefined,
     make_logging_undefined,
+    nodes,
 )
 
 from astrality import utils
 from astrality.context import Context
+from astrality.profiler import profiler
 
 ApplicationConfig = Dict[str, Dict[str, Any]]
 logger = logging.getLogger(__name__)
@@ -66,6 +72,39 @@ def finalize_variable_expression(result: str) -> str:
         return result
 
 
+def is_deterministic(source: str) -> bool:
+    """
+    Return True if template output only depends on the context it is given.
+
+    Templates which use the `env` global, the `shell` filter, or include other
+    templates might render differently with identical contexts.
+
+    :param source: Template source string.
+    :return: False if the template might have external dependencies.
+    """
+    try:
+        ast = Environment().parse(source)
+    except TemplateSyntaxError:
+        return False
+
+    if any(ast.find_all((
+        nodes.Include,
+        nodes.Extends,
+        nodes.Import,
+        nodes.FromImport,
+    ))):
+        return False
+
+    if any(name.name == 'env' for name in ast.find_all(nodes.Name)):
+        return False
+
+    return not any(
+        template_filter.name == 'shell'
+        for template_filter
+        in ast.find_all(nodes.Filter)
+    )
+
+
 def compile_template_to_string(
     template: Path,
     context: Context,
@@ -77,6 +116,25 @@ def compile_template_to_string(
     Context placeholder replacements given by `context`, and shell filters
     run with working directory ``shell_command_working_directory``.
     """
+    jinja_template = load_template(
+        template=template,
+        shell_command_working_directory=shell_command_working_directory,
+    )
+    return jinja_template.render(context)
+
+
+def load_template(
+    template: Path,
+    shell_command_working_directory: Optional[Path] = None,
+) -> Template:
+    """
+    Return Jinja2 template object for template file.
+
+    :param template: Path to template file.
+    :param shell_command_working_directory: Working directory of shell
+        filters. Defaults to the directory of the template.
+    :return: Jinja2 Template object.
+    """
     if not shell_command_working_directory:
         shell_command_working_directory = template.parent
 
@@ -84,9 +142,66 @@ def compile_template_to_string(
         templates_folder=template.parent,
         shell_command_working_directory=shell_command_working_directory,
     )
-    jinja_template = env.get_template(name=template.name)
+    return env.get_template(name=template.name)
 
-    return jinja_template.render(context)
+
+def stream_template(
+    template: Path,
+    target: Path,
+    context: Context,
+    shell_command_working_directory: Optional[Path] = None,
+    checksum: bool = False,
+) -> Optional[str]:
+    """
+    Render template directly to target file, one chunk at a time.
+
+    The rendered content is written to a temporary file in the directory of
+    the target, which replaces the target when rendering is complete. The
+    target is therefore never partially written, and is left untouched if
+    rendering fails. If target is a symlink, the file it points to is
+    replaced instead.
+
+    :param template: Path to template file.
+    :param target: Path to compiled target file.
+    :param context: Context used for rendering template.
+    :param shell_command_working_directory: Working directory of shell
+        filters.
+    :param checksum: If True, return MD5 hexdigest of the rendered content,
+        computed while writing.
+    :return: MD5 hexdigest if `checksum` is True, otherwise None.
+    """
+    jinja_template = load_template(
+        template=template,
+        shell_command_working_directory=shell_command_working_directory,
+    )
+    if target.is_symlink():
+        target = target.resolve()
+
+    md5 = hashlib.md5() if checksum else None
+    file_descriptor, temporary_name = tempfile.mkstemp(
+        dir=str(target.parent),
+        prefix=f'.{target.name}.',
+        suffix='.tmp',
+    )
+    try:
+        with open(file_descriptor, 'wb') as temporary_file:
+            for chunk in jinja_template.generate(context):
+                data = chunk.encode('utf-8')
+                temporary_file.write(data)
+                if md5:
+                    md5.update(data)
+
+        # Copy template's file permissions to compiled target file
+        shutil.copymode(template, temporary_name)
+        os.replace(temporary_name, target)
+    except BaseException:
+        try:
+            os.unlink(temporary_name)
+        except FileNotFoundError:  # pragma: no cover
+            pass
+        raise
+
+    return md5.hexdigest() if md5 else None
 
 
 def compile_template(
@@ -95,7 +210,8 @@ def compile_template(
     context: Context,
     shell_command_working_directory: Path,
     permissions: Optional[str] = None,
-) -> None:
+    checksum: bool = False,
+) -> Optional[str]:
     """
     Compile template to target destination with specific context.
 
@@ -103,23 +219,23 @@ def compile_template(
     accordingly.
     permissions='755' -> chmod 755
     permissions='u+x' -> chmod u+x
+
+    If `checksum` is True, the MD5 hexdigest of the compiled content is
+    returned, computed while the content is written.
     """
     logger.info(f'[Compiling] Template: "{template}" -> Target: "{target}"')
 
-    result = compile_template_to_string(
-        template=template,
-        context=context,
-        shell_command_working_directory=shell_command_working_directory,
-    )
-
     # Create parent directories if they do not exist
     os.makedirs(target.parent, exist_ok=True)
 
-    with open(target, 'w') as target_file:
-        target_file.write(result)
-
-    # Copy template's file permissions to compiled target file
-    shutil.copymode(template, target)
+    with profiler.measure('templates', str(template)):
+        content_hash = stream_template(
+            template=template,
+            target=target,
+            context=context,
+            shell_command_working_directory=shell_command_working_directory,
+            checksum=checksum,
+        )
 
     if permissions:
         result = utils.run_shell(
@@ -132,3 +248,5 @@ def compile_template(
             logger.error(
                 f'Could not set "{permissions}" permissions for "{target}"',
             )
+
+    return content_hash
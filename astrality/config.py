@@ -5,7 +5,7 @@ import logging
 import os
 import re
 from abc import ABC, abstractmethod
-from distutils.dir_util import copy_tree
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import (
     Any,
@@ -20,18 +20,25 @@ from typing import (
     Type,
     Iterable,
     Union,
+    cast,
 )
 
 from mypy_extensions import TypedDict
 
 from astrality.exceptions import (
+    GithubModuleError,
     MisconfiguredConfigurationFile,
     NonExistentEnabledModule,
 )
-from astrality.github import clone_repo, clone_or_pull_repo
+from astrality.github import (
+    clone_or_pull_repo,
+    clone_repo,
+    head_revision,
+)
 from astrality.context import Context
 from astrality import utils
 from astrality.persistence import CreatedFiles
+from astrality.profiler import profiler
 from astrality.xdg import XDG
 
 if TYPE_CHECKING:
@@ -39,6 +46,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of GitHub repositories which are cloned or pulled concurrently
+MAX_PARALLEL_FETCHES = 8
+
 
 class EnablingStatementRequired(TypedDict):
     """Required items of astrality.yml::modules:enabled_modules."""
@@ -61,6 +71,9 @@ class GlobalModulesConfigDict(TypedDict, total=False):
     reprocess_modified_files: bool
     modules_directory: str
     enabled_modules: List[EnablingStatement]
+    autoupdate_interval: Union[int, float]
+    parallel_modules: int
+    archive_backups: bool
 
 
 class GlobalAstralityConfigDict(TypedDict, total=False):
@@ -68,6 +81,7 @@ class GlobalAstralityConfigDict(TypedDict, total=False):
 
     hot_reload_config: bool
     startup_delay: Union[int, float]
+    control_socket: bool
 
 
 class AstralityYAMLConfigDict(TypedDict, total=False):
@@ -81,12 +95,15 @@ ASTRALITY_DEFAULT_GLOBAL_SETTINGS: AstralityYAMLConfigDict = {
     'astrality': {
         'hot_reload_config': False,
         'startup_delay': 0,
+        'control_socket': True,
     },
     'modules': {
         'requires_timeout': 1,
         'run_timeout': 0,
         'reprocess_modified_files': False,
         'modules_directory': 'modules',
+        'autoupdate_interval': 3600,
+        'parallel_modules': 1,
         'enabled_modules': [
             {'name': '*'},
             {'name': '*::*'},
@@ -163,6 +180,7 @@ def user_configuration(
         global_context = Context(utils.compile_yaml(
             path=context_file,
             context=Context(),
+            cache=True,
         ))
     else:
         global_context = Context()
@@ -173,6 +191,7 @@ def user_configuration(
         config = utils.compile_yaml(  # type: ignore
             path=config_file,
             context=global_context,
+            cache=True,
         )
     else:
         config = {}
@@ -189,6 +208,7 @@ def user_configuration(
         modules = utils.compile_yaml(
             path=modules_file,
             context=global_context,
+            cache=True,
         )
     else:
         modules = {}
@@ -209,6 +229,9 @@ def create_config_directory(path: Optional[Path] = None, empty=False) -> Path:
             logger.warning(
                 f'Copying over example config directory to "{str(path)}".',
             )
+            # distutils is slow to import, and only needed here
+            from distutils.dir_util import copy_tree
+
             example_config_dir = Path(__file__).parent / 'config'
             copy_tree(
                 src=str(example_config_dir),
@@ -344,6 +367,7 @@ class ModuleSource(ABC):
         self._context = Context(utils.compile_yaml(
             path=self.context_file,
             context=context,
+            cache=True,
         ))
         return self._context
 
@@ -367,6 +391,11 @@ class ModuleSource(ABC):
         self._config = self.modules(context=context)
         return self._config
 
+    def reset(self) -> None:
+        """Forget cached configuration, making it compiled anew when used."""
+        for attribute in ('_modules', '_context', '_config'):
+            self.__dict__.pop(attribute, None)
+
     def __contains__(self, module_name: str) -> bool:
         """Return True if this source contains enabled module_name."""
         return module_name in self._modules
@@ -461,22 +490,54 @@ class GithubModuleSource(ModuleSource):
             directory=True,
         )
         self.directory = repositories / github_path
+        self.repositories = repositories
         self.modules_file = self.directory / 'modules.yml'
         self.context_file = self.directory / 'context.yml'
 
-        if not self.directory.is_dir():
+    def fetch(self) -> None:
+        """
+        Clone GitHub repository if it has not been cloned yet.
+
+        :raises GithubModuleError: If the repository could not be cloned.
+        """
+        if self.directory.is_dir():
+            return
+
+        with profiler.measure('phases', 'github'):
             clone_repo(
                 user=self.github_user,
                 repository=self.github_repo,
-                modules_directory=repositories,
-            )
-        elif self.autoupdate:
-            clone_or_pull_repo(
-                user=self.github_user,
-                repository=self.github_repo,
-                modules_directory=repositories,
+                modules_directory=self.repositories,
             )
 
+    def update(self) -> bool:
+        """
+        Pull newest version of GitHub repository if autoupdate is enabled.
+
+        :return: True if new commits have been pulled.
+        :raises GithubModuleError: If the repository could not be updated.
+        """
+        if not self.autoupdate:
+            return False
+
+        old_revision = head_revision(self.directory)
+        clone_or_pull_repo(
+            user=self.github_user,
+            repository=self.github_repo,
+            modules_directory=self.repositories,
+        )
+        return head_revision(self.directory) != old_revision
+
+    def modules(self, context: Context) -> Dict[Any, Any]:
+        """Return modules defined in GitHub repository, cloning if needed."""
+        self.fetch()
+        return super().modules(context=context)
+
+    def context(self, context: Context = Context()) -> Context:
+        """Return context defined in GitHub repository, cloning if needed."""
+        self.fetch()
+        return super().context(context=context)
+
     def __eq__(self, other) -> bool:
         """
         Return True if being compared to identical github module.
@@ -596,6 +657,8 @@ class EnabledModules:
                 modules_directory=source_directory,
             ))
 
+        self.fetch_github_sources()
+
     def process_enabling_statements(
         self,
         enabling_statements: List[EnablingStatement],
@@ -627,6 +690,96 @@ class EnabledModules:
 
         return new_enabling_statements
 
+    def github_sources(self) -> List[GithubModuleSource]:
+        """Return one GitHub module source per enabled repository."""
+        repositories: Dict[Path, GithubModuleSource] = {}
+
+        # Prefer sources with autoupdate enabled for shared repositories
+        for source in self.source_types[GithubModuleSource]:
+            github_source = cast(GithubModuleSource, source)
+            if github_source.autoupdate \
+                    or github_source.directory not in repositories:
+                repositories[github_source.directory] = github_source
+
+        return list(repositories.values())
+
+    def fetch_github_sources(self) -> None:
+        """
+        Clone all enabled GitHub repositories not yet cloned, in parallel.
+
+        :raises GithubModuleError: If any repository could not be cloned.
+        """
+        missing = [
+            source
+            for source
+            in self.github_sources()
+            if not source.directory.is_dir()
+        ]
+        if not missing:
+            return
+
+        errors = []
+        with ThreadPoolExecutor(
+            max_workers=min(len(missing), MAX_PARALLEL_FETCHES),
+        ) as executor:
+            for source, future in [
+                (source, executor.submit(source.fetch))
+                for source
+                in missing
+            ]:
+                try:
+                    future.result()
+                except GithubModuleError as error:
+                    logger.error(
+                        f'Could not clone "{source.github_user}/'
+                        f'{source.github_repo}": {error}',
+                    )
+                    errors.append(error)
+
+        if errors:
+            raise errors[0]
+
+    def update_github_sources(
+        self,
+        sources: Optional[Iterable[GithubModuleSource]] = None,
+    ) -> List[GithubModuleSource]:
+        """
+        Pull GitHub repositories with autoupdate enabled, in parallel.
+
+        Failed pulls are logged, and the existing clone is left as is.
+
+        :param sources: GitHub module sources to be updated. If not provided,
+            all sources with autoupdate enabled are updated.
+        :return: Sources where new commits have been pulled.
+        """
+        if sources is None:
+            sources = self.github_sources()
+
+        sources = [source for source in sources if source.autoupdate]
+        if not sources:
+            return []
+
+        updated = []
+        with ThreadPoolExecutor(
+            max_workers=min(len(sources), MAX_PARALLEL_FETCHES),
+        ) as executor:
+            futures = {
+                executor.submit(source.update): source
+                for source
+                in sources
+            }
+            for future, source in futures.items():
+                try:
+                    if future.result():
+                        updated.append(source)
+                except GithubModuleError as error:
+                    logger.error(
+                        f'Could not update "{source.github_user}/'
+                        f'{source.github_repo}": {error}',
+                    )
+
+        return updated
+
     @staticmethod
     def module_directories(within: Path) -> Tuple[str, ...]:
         """Return all subdirectories which contain module definitions."""
@@ -701,7 +854,21 @@ class GlobalModulesConfig:
             'run_timeout',
             0,
         )
-        self.created_files = CreatedFiles()
+        self.autoupdate_interval = config.get(
+            'autoupdate_interval',
+            3600,
+        )
+        self.parallel_modules = config.get(
+            'parallel_modules',
+            1,
+        )
+        self.archive_backups = config.get(
+            'archive_backups',
+            False,
+        )
+        self.created_files = CreatedFiles(
+            archive_backups=self.archive_backups,
+        )
 
         # Determine the directory which contains external modules
         assert config_directory.is_absolute()
@@ -767,6 +934,7 @@ def filter_config_file(
         modules_dict = utils.compile_yaml(
             path=config_file,
             context=context,
+            cache=True,
         )
     except FileNotFoundError:
         logger.warning(
@@ -1,5 +1,14 @@
-"""Module defining Context class for templating context handling."""
+"""
+Module defining Context class for templating context handling.
 
+Context files imported by `import_context` actions are cached in memory,
+keyed by file modification time and size, and by the versions of the context
+keys the file refers to.
+"""
+
+import itertools
+from bisect import bisect_right, insort
+from collections import OrderedDict
 from math import inf
 from numbers import Number
 from pathlib import Path
@@ -7,12 +16,17 @@ import logging
 from typing import (
     Any,
     Dict,
+    FrozenSet,
+    List,
     ItemsView,
     Iterable,
     KeysView,
     ValuesView,
     Optional,
+    Set,
+    Tuple,
     Union,
+    cast,
 )
 
 from astrality import utils
@@ -37,8 +51,31 @@ class Context:
     >>> 'BACBEB'
     replacements['colors'][3]
     >>> 'BACBEB'
+
+    Copies and snapshots share structure with the context they are taken
+    from, and the underlying dictionaries are only copied when either side
+    is modified (copy-on-write). Snapshots are immutable, which allows them
+    to be read while the original context is modified.
+
+    All modifications are journaled with a monotonically increasing version
+    number, such that consumers can ask which keys have been modified since
+    they last used the context:
+
+    >>> version = replacements.version
+    >>> replacements['colors'][2] = 'FFFFFF'
+    >>> replacements.diff(since_version=version)
+    {('colors', 2)}
     """
 
+    __slots__ = (
+        '_dict',
+        '_number_keys',
+        '_shared',
+        '_frozen',
+        '_versions',
+        '_version',
+    )
+
     _dict: Dict[Key, Value]
 
     def __init__(
@@ -53,9 +90,29 @@ class Context:
             If not given an argument, an empty Context object is initialized.
         """
         self._dict = {}
-        self._max_key: Real = float(-inf)
 
-        if isinstance(content, (dict, Context)):
+        # Sorted numeric keys, used for integer index resolution
+        self._number_keys: List[Real] = []
+
+        # Version of the last modification of each key, and of any key
+        self._versions: Dict[Key, int] = {}
+        self._version = 0
+
+        # If True, _dict might be referenced by other contexts
+        self._shared = False
+
+        # If True, the context is an immutable snapshot
+        self._frozen = False
+
+        if isinstance(content, Context):
+            # Share structure until either context is modified
+            shared = content._share()
+            self._dict = shared._dict
+            self._number_keys = shared._number_keys
+            self._versions = shared._versions
+            self._version = shared._version
+            self._shared = True
+        elif isinstance(content, dict):
             self.update(content)
         elif isinstance(content, Path):
             if content.is_file():
@@ -65,10 +122,205 @@ class Context:
         elif content is not None:
             raise ValueError('Context initialized with wrong argument type.')
 
-        # Determine the greatest number index inserted
-        for key in self._dict.keys():
-            if isinstance(key, Number):
-                self._max_key = max(key, self._max_key)
+    def _share(self, frozen: bool = False) -> 'Context':
+        """
+        Return context sharing the structure of this context.
+
+        Sub-contexts are shared recursively, as references to them might
+        have been handed out already. Only the dictionaries of contexts
+        containing sub-contexts are copied, all other dictionaries are shared
+        until modified.
+
+        :param frozen: If True, the returned context is immutable.
+        :return: New Context object. Neither context is affected by
+            modifications to the other.
+        """
+        shared = Context.__new__(Context)
+        children = {
+            key: value._share(frozen=frozen)
+            for key, value
+            in self._dict.items()
+            if isinstance(value, Context)
+        }
+        shared._dict = {**self._dict, **children} if children else self._dict
+        shared._number_keys = self._number_keys
+        shared._versions = self._versions
+        shared._version = self._version
+        shared._shared = True
+        shared._frozen = frozen
+        self._shared = True
+        return shared
+
+    def _unshare(self) -> None:
+        """Make the dictionary of this context private before modifying it."""
+        if self._frozen:
+            raise TypeError('Context snapshots can not be modified.')
+
+        if not self._shared:
+            return
+
+        # Nested contexts have already been shared, see _share()
+        self._dict = self._dict.copy()
+        self._versions = self._versions.copy()
+        self._number_keys = self._number_keys.copy()
+        self._shared = False
+
+    def snapshot(self) -> 'Context':
+        """
+        Return immutable snapshot of context, using copy-on-write.
+
+        Modifications made to this context after the snapshot has been taken
+        are not visible in the snapshot.
+        """
+        return self._share(frozen=True)
+
+    def changed_paths(self, other: 'Context') -> Set[Tuple[Key, ...]]:
+        """
+        Return key paths with values differing between two contexts.
+
+        Sub-contexts which still share structure are skipped without being
+        compared, making this proportional to the number of changes when
+        comparing a context with a snapshot of itself.
+
+        :param other: Context to compare against, typically a snapshot.
+        :return: Set of key path tuples which have been added, removed, or
+            modified. For example ('colors', 1).
+        """
+        if self._dict is other._dict:
+            return set()
+
+        paths: Set[Tuple[Key, ...]] = set()
+        for key in self._dict.keys() | other._dict.keys():
+            value = self._dict.get(key, _MISSING)
+            other_value = other._dict.get(key, _MISSING)
+            if value is other_value:
+                continue
+
+            if isinstance(value, Context) and isinstance(other_value, Context):
+                paths.update(
+                    (key, *path)
+                    for path
+                    in value.changed_paths(other_value)
+                )
+            elif type(value) is not type(other_value) or value != other_value:
+                paths.add((key,))
+
+        return paths
+
+    @property
+    def version(self) -> int:
+        """Return version of the latest modification, including sub-contexts."""
+        version = self._version
+        for value in self._dict.values():
+            if isinstance(value, Context):
+                version = max(version, value.version)
+
+        return version
+
+    def diff(self, since_version: int) -> Set[Tuple[Key, ...]]:
+        """
+        Return key paths which have been modified since a given version.
+
+        Replaced sub-contexts are reported by the path to the sub-context,
+        while modifications within retained sub-contexts are reported by the
+        paths to the modified keys. Assigning a value equal to the present
+        value is not regarded as a modification.
+
+        :param since_version: Version as returned by :attr:`version`.
+        :return: Set of key path tuples, for example {('colors', 1)}.
+        """
+        paths: Set[Tuple[Key, ...]] = set()
+        for key, version in self._versions.items():
+            if version > since_version:
+                paths.add((key,))
+                continue
+
+            value = self._dict[key]
+            if isinstance(value, Context):
+                paths.update(
+                    (key, *path)
+                    for path
+                    in value.diff(since_version=since_version)
+                )
+
+        return paths
+
+    def modified_since(self, path: Tuple[Key, ...], since_version: int) -> bool:
+        """
+        Return True if the value retrieved by key path might have changed.
+
+        Integer index resolution is taken into account, so if index 3 resolves
+        to index 2, the path is regarded as modified when either index 2 is
+        modified or index 3 is inserted.
+
+        :param path: Tuple of keys, for example ('colors', 3).
+        :param since_version: Version as returned by :attr:`version`.
+        :return: Boolean indicating if the value at path has been modified.
+        """
+        context = self
+        for key in path:
+            if not isinstance(context, Context):
+                return False
+
+            key = context._resolve(key)
+            if key not in context._versions:
+                return False
+
+            if context._versions[key] > since_version:
+                return True
+
+            context = context._dict[key]
+
+        return False
+
+    def key_version(self, key: Key) -> int:
+        """
+        Return version of the latest modification of key.
+
+        :param key: Key, which might refer to a sub-context.
+        :return: Version including modifications within sub-contexts, or 0 if
+            the key has never been inserted.
+        """
+        value = self._dict.get(key)
+        if isinstance(value, Context):
+            return max(self._versions[key], value.version)
+
+        return self._versions.get(key, 0)
+
+    @property
+    def _max_key(self) -> Real:
+        """Return greatest numeric key, or negative infinity if none."""
+        return self._number_keys[-1] if self._number_keys else -inf
+
+    def _resolve(self, key: Key) -> Key:
+        """Return key which is retrieved by `key`, with integer resolution."""
+        if key in self._dict or not _is_number(key):
+            return key
+
+        if not self._number_keys:
+            return key
+
+        # Indices below the lowest index fall back to the lowest index
+        index = bisect_right(self._number_keys, key)
+        return self._number_keys[max(index - 1, 0)]
+
+    def __getstate__(self) -> Dict[Key, Value]:
+        """Return picklable state, excluding copy-on-write bookkeeping."""
+        return self._dict
+
+    def __setstate__(self, state: Dict[Key, Value]) -> None:
+        """Restore unpickled context."""
+        self._dict = state
+        self._number_keys = sorted(
+            cast(Real, key)
+            for key
+            in self._dict
+            if _is_number(key)
+        )
+        self._shared = False
+        self._frozen = False
+        self._version = next(_versions)
+        self._versions = dict.fromkeys(self._dict, self._version)
 
     def import_context(
         self,
@@ -84,7 +336,7 @@ class Context:
         :param from_section: If given, only import specific section from path.
         :param to_section: If given, rename from_section to to_section.
         """
-        new_context = utils.compile_yaml(
+        imported_context = imported_context_cache().get(
             path=from_path,
             context=self,
         )
@@ -94,25 +346,26 @@ class Context:
             logger.info(
                 f'[import_context] All sections from "{from_path}".',
             )
-            self.update(new_context)
+            for section in imported_context.keys():
+                self[section] = imported_context.section(section)
         elif from_section and to_section:
             logger.info(
                 f'[import_context] Section "{from_section}" from "{from_path}" '
                 f'into section "{to_section}".',
             )
-            self[to_section] = new_context[from_section]
+            self[to_section] = imported_context.section(from_section)
         else:
             assert from_section
             logger.info(
                 f'[import_context] Section "{from_section}" '
                 f'from "{from_path}" ',
             )
-            self[from_section] = new_context[from_section]
+            self[from_section] = imported_context.section(from_section)
 
     def __eq__(self, other) -> bool:
         """Check if content is identical to other Context or dictionary."""
         if isinstance(other, Context):
-            return self._dict == other._dict
+            return self._dict is other._dict or self._dict == other._dict
         elif isinstance(other, dict):
             return self._dict == other
         else:
@@ -122,8 +375,13 @@ class Context:
 
     def __setitem__(self, key: Key, value: Value) -> None:
         """Insert `value` into the `key` index."""
-        if isinstance(key, Number):
-            self._max_key = max(key, self._max_key)
+        self._unshare()
+        if _equal(self._dict.get(key, _MISSING), value):
+            # Nothing changes, so we keep the present version
+            return
+
+        if key not in self._dict and _is_number(key):
+            insort(self._number_keys, cast(Real, key))
 
         if isinstance(value, dict):
             # Insterted dictionaries are cast to Context instances
@@ -131,32 +389,35 @@ class Context:
         else:
             self._dict[key] = value
 
+        self._version = self._versions[key] = next(_versions)
+
     def __getitem__(self, key: Key) -> Value:
         """
         Get item inserted into `key` index, with integer index resolution.
 
         Here "integer index resolution" means that if you try to retrieve
-        non-existent integer index 2, it will retrieve the greatest available
-        integer indexed value instead.
+        non-existent integer index 3, it will retrieve the value of the
+        greatest integer index lower than 3 instead. If there is no lower
+        integer index, the lowest integer index is retrieved.
         """
         try:
             # Return excact hit if present
-            return self._dict[key]
+            value = self._dict[key]
         except KeyError:
             # The key is not present. See if we can resolve the use of another
             # one through integer key priority.
-            if self._max_key > -inf:
-                # Another integer key has been inserted earlier
-                if isinstance(key, Number):
-                    # We can return the max integer key previously inserted
-                    return self._dict[self._max_key]
-                else:
-                    # Throwing any other ValueErrors just in case
-                    raise
-            else:
+            if not _is_number(key):
+                raise
+
+            resolved_key = self._resolve(key)
+            if resolved_key is key:
                 raise KeyError(f'Integer index "{key}" is non-existent and had '
                                'no lower index to be substituted for')
 
+            value = self._dict[resolved_key]
+
+        return value
+
     def get(self, key: Key, defualt=None) -> Value:
         """Get value from index with fallback value `default`."""
         try:
@@ -202,11 +463,189 @@ class Context:
             self.__setitem__(key, value)
 
     def copy(self) -> 'Context':
-        """Return shallow copy of context."""
-        return Context(self._dict.copy())
+        """Return copy of context, using copy-on-write."""
+        return self._share()
 
     def reverse_update(self, other: Union['Context', dict]) -> None:
         """Update context while preserving conflicting keys."""
-        other_copy = other.copy()
-        other_copy.update(self._dict)
-        self.update(other_copy)
+        for key, value in other.items():
+            if key not in self._dict:
+                self.__setitem__(key, value)
+
+
+# Sentinel for missing values when comparing contexts
+_MISSING = object()
+
+# Monotonic version counter shared by all contexts, making versions of
+# sub-contexts comparable with the versions of their parents.
+_versions = itertools.count(1)
+
+
+# Built-in numeric types, checked before the slower Number ABC check
+_NUMBER_TYPES = frozenset((int, float))
+
+
+def _is_number(key: Any) -> bool:
+    """Return True if key is numeric, and thus subject to index resolution."""
+    return type(key) in _NUMBER_TYPES \
+        or (type(key) is not str and isinstance(key, Number))
+
+
+def _equal(value: Value, other: Value) -> bool:
+    """Return True if context values are equal and of the same type."""
+    if isinstance(value, Context) and isinstance(other, (Context, dict)):
+        return value == other
+
+    return type(value) is type(other) and value == other
+
+
+# Maximum number of parsed context files kept in memory
+IMPORTED_CONTEXT_CACHE_SIZE = 128
+
+FileKey = Tuple[str, int, int]
+
+
+class ImportedContext:
+    """
+    Parsed context file, converted to Context objects one section at a time.
+
+    Converted sections are immutable snapshots, and each call to
+    :meth:`section` returns a copy-on-write copy which the caller is free to
+    modify.
+
+    :param data: Parsed YAML data of context file.
+    """
+
+    def __init__(self, data: Optional[Dict]) -> None:
+        """Construct imported context from parsed YAML data."""
+        self.data = data or {}
+        self._sections: Dict[Any, Context] = {}
+
+    def keys(self) -> Iterable:
+        """Return names of all sections in context file."""
+        return self.data.keys()
+
+    def section(self, name: Any) -> Any:
+        """
+        Return section of context file.
+
+        :param name: Section name.
+        :return: Context object if section is a mapping, otherwise the value.
+        :raises KeyError: If the section does not exist.
+        """
+        value = self.data[name]
+        if not isinstance(value, dict):
+            return value
+
+        if name not in self._sections:
+            self._sections[name] = Context(value).snapshot()
+
+        return self._sections[name].copy()
+
+
+class ImportedContextCache:
+    """
+    In-memory least recently used cache of parsed context files.
+
+    Context files are templates, so a cached result is only reused if neither
+    the file nor the context keys it refers to have been modified. Templates
+    which might depend on anything else than the context, such as environment
+    variables or shell filters, are never cached.
+
+    :param maxsize: Maximum number of parsed context files to keep.
+    """
+
+    def __init__(self, maxsize: int = IMPORTED_CONTEXT_CACHE_SIZE) -> None:
+        """Construct empty cache."""
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._analyses: OrderedDict = OrderedDict()
+
+    def get(self, path: Path, context: Context) -> ImportedContext:
+        """
+        Return parsed context file, compiled with context.
+
+        :param path: Path to context file.
+        :param context: Context used for compiling context file.
+        :return: ImportedContext object.
+        """
+        stat = path.stat()
+        file_key = (str(path), stat.st_mtime_ns, stat.st_size)
+        names = self.referenced_names(path=path, file_key=file_key)
+        if names is None:
+            return ImportedContext(utils.compile_yaml(
+                path=path,
+                context=context,
+            ))
+
+        key = file_key + tuple(
+            context.key_version(name)
+            for name
+            in sorted(names)
+        )
+        try:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        except KeyError:
+            pass
+
+        imported_context = ImportedContext(utils.compile_yaml(
+            path=path,
+            context=context,
+        ))
+        self._insert(self._entries, key, imported_context)
+        return imported_context
+
+    def referenced_names(
+        self,
+        path: Path,
+        file_key: FileKey,
+    ) -> Optional[FrozenSet[str]]:
+        """
+        Return names of context keys used by context file.
+
+        :param path: Path to context file.
+        :param file_key: Tuple of path, modification time, and size of file.
+        :return: Set of names, or None if the file can not be cached.
+        """
+        try:
+            self._analyses.move_to_end(file_key)
+            return self._analyses[file_key]
+        except KeyError:
+            pass
+
+        from jinja2 import Environment, TemplateSyntaxError, meta
+
+        from astrality import compiler
+
+        names: Optional[FrozenSet[str]] = None
+        source = path.read_text()
+        if compiler.is_deterministic(source):
+            try:
+                names = frozenset(
+                    meta.find_undeclared_variables(Environment().parse(source)),
+                )
+            except TemplateSyntaxError:  # pragma: no cover
+                pass
+
+        self._insert(self._analyses, file_key, names)
+        return names
+
+    def _insert(self, entries: OrderedDict, key: Tuple, value: Any) -> None:
+        """Insert value into entries, evicting least recently used entries."""
+        entries[key] = value
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached context files."""
+        self._entries.clear()
+        self._analyses.clear()
+
+
+_imported_context_cache = ImportedContextCache()
+
+
+def imported_context_cache() -> ImportedContextCache:
+    """Return application wide cache of imported context files."""
+    return _imported_context_cache
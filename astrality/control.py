@@ -0,0 +1,443 @@
+"""
+Module for controlling a running Astrality process through a local socket.
+
+A :class:`ControlServer` listens on the Unix domain socket
+$XDG_DATA_HOME/astrality/control.sock. Clients send a single JSON object per
+line, such as {"command": "event", "module": "solarized"}, and receive a
+single JSON object per line in return, either {"ok": true, "result": ...} or
+{"ok": false, "error": "..."}.
+
+Actions invoked through the socket are performed by the live process, avoiding
+the cost of starting Astrality anew.
+"""
+
+import inspect
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+
+from astrality.config import user_configuration
+from astrality.xdg import XDG
+
+if TYPE_CHECKING:
+    from astrality.module import ModuleManager  # noqa
+
+# Requests larger than this are regarded as malformed
+MAX_REQUEST_SIZE = 65536
+
+# Seconds to wait for the previous process to exit after a handoff
+HANDOFF_EXIT_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class ControlError(Exception):
+    """Exception for when a control command could not be performed."""
+
+
+def socket_path() -> Path:
+    """Return path to the control socket of the current user."""
+    return XDG().data_home / 'control.sock'
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handler responding to each JSON line sent by a client."""
+
+    server: '_UnixServer'
+
+    def handle(self) -> None:
+        """Respond to requests until the client closes the connection."""
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_SIZE)
+            if not line:
+                return
+
+            control_server = self.server.control_server
+            response = control_server.respond(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+            if control_server.handed_off:
+                # The new process has received the state, so we can exit
+                control_server.on_handoff()
+                return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix domain socket server with a reference to its owner."""
+
+    daemon_threads = True
+    control_server: 'ControlServer'
+
+
+class ControlServer:
+    """
+    Server performing commands sent to the control socket.
+
+    Available commands are the public methods prefixed with "command_".
+    Commands are performed one at a time while holding the reload lock of
+    the module manager. They therefore never run concurrently with hot
+    reloads, background updates of GitHub modules, or the event handling of
+    the main loop.
+
+    :param module_manager: Module manager of the running process.
+    :param path: Path to Unix domain socket. Defaults to :func:`socket_path`.
+    :param on_handoff: Callable invoked after modules have been handed off
+        to a new process. Defaults to terminating this process.
+    """
+
+    def __init__(
+        self,
+        module_manager: 'ModuleManager',
+        path: Optional[Path] = None,
+        on_handoff: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Construct stopped control server."""
+        self.module_manager = module_manager
+        self.path = path or socket_path()
+        self.on_handoff = on_handoff or (
+            lambda: os.kill(os.getpid(), signal.SIGTERM)
+        )
+        self.handed_off = False
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def commands(self) -> Dict[str, Callable[..., Any]]:
+        """Return dictionary of available commands keyed by name."""
+        return {
+            name[len('command_'):]: getattr(self, name)
+            for name
+            in dir(self)
+            if name.startswith('command_')
+        }
+
+    def start(self) -> None:
+        """
+        Start listening on the control socket in a background thread.
+
+        The server is not started if another process is already listening on
+        the socket.
+        """
+        if self.path.exists() or self.path.is_symlink():
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(str(self.path))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Socket left behind by a process which did not exit
+                    # cleanly
+                    self.path.unlink()
+                else:
+                    logger.error(
+                        f'Another Astrality process is listening on '
+                        f'"{self.path}". Control commands are not available.',
+                    )
+                    return
+
+        self._server = _UnixServer(str(self.path), _RequestHandler)
+        self._server.control_server = self
+        os.chmod(str(self.path), 0o600)
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name='astrality-control',
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f'Listening for control commands on "{self.path}".')
+
+    def stop(self) -> None:
+        """Stop listening and remove the control socket."""
+        if not self._server:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+        if self.path.exists():
+            self.path.unlink()
+
+    def respond(self, request: bytes) -> Dict[str, Any]:
+        """
+        Return response to a JSON encoded request.
+
+        :param request: JSON object with a "command" key, and the arguments of
+            the command as the remaining keys.
+        :return: Dictionary with "ok" key, and either "result" or "error".
+        """
+        try:
+            try:
+                arguments = json.loads(request.decode('utf-8'))
+            except ValueError:
+                raise ControlError('Request must be valid JSON.')
+            if not isinstance(arguments, dict):
+                raise ControlError('Request must be a JSON object.')
+
+            name = arguments.pop('command', None)
+            if name not in self.commands:
+                raise ControlError(f'Unknown command "{name}".')
+
+            command = self.commands[name]
+            try:
+                inspect.signature(command).bind(**arguments)
+            except TypeError as error:
+                raise ControlError(
+                    f'Invalid arguments for command "{name}": {error}.',
+                )
+
+            logger.info(f'Performing control command "{name}".')
+            with self.module_manager._reload_lock:
+                result = command(**arguments)
+        except ControlError as error:
+            return {'ok': False, 'error': str(error)}
+        except Exception as error:
+            logger.exception('Control command failed!')
+            return {'ok': False, 'error': f'{type(error).__name__}: {error}'}
+
+        return {'ok': True, 'result': result}
+
+    def module(self, name: str):
+        """Return managed module with name, raising ControlError if absent."""
+        try:
+            return self.module_manager.modules[name]
+        except KeyError:
+            raise ControlError(f'Module "{name}" is not enabled.')
+
+    def command_status(self) -> Dict[str, Any]:
+        """Return process id, module events, and time until next event."""
+        return {
+            'pid': os.getpid(),
+            'startup_done': self.module_manager.startup_done,
+            'events': self.module_manager.module_events(),
+            'seconds_until_next_event': min(
+                self.module_manager.time_until_next_event().total_seconds(),
+                10e7,
+            ),
+        }
+
+    def command_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return statistics of actions executed by the process.
+
+        Statistics are collected from the first metrics command onwards,
+        unless already enabled by profiling or a metrics file.
+        """
+        return self.module_manager.enable_metrics().summary()
+
+    def command_event(self, module: str) -> str:
+        """
+        Execute on_event block of module, regardless of its event.
+
+        :param module: Name of module.
+        :return: Current event of module.
+        """
+        self.module_manager.execute(
+            action='all',
+            block='on_event',
+            module=self.module(module),
+        )
+        event = self.module(module).event_listener.event()
+        self.module_manager.last_module_events[module] = event
+        return event
+
+    def command_recompile(self, path: Optional[str] = None) -> None:
+        """
+        Execute on_modified blocks of path, or recompile it as a template.
+
+        Templates are recompiled even if `reprocess_modified_files` is not
+        enabled.
+
+        :param path: Path to modified file, relative paths being relative to
+            the configuration directory. All templates are recompiled if not
+            given.
+        """
+        if path is None:
+            self.module_manager.recompile_templates()
+            return
+
+        modified = Path(path).expanduser()
+        if not modified.is_absolute():
+            modified = self.module_manager.config_directory / modified
+
+        if not self.module_manager.on_modified(modified):
+            self.module_manager.recompile_modified_template(
+                modified=modified,
+                force=True,
+            )
+
+    def command_handoff(self, fingerprints: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Hand off modules to a new process, and terminate afterwards.
+
+        :param fingerprints: Module fingerprints of the new process.
+        :return: State to be adopted by the new process.
+        """
+        state = self.module_manager.hand_off(fingerprints=fingerprints)
+        self.handed_off = True
+        return state
+
+    def command_reload(self, module: Optional[str] = None) -> None:
+        """
+        Reload configuration or restart a single module.
+
+        :param module: Name of module to be restarted with its current
+            configuration. If not given, the configuration is read anew and
+            modified modules are restarted.
+        """
+        if module is not None:
+            self.module(module)
+            self.module_manager.reload_module(module)
+            return
+
+        config, modules, context, _ = user_configuration(
+            config_directory=self.module_manager.config_directory,
+        )
+        self.module_manager.reload(
+            config=config,
+            modules=modules,
+            context=context,
+        )
+
+
+def send_command(
+    command: str,
+    arguments: Optional[Dict[str, Any]] = None,
+    socket_file: Optional[Path] = None,
+    timeout: float = 60,
+) -> Any:
+    """
+    Send command to a running Astrality process and return the result.
+
+    :param command: Name of command, for example 'status'.
+    :param arguments: Keyword arguments passed on to the command.
+    :param socket_file: Path to Unix domain socket. Defaults to
+        :func:`socket_path`.
+    :param timeout: Seconds to wait for the command to be performed.
+    :return: Result of command.
+    :raises ConnectionError: If no Astrality process is listening.
+    :raises ControlError: If the command could not be performed.
+    """
+    path = socket_file or socket_path()
+    request = json.dumps(
+        {**(arguments or {}), 'command': command},
+    ).encode('utf-8')
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise ConnectionError(
+                f'No running Astrality process is listening on "{path}".',
+            )
+
+        connection.sendall(request + b'\n')
+        response = connection.makefile('rb').readline()
+
+    if not response:
+        raise ConnectionError('Astrality closed the connection.')
+
+    decoded = json.loads(response.decode('utf-8'))
+    if not decoded['ok']:
+        raise ControlError(decoded['error'])
+
+    return decoded['result']
+
+
+def request_handoff(
+    module_manager: 'ModuleManager',
+    socket_file: Optional[Path] = None,
+) -> bool:
+    """
+    Take over modules from a running Astrality process.
+
+    The running process exits the modules which are not configured
+    identically in module_manager, hands off the state of the remaining
+    modules, and terminates. The state is adopted by module_manager, which
+    must not have been started yet.
+
+    :param module_manager: Module manager of the new process.
+    :param socket_file: Path to Unix domain socket. Defaults to
+        :func:`socket_path`.
+    :return: True if modules were handed off, False if no process could hand
+        off its modules.
+    """
+    try:
+        state = send_command(
+            command='handoff',
+            arguments={'fingerprints': module_manager.fingerprints()},
+            socket_file=socket_file,
+        )
+    except (ConnectionError, ControlError, OSError) as error:
+        logger.debug(f'No handoff from previous process: {error}')
+        return False
+
+    module_manager.adopt(state)
+    if state['pid'] == os.getpid():
+        return True
+
+    import psutil
+
+    try:
+        psutil.Process(pid=state['pid']).wait(timeout=HANDOFF_EXIT_TIMEOUT)
+    except psutil.NoSuchProcess:
+        pass
+    except psutil.TimeoutExpired:
+        logger.warning(
+            f'Previous Astrality process with pid {state["pid"]} did not exit '
+            'after handing off its modules.',
+        )
+
+    return True
+
+
+# Names of the keyword argument taken by each command, if any
+COMMAND_ARGUMENTS = {
+    'event': 'module',
+    'recompile': 'path',
+    'reload': 'module',
+    'metrics': None,
+    'status': None,
+}
+
+
+def run_client(command: str, argument: Optional[str] = None) -> int:
+    """
+    Send command from the command line, printing the result as JSON.
+
+    :param command: Name of command, a key of COMMAND_ARGUMENTS.
+    :param argument: Optional argument of command. Paths are relative to the
+        current working directory.
+    :return: Exit code, 0 if the command was performed.
+    """
+    arguments: Dict[str, str] = {}
+    if argument is not None:
+        key = COMMAND_ARGUMENTS[command]
+        if key is None:
+            print(f'Command "{command}" takes no argument.', file=sys.stderr)
+            return 2
+
+        if key == 'path':
+            argument = str(Path(argument).expanduser().absolute())
+        arguments[key] = argument
+
+    try:
+        result = send_command(command=command, arguments=arguments)
+    except (ConnectionError, ControlError, socket.timeout) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if result is not None:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
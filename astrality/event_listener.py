@@ -10,12 +10,13 @@ import time
 from collections import namedtuple
 from datetime import datetime, timedelta
 from math import inf
-from typing import Dict, ClassVar, Tuple, Union, Optional
+from typing import Dict, ClassVar, Tuple, TYPE_CHECKING, Union, Optional
 
-import pytz
-from astral import AstralError, Location
 from dateutil.tz import tzlocal
 
+if TYPE_CHECKING:
+    from astral import Location  # noqa
+
 
 EventListenerConfig = Dict[str, Union[str, int, float, None]]
 logger = logging.getLogger(__name__)
@@ -131,6 +132,8 @@ class Solar(EventListener):
 
     def _event(self) -> str:
         """Return the current, local solar event."""
+        from astral import AstralError
+
         try:
             sun = self.location.sun()
             now = self.now()
@@ -155,6 +158,8 @@ class Solar(EventListener):
 
     def time_until_next_event(self) -> timedelta:
         """Return timedelta until next solar event."""
+        from astral import AstralError
+
         try:
             sun = self.location.sun()
             now = self.now()
@@ -192,13 +197,22 @@ class Solar(EventListener):
 
     def now(self) -> datetime:
         """Return the current UTC time."""
+        import pytz
+
         timezone = pytz.timezone('UTC')
         return timezone.localize(datetime.utcnow())
 
     def construct_astral_location(
         self,
-    ) -> Location:
-        """Return astral location object based on config."""
+    ) -> 'Location':
+        """
+        Return astral location object based on config.
+
+        Astral is imported here, as it is slow to import, and only needed by
+        solar event listeners.
+        """
+        from astral import Location
+
         # Initialize a custom location for astral, as it doesn't necessarily
         # include your current city of residence
         location = Location()
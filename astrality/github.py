@@ -1,18 +1,23 @@
 """Module for abstractions around git clone and pull."""
 
 import logging
+import shutil
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 from astrality.exceptions import GithubModuleError
 from astrality.utils import run_shell
 
+# URL of GitHub repositories, formatted with user and repository
+GITHUB_URL = 'https://github.com/{user}/{repository}.git'
+
 
 def clone_repo(
     user: str,
     repository: str,
     modules_directory: Path,
     timeout: Union[int, float] = 50,
+    depth: Optional[int] = 1,
 ) -> Path:
     """
     Clone Github `user`/`repository` to modules_directory.
@@ -24,24 +29,33 @@ def clone_repo(
     :param repository: Repository name.
     :param modules_directory: Directory containing cloned repositories.
     :param timeout: Time to wait for successful clone.
+    :param depth: Number of commits to fetch. If None, the entire history
+        is cloned.
     :return: Path to cloned repository.
     """
     github_user_directory = modules_directory / user
     github_user_directory.mkdir(parents=True, exist_ok=True)
     repository_directory = github_user_directory / repository
-    github_url = \
-        f'https://github.com/{user}/{repository}.git {repository_directory}'
+    existed = repository_directory.exists()
+    github_url = GITHUB_URL.format(user=user, repository=repository)
+    depth_option = f'--depth {depth} ' if depth else ''
 
     # Fail on git credential prompt: https://serverfault.com/a/665959
     result = run_shell(
-        command='GIT_TERMINAL_PROMPT=0 git clone ' + github_url,
+        command=f'GIT_TERMINAL_PROMPT=0 git clone {depth_option}'
+        f'{github_url} {repository_directory}',
         timeout=timeout,
         fallback=False,
-        working_directory=github_user_directory,
+        # Repositories of the same user might be cloned concurrently, and the
+        # user directory might be removed by failed clones in the mean time
+        working_directory=modules_directory,
         allow_error_codes=True,
     )
 
     if not repository_directory.is_dir() or result is False:
+        # Only the partial clone is removed, and the user directory if empty
+        if not existed and repository_directory.is_dir():
+            shutil.rmtree(repository_directory, ignore_errors=True)
         try:
             github_user_directory.rmdir()
         except OSError:
@@ -103,3 +117,23 @@ def clone_or_pull_repo(
         )
 
     return github_repo_directory
+
+
+def head_revision(repository_directory: Path) -> Optional[str]:
+    """
+    Return commit hash of checked out revision in git repository.
+
+    :param repository_directory: Path to git repository.
+    :return: Commit hash, or None if it could not be determined.
+    """
+    result = run_shell(
+        command='git rev-parse HEAD',
+        timeout=5,
+        fallback=False,
+        working_directory=repository_directory,
+        log_success=False,
+    )
+    if result is False:
+        return None
+
+    return result.strip()
@@ -1,12 +1,17 @@
 """Module implementing user configured custom functionality."""
 
+import copy
 import logging
+import os
+import time
 from collections import defaultdict
 from datetime import timedelta
 from pathlib import Path
 import psutil
 import re
+import threading
 from typing import (
+    Any,
     Callable,
     DefaultDict,
     Dict,
@@ -17,14 +22,18 @@ from typing import (
     Set,
     Tuple,
     Union,
+    cast,
 )
 
 from mypy_extensions import TypedDict
 
 from astrality.actions import ActionBlock, ActionBlockDict, SetupActionBlock
+from astrality.autoupdate import Autoupdater
 from astrality.config import (
+    ASTRALITY_DEFAULT_GLOBAL_SETTINGS,
     AstralityYAMLConfigDict,
     GlobalModulesConfig,
+    ModuleSource,
     expand_path,
     user_configuration,
 )
@@ -35,8 +44,12 @@ from astrality.event_listener import (
 )
 from astrality.filewatcher import DirectoryWatcher
 from astrality.context import Context
+from astrality.profiler import profiler
 from astrality.requirements import Requirement, RequirementDict
-from astrality.utils import cast_to_list
+from astrality.scheduler import DependencyGraph, describe_cycle
+from astrality import tracing
+from astrality.utils import cast_to_list, fingerprint
+from astrality.variants import EventVariants
 
 
 class ModuleConfigDict(TypedDict, total=False):
@@ -45,6 +58,7 @@ class ModuleConfigDict(TypedDict, total=False):
     enabled: Optional[bool]
     requires: Union[RequirementDict, List[RequirementDict]]
     event_listener: EventListenerConfig
+    precompile_events: bool
 
     on_setup: ActionBlockDict
     on_startup: ActionBlockDict
@@ -63,6 +77,18 @@ class ModuleActionBlocks(TypedDict):
     on_modified: Dict[Path, ActionBlock]
 
 
+# Module configuration and the directory used for relative paths
+ModuleDefinition = Tuple[ModuleConfigDict, Path]
+
+# Identifier of action block within a module, the path is only used for
+# on_modified blocks, for example ('on_modified', Path('/file'))
+BlockKey = Tuple[str, Optional[Path]]
+
+# Compilation performed by a compile or stow action within an action block:
+# (block, on_modified path, 'compile' or 'stow', action index, template,
+# targets), serializable as JSON
+CompilationRecord = Tuple[str, Optional[str], str, int, str, List[str]]
+
 logger = logging.getLogger(__name__)
 
 
@@ -194,6 +220,28 @@ class Module:
             if 'module' in requirement
         )
 
+        # Triggers forming cycles are detected up front, and never followed
+        self.cyclic_triggers: Set[Tuple[BlockKey, BlockKey]] = set()
+        for cycle in self.trigger_graph().cycles():
+            logger.error(
+                f'[module/{self.name}] Action blocks trigger each other in a '
+                f'cycle: {describe_cycle(cycle, name=self._block_name)}. '
+                'Ignoring these triggers!',
+            )
+            self.cyclic_triggers.update(
+                (block, triggered)
+                for block in cycle
+                for triggered in cycle
+            )
+
+        # Flattened trigger expansions, keyed by the executed action block
+        self.execution_plans: Dict[BlockKey, Tuple[BlockKey, ...]] = {}
+
+        # Templates of on_event block rendered ahead of event changes
+        self.event_variants: Optional[EventVariants] = None
+        if module_config.get('precompile_events') and not dry_run:
+            self.event_variants = EventVariants(module=self)
+
     @staticmethod
     def prepare_on_startup_block(
         module_name: str,
@@ -253,6 +301,66 @@ class Module:
             assert name in ('on_setup', 'on_startup', 'on_event', 'on_exit')
             return self.action_blocks[name]  # type: ignore
 
+    def trigger_graph(self) -> DependencyGraph[BlockKey]:
+        """
+        Return graph of action blocks and the action blocks they trigger.
+
+        The graph is determined from the trigger action options, such that
+        no actions need to be constructed.
+
+        :return: DependencyGraph where each block "depends" on the blocks it
+            triggers.
+        """
+        blocks: Dict[BlockKey, ActionBlock] = {
+            (name, None): self.get_action_block(name=name)
+            for name
+            in ('on_setup', 'on_startup', 'on_event', 'on_exit')
+        }
+        for path, action_block in self.action_blocks['on_modified'].items():
+            blocks[('on_modified', path)] = action_block
+
+        return DependencyGraph({
+            key: self._triggered_blocks(action_block)
+            for key, action_block
+            in blocks.items()
+        })
+
+    def _triggered_blocks(self, action_block: ActionBlock) -> List[BlockKey]:
+        """
+        Return action blocks triggered by action block.
+
+        Trigger action options are read directly, such that no actions need
+        to be constructed.
+
+        :param action_block: Action block containing trigger actions.
+        :return: List of (block name, path) keys, in the order specified.
+        """
+        triggered: List[BlockKey] = []
+        for options in action_block.action_options(identifier='trigger'):
+            trigger_options = cast(Dict[str, str], options)
+            if not trigger_options:
+                continue
+
+            block = trigger_options.get('block', '')
+            if block != 'on_modified':
+                triggered.append((block, None))
+            elif 'path' in trigger_options:
+                triggered.append((
+                    block,
+                    expand_path(
+                        path=Path(trigger_options['path']),
+                        config_directory=self.directory,
+                    ),
+                ))
+
+        return triggered
+
+    @staticmethod
+    def _block_name(key: BlockKey) -> str:
+        """Return human readable name of action block key."""
+        block, path = key
+        return f'{block}:{path}' if path else block
+
     def execute(
         self,
         action: str,
@@ -272,46 +380,99 @@ class Module:
             First item is command being run, second item is the standard output
             of the shell command.
         """
+        plan = self.execution_plan(block=block, path=path)
         if action == 'all':
             # If 'all' is specified, then we can run all actions except trigger,
-            # as triggers are handled in each respective action.
-            all_actions = filter(
-                lambda x: x != 'trigger',
-                ActionBlock.action_types.keys(),
-            )
+            # as triggers are handled by the execution plan.
+            actions = [
+                action_type
+                for action_type
+                in ActionBlock.action_types
+                if action_type != 'trigger'
+            ]
+        else:
+            assert action in ActionBlock.action_types
+            actions = [action]
 
-            results: Tuple[Tuple[str, str], ...] = tuple()
-            for action in all_actions:
-                result = self.execute(
-                    action=action,
-                    block=block,
-                    path=path,
-                    dry_run=dry_run,
+        # We need to execute the same action in any triggered action block
+        results: Tuple[Tuple[str, str], ...] = tuple()
+        for specific_action in actions:
+            for block_name, block_path in plan:
+                action_block = self.get_action_block(
+                    name=block_name,
+                    path=block_path,
                 )
+                with profiler.measure('actions', specific_action):
+                    result = getattr(action_block, specific_action)(
+                        dry_run=dry_run,
+                    )
                 if result:
                     results += result
 
-            return results
+        return results
 
-        # In this branch, we have a single action, for example 'run'.
-        assert isinstance(action, str)
-        assert action in ActionBlock.action_types
-        action_block = self.get_action_block(name=block, path=path)
-        results = getattr(action_block, action)(dry_run=dry_run)
+    def execution_plan(
+        self,
+        block: str,
+        path: Optional[Path] = None,
+    ) -> Tuple[BlockKey, ...]:
+        """
+        Return action blocks to be executed when an action block is executed.
 
-        # We need to execute the same action in any triggered action block
-        triggers = action_block.triggers()
-        for trigger in triggers:
-            result = self.execute(
-                action=action,
-                block=trigger.block,
-                path=trigger.absolute_path,
-                dry_run=dry_run,
+        The plan starts with the given action block, followed by all blocks it
+        triggers, directly or transitively, in depth first order. Each block
+        is only included once, triggers forming cycles are never followed, and
+        triggers of non-existent 'on_modified' blocks are skipped.
+
+        Plans are cached, as modules are constructed anew when their
+        configuration is reloaded.
+
+        :param block: Name of block such as 'on_startup'.
+        :param path: Absolute path in case of block == 'on_modified'.
+        :return: Tuple of (block name, path) keys.
+        """
+        key: BlockKey = (block, path)
+        if key in self.execution_plans:
+            return self.execution_plans[key]
+
+        plan: List[BlockKey] = []
+        visited: Set[BlockKey] = set()
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+
+            visited.add(current)
+            plan.append(current)
+            triggered = []
+            action_block = self.get_action_block(
+                name=current[0],
+                path=current[1],
             )
-            if result:
-                results += result
+            for target in self._triggered_blocks(action_block):
+                if (current, target) in self.cyclic_triggers \
+                        or target in visited:
+                    continue
 
-        return results
+                triggered_path = target[1]
+                if triggered_path \
+                        and triggered_path \
+                        not in self.action_blocks['on_modified']:
+                    logger.error(
+                        f'[module/{self.name}] Triggered non-existent '
+                        f'"on_modified" block for path '
+                        f'"{triggered_path}".',
+                    )
+                    continue
+
+                triggered.append(target)
+
+            # Reversed, such that the first trigger is expanded first
+            stack.extend(reversed(triggered))
+
+        self.execution_plans[key] = tuple(plan)
+        return self.execution_plans[key]
 
     def all_action_blocks(self) -> Iterable[ActionBlock]:
         """Return flatten tuple of all module action blocks."""
@@ -338,13 +499,95 @@ class Module:
 
         return performed_compilations
 
-    def interpolate_string(self, string: str) -> str:
+    def compilation_records(self) -> List[CompilationRecord]:
+        """
+        Return performed compilations of each compile and stow action.
+
+        :return: List of records which can be serialized as JSON, and restored
+            in another process by :meth:`restore_compilations`.
+        """
+        records: List[CompilationRecord] = []
+        blocks: List[BlockKey] = [
+            (name, None)
+            for name
+            in ('on_setup', 'on_startup', 'on_event', 'on_exit')
+        ]
+        blocks.extend(
+            ('on_modified', path)
+            for path
+            in self.action_blocks['on_modified']
+        )
+        for block, path in blocks:
+            action_block = self.get_action_block(name=block, path=path)
+            if not action_block.constructed:
+                continue
+
+            compile_actions = [
+                ('compile', index, compile_action)
+                for index, compile_action
+                in enumerate(action_block._compile_actions)
+            ]
+            compile_actions.extend(
+                ('stow', index, stow_action.compile_action)
+                for index, stow_action
+                in enumerate(action_block._stow_actions)
+                if not stow_action.null_object
+            )
+            for kind, index, compile_action in compile_actions:
+                for template, targets \
+                        in compile_action.performed_compilations().items():
+                    records.append((
+                        block,
+                        str(path) if path else None,
+                        kind,
+                        index,
+                        str(template),
+                        sorted(str(target) for target in targets),
+                    ))
+
+        return records
+
+    def restore_compilations(self, records: List[CompilationRecord]) -> None:
+        """
+        Restore compilations performed by another process.
+
+        Templates are thereby recompiled when modified, as if this module had
+        compiled them itself.
+
+        :param records: Records returned by :meth:`compilation_records`.
+        """
+        for block, path, kind, index, template, targets in records:
+            action_block = self.get_action_block(
+                name=block,
+                path=Path(path) if path else None,
+            )
+            if not action_block.constructed:
+                action_block.construct_actions()
+
+            if kind == 'compile':
+                compile_action = action_block._compile_actions[index]
+            else:
+                compile_action = action_block._stow_actions[index] \
+                    .compile_action
+            compile_action._performed_compilations[Path(template)].update(
+                Path(target)
+                for target
+                in targets
+            )
+
+    def interpolate_string(
+        self,
+        string: str,
+        event: Optional[str] = None,
+    ) -> str:
         """
         Replace all module placeholders in string.
 
         The configuration string processor replaces {event} with the current
         module event, and {/path/to/template} with the compilation target.
 
+        :param string: String to be processed.
+        :param event: Event used instead of the current module event.
         :return: String where '{path/to/template}' has been replaced with
             'path/to/compilation/target', and {event} repleced with last event.
         """
@@ -353,7 +596,7 @@ class Module:
         string = self.replace(
             string.replace(
                 '{event}',
-                self.event_listener.event(),
+                event or self.event_listener.event(),
             ),
         )
 
@@ -467,6 +710,8 @@ class ModuleManager:
     :param context: Global context.
     :param directory: Directory containing global configuration.
     :param dry_run: If file system actions should be printed and skipped.
+    :param metrics: If True, aggregate statistics of all executed actions,
+        see :meth:`enable_metrics`.
     """
 
     def __init__(
@@ -476,6 +721,7 @@ class ModuleManager:
         context: Context = Context(),
         directory: Path = Path(__file__).parent / 'tests' / 'test_config',
         dry_run: bool = False,
+        metrics: bool = False,
     ) -> None:
         """Initialize a ModuleManager object from `astrality.yml` dict."""
         self.config_directory = directory
@@ -486,6 +732,22 @@ class ModuleManager:
         self.startup_done = False
         self.last_module_events: Dict[str, str] = {}
 
+        # Modules started by a previous process, and their events at handoff
+        self.adopted_modules: Dict[str, str] = {}
+        self.adopted_context_modified = False
+
+        # Processes started by a previous process, kept running by this one
+        self.adopted_processes: List[psutil.Process] = []
+
+        # Seconds spent per module in each startup phase, e.g. 'requires'
+        self.startup_timings: DefaultDict[str, DefaultDict[str, float]] = \
+            defaultdict(lambda: defaultdict(float))
+
+        # Latency statistics of executed actions, only collected when asked
+        self.action_metrics: Optional[tracing.ActionMetrics] = None
+        if metrics:
+            self.enable_metrics()
+
         # Get module configurations which are externally defined
         self.global_modules_config = GlobalModulesConfig(
             config=config.get('modules', {}),
@@ -496,88 +758,162 @@ class ModuleManager:
 
         self.modules: Dict[str, Module] = {}
 
-        # Insert externally managed modules
-        for external_module_source \
-                in self.global_modules_config.external_module_sources:
-            # Insert context defined in external configuration
-            module_context = external_module_source.context(
-                context=self.application_context,
-            )
-            self.application_context.reverse_update(module_context)
+        # Configuration and directory of each managed module
+        self.module_configs: Dict[str, ModuleDefinition] = {}
 
-            module_configs = external_module_source.modules(
-                context=self.application_context,
+        for module_name, (module_config, module_directory) in \
+                self.module_definitions(
+                    modules=modules,
+                    global_modules_config=self.global_modules_config,
+                    context=self.application_context,
+                ).items():
+            self.insert_module(
+                name=module_name,
+                module_config=module_config,
+                module_directory=module_directory,
             )
-            module_directory = external_module_source.directory
 
-            for module_name, module_config in module_configs.items():
-                if module_name \
-                        not in self.global_modules_config.enabled_modules:
-                    continue
+        # Remove modules which depends on other missing modules
+        Requirement.pop_missing_module_dependencies(self.modules)
 
-                if not Module.valid_module(
-                    name=module_name,
-                    config=module_config,
-                    requires_timeout=self.global_modules_config.
-                    requires_timeout,  # noqa
-                    requires_working_directory=module_directory,
-                ):
-                    continue
+        # Context used for compiling templates, before any actions are taken
+        self.configured_context = self.application_context.copy()
 
-                module = Module(
-                    name=module_name,
-                    module_config=module_config,
-                    module_directory=module_directory,
-                    replacer=self.interpolate_string,
-                    context_store=self.application_context,
-                    global_modules_config=self.global_modules_config,
-                    dry_run=dry_run,
+        # Serializes reloads triggered by the watcher, autoupdate, and control
+        # threads, with each other and with the main loop
+        self._reload_lock = threading.RLock()
+
+        # Initialize the config directory watcher, but don't start it yet
+        self.directory_watcher = DirectoryWatcher(
+            directory=self.config_directory,
+            on_modified=self.file_system_modified,
+        )
+
+        logger.info('Enabled modules: ' + ', '.join(self.modules.keys()))
+
+    @staticmethod
+    def module_definitions(
+        modules: Dict[str, ModuleConfigDict],
+        global_modules_config: GlobalModulesConfig,
+        context: Context,
+    ) -> Dict[str, 'ModuleDefinition']:
+        """
+        Return configurations of all enabled modules.
+
+        Context defined by external module sources is inserted into context,
+        without overwriting existing values.
+
+        :param modules: Modules defined in `modules.yml`.
+        :param global_modules_config: Global modules configuration object.
+        :param context: Context used for compiling module sources.
+        :return: Dictionary with module names as keys and (module
+            configuration, module directory) tuples as values.
+        """
+        definitions: Dict[str, ModuleDefinition] = {}
+        enabled_modules = global_modules_config.enabled_modules
+
+        # Insert externally managed modules
+        for external_module_source \
+                in global_modules_config.external_module_sources:
+            with profiler.measure('phases', 'module_sources'):
+                # Insert context defined in external configuration
+                module_context = external_module_source.context(
+                    context=context,
+                )
+                context.reverse_update(module_context)
+
+                module_configs = external_module_source.modules(
+                    context=context,
                 )
-                self.modules[module.name] = module
 
-        # Insert modules defined in `astrality.yml`
+            for module_name, module_config in module_configs.items():
+                if module_name in enabled_modules:
+                    definitions[module_name] = (
+                        module_config,
+                        external_module_source.directory,
+                    )
+
+        # Insert modules defined in `modules.yml`
         for module_name, module_config in modules.items():
-            # Check if this module should be included
-            if module_name not in self.global_modules_config.enabled_modules:
-                continue
+            if module_name in enabled_modules:
+                definitions[module_name] = (
+                    module_config,
+                    global_modules_config.config_directory,
+                )
 
-            if not Module.valid_module(
-                name=module_name,
+        return definitions
+
+    def insert_module(
+        self,
+        name: str,
+        module_config: ModuleConfigDict,
+        module_directory: Path,
+    ) -> None:
+        """
+        Insert module into managed modules if its requirements are satisfied.
+
+        :param name: Name of module.
+        :param module_config: Configuration dictionary of module.
+        :param module_directory: Directory used as anchor for relative paths.
+        """
+        start = time.perf_counter()
+        with profiler.measure('phases', 'requirements'), \
+                profiler.measure('modules', name):
+            valid = Module.valid_module(
+                name=name,
                 config=module_config,
                 requires_timeout=self.global_modules_config.requires_timeout,
-                requires_working_directory=self.config_directory,
-            ):
-                continue
+                requires_working_directory=module_directory,
+            )
+        self.startup_timings[name]['requires'] += time.perf_counter() - start
+        if not valid:
+            return
 
+        # Modules modify their configuration, keep the original for diffing
+        definition = (copy.deepcopy(module_config), module_directory)
+
+        start = time.perf_counter()
+        with profiler.measure('modules', name):
             module = Module(
-                name=module_name,
+                name=name,
                 module_config=module_config,
-                module_directory=self.config_directory,
+                module_directory=module_directory,
                 replacer=self.interpolate_string,
                 context_store=self.application_context,
                 global_modules_config=self.global_modules_config,
-                dry_run=dry_run,
+                dry_run=self.dry_run,
             )
-            self.modules[module.name] = module
-
-        # Remove modules which depends on other missing modules
-        Requirement.pop_missing_module_dependencies(self.modules)
-
-        # Initialize the config directory watcher, but don't start it yet
-        self.directory_watcher = DirectoryWatcher(
-            directory=self.config_directory,
-            on_modified=self.file_system_modified,
-        )
+        self.startup_timings[name]['initialize'] += \
+            time.perf_counter() - start
+        self.modules[module.name] = module
+        self.module_configs[module.name] = definition
+
+    def log_startup_timings(self) -> None:
+        """Log time spent by each module in each startup phase."""
+        lines = []
+        for module_name, timings in sorted(
+            self.startup_timings.items(),
+            key=lambda item: sum(item[1].values()),
+            reverse=True,
+        ):
+            phases = ', '.join(
+                f'{phase}={seconds * 1000:.1f}ms'
+                for phase, seconds
+                in timings.items()
+            )
+            total = sum(timings.values()) * 1000
+            lines.append(f'{module_name}: {total:.1f}ms ({phases})')
 
-        logger.info('Enabled modules: ' + ', '.join(self.modules.keys()))
+        logger.debug('Startup timings per module:\n' + '\n'.join(lines))
 
     def module_events(self) -> Dict[str, str]:
         """Return dict containing the event of all modules."""
-        module_events = {}
-        for module_name, module in self.modules.items():
-            module_events[module_name] = module.event_listener.event()
+        with self._reload_lock:
+            module_events = {}
+            for module_name, module in self.modules.items():
+                module_events[module_name] = module.event_listener.event()
 
-        return module_events
+            return module_events
 
     def finish_tasks(self) -> None:
         """
@@ -590,56 +926,67 @@ class ModuleManager:
             4) Run on_event commands, if it is not already done for this
                module events combination.
         """
-        if not self.startup_done:
-            # Save the last event configuration, such that on_event
-            # is only run when the event *changes*
-            self.last_module_events = self.module_events()
-
-            # Perform setup actions not yet executed
-            self.setup()
-
-            # Perform all startup actions
-            self.startup()
-        elif self.last_module_events != self.module_events():
-            # One or more module events have changed, execute the event blocks
-            # of these modules.
-
-            for module_name, event in self.module_events().items():
-                if not self.last_module_events[module_name] == event:
-                    logger.info(
-                        f'[module/{module_name}] New event "{event}". '
-                        'Executing actions.',
-                    )
-                    self.execute(
-                        action='all',
-                        block='on_event',
-                        module=self.modules[module_name],
-                    )
-                    self.last_module_events[module_name] = event
+        with self._reload_lock:
+            if not self.startup_done:
+                # Save the last event configuration, such that on_event
+                # is only run when the event *changes*
+                self.last_module_events = self.module_events()
+
+                # Adopted modules execute on_event if the event changed since
+                # the handoff
+                self.last_module_events.update(self.adopted_modules)
+
+                # Adopted modules skip their startup, but not context imports
+                self.import_adopted_context()
+
+                # Perform setup actions not yet executed
+                self.setup()
+
+                # Perform all startup actions
+                self.startup()
+            elif self.last_module_events != self.module_events():
+                # One or more module events have changed, execute the event
+                # blocks of these modules.
+                for module_name, event in self.module_events().items():
+                    if not self.last_module_events[module_name] == event:
+                        logger.info(
+                            f'[module/{module_name}] New event "{event}". '
+                            'Executing actions.',
+                        )
+                        self.execute(
+                            action='all',
+                            block='on_event',
+                            module=self.modules[module_name],
+                        )
+                        self.last_module_events[module_name] = event
+                        self.precompile_events(modules=[module_name])
 
     def has_unfinished_tasks(self) -> bool:
         """Return True if there are any module tasks due."""
-        if not self.startup_done:
-            return True
-        else:
-            return self.last_module_events != self.module_events()
+        with self._reload_lock:
+            if not self.startup_done:
+                return True
+            else:
+                return self.last_module_events != self.module_events()
 
     def time_until_next_event(self) -> timedelta:
         """Time left until first event change of any of the modules managed."""
-        try:
-            return min(
-                module.event_listener.time_until_next_event()
-                for module
-                in self.modules.values()
-            )
-        except ValueError:
-            return timedelta.max
+        with self._reload_lock:
+            try:
+                return min(
+                    module.event_listener.time_until_next_event()
+                    for module
+                    in self.modules.values()
+                )
+            except ValueError:
+                return timedelta.max
 
     def execute(
         self,
         action: str,
         block: str,
         module: Optional[Module] = None,
+        skip: Iterable[str] = (),
     ) -> None:
         """
         Execute action(s) specified in managed modules.
@@ -652,14 +999,23 @@ class ModuleManager:
         :param block: Action block to be executed, for example 'on_exit'.
         :module: Specific module to be executed. If not provided, then all
             managed modules will be executed.
+        :param skip: Names of modules which should not be executed.
         """
         assert block in ('on_setup', 'on_startup', 'on_event', 'on_exit')
 
-        modules: Iterable[Module]
+        modules: Dict[str, Module]
         if isinstance(module, Module):
-            modules = (module, )
+            modules = {module.name: module}
         else:
-            modules = self.modules.values()
+            modules = self.modules
+
+        if skip:
+            modules = {
+                name: module
+                for name, module
+                in modules.items()
+                if name not in skip
+            }
 
         if action == 'all':
             all_actions = filter(
@@ -669,30 +1025,116 @@ class ModuleManager:
         else:
             all_actions = (action,)  # type: ignore
 
+        # Modules are executed after the modules they depend on
+        graph = DependencyGraph({
+            name: module.depends_on
+            for name, module
+            in modules.items()
+        })
         for specific_action in all_actions:
-            for module in modules:
-                module.execute(
-                    action=specific_action,
-                    block=block,
-                    dry_run=self.dry_run,
-                )
+            def execute_module(name: str) -> None:
+                start = time.perf_counter()
+                with profiler.measure('modules', name):
+                    modules[name].execute(
+                        action=specific_action,
+                        block=block,
+                        dry_run=self.dry_run,
+                    )
+                if not self.startup_done:
+                    self.startup_timings[name][block] += \
+                        time.perf_counter() - start
+
+            # Context imports modify the shared context, and are sequential
+            graph.schedule(
+                function=execute_module,
+                workers=1 if specific_action == 'import_context'
+                else self.global_modules_config.parallel_modules,
+            )
+
+    def import_adopted_context(self) -> None:
+        """
+        Import context sections of adopted modules into the global context.
+
+        Only the import_context actions of the on_startup and on_event blocks
+        are executed, the latter with the current event of each module.
+        """
+        if not self.adopted_modules:
+            return
+
+        not_adopted = self.modules.keys() - self.adopted_modules.keys()
+        for block in ('on_startup', 'on_event'):
+            self.execute(
+                action='import_context',
+                block=block,
+                skip=not_adopted,
+            )
+
+    def recompile_adopted_templates(self) -> None:
+        """
+        Compile templates of adopted modules anew, using the current context.
+
+        All compilations restored from the previous process are recompiled,
+        regardless of the action block which performed them.
+        """
+        for name in self.adopted_modules:
+            module = self.modules.get(name)
+            if not module:
+                continue
+
+            for action_block in module.all_action_blocks():
+                if not action_block.constructed:
+                    continue
+
+                for compile_action in action_block._compile_actions:
+                    if compile_action.performed_compilations():
+                        compile_action.execute(dry_run=self.dry_run)
+
+                for stow_action in action_block._stow_actions:
+                    if stow_action.null_object:
+                        continue
+                    if stow_action.compile_action.performed_compilations():
+                        stow_action.execute(dry_run=self.dry_run)
 
     def setup(self) -> None:
         """
         Run setup actions specified by the managed modules, not yet executed.
         """
-        self.execute(action='all', block='on_setup')
+        with profiler.measure('phases', 'on_setup'):
+            self.execute(
+                action='all',
+                block='on_setup',
+                skip=self.adopted_modules,
+            )
 
     def startup(self):
         """
         Run all startup actions specified by the managed modules.
 
-        Also starts the directory watcher in $ASTRALITY_CONFIG_HOME.
+        Also starts the directory watcher in $ASTRALITY_CONFIG_HOME, and
+        pulls GitHub modules with autoupdate enabled in the background.
         """
         assert not self.startup_done
-        self.execute(action='all', block='on_startup')
+        with profiler.measure('phases', 'on_startup'):
+            self.execute(
+                action='all',
+                block='on_startup',
+                skip=self.adopted_modules,
+            )
+
+        if self.adopted_context_modified:
+            # Adopted modules were compiled with a different context
+            self.recompile_adopted_templates()
+
         self.directory_watcher.start()
         self.startup_done = True
+        self.precompile_events(modules=self.modules)
+
+        self.autoupdater = Autoupdater(
+            enabled_modules=self.global_modules_config.enabled_modules,
+            interval=self.global_modules_config.autoupdate_interval,
+            on_update=self.reload_module_source,
+        )
+        self.autoupdater.start()
 
     def exit(self):
         """
@@ -700,10 +1142,17 @@ class ModuleManager:
 
         Also close all temporary file handlers created by the modules.
         """
-        self.execute(action='all', block='on_exit')
-
-        # Stop watching config directory for file changes
+        # Background threads are stopped first, without holding the reload
+        # lock, as they might be waiting for it
         self.directory_watcher.stop()
+        if hasattr(self, 'autoupdater'):
+            self.autoupdater.stop()
+
+        with self._reload_lock:
+            self.execute(action='all', block='on_exit')
+            for module in self.modules.values():
+                if module.event_variants:
+                    module.event_variants.stop()
 
     def on_modified(self, modified: Path) -> bool:
         """
@@ -739,29 +1188,69 @@ class ModuleManager:
         Run any context imports, compilations, and shell commands specified
         within the on_modified event block of each module.
 
-        Also, if hot_reload is True, we reinstantiate the ModuleManager object
-        if the application configuration has been modified.
+        Also, if hot_reload is True, we reload the modules which are affected
+        by modifications to the application configuration or to module
+        sources.
         """
-        config_files = (
-            self.config_directory / 'astrality.yml',
-            self.config_directory / 'modules.yml',
-            self.config_directory / 'context.yml',
-        )
-
-        if modified in config_files:
-            logger.info(
-                f'$ASTRALITY_CONFIG_HOME/{modified.name} has been modified!',
+        with self._reload_lock:
+            config_files = (
+                self.config_directory / 'astrality.yml',
+                self.config_directory / 'modules.yml',
+                self.config_directory / 'context.yml',
             )
-            self.on_application_config_modified()
-            return
-        else:
+
+            if modified in config_files:
+                logger.info(
+                    f'$ASTRALITY_CONFIG_HOME/{modified.name} '
+                    'has been modified!',
+                )
+                self.on_application_config_modified()
+                return
+
+            for source in self.global_modules_config.external_module_sources:
+                if modified in (source.modules_file, source.context_file):
+                    logger.info(f'Module source file "{modified}" modified!')
+                    self.on_module_source_modified(source)
+                    return
+
             # Run any relevant on_modified blocks.
             triggered = self.on_modified(modified)
 
-        if not triggered:
-            # Check if the modified path is a template which is supposed to
-            # be recompiled.
-            self.recompile_modified_template(modified=modified)
+            if not triggered:
+                # Check if the modified path is a template which is supposed to
+                # be recompiled.
+                self.recompile_modified_template(modified=modified)
+
+    @property
+    def hot_reload_config(self) -> bool:
+        """Return True if the user has configured `hot_reload_config`."""
+        return self.application_config.get(
+            'astrality',
+            {},
+        ).get(
+            'hot_reload_config',
+            False,
+        )
+
+    def on_module_source_modified(self, source: ModuleSource) -> None:
+        """
+        Reload modules of source if its "modules.yml" or "context.yml" changes.
+
+        Reloading only occurs if the user has configured `hot_reload_config`.
+
+        :param source: Module source which has been modified.
+        """
+        if not self.hot_reload_config:
+            logger.info('"hot_reload" disabled.')
+            return
+
+        try:
+            self.reload_module_source(source)
+        except Exception:
+            # New module source configuration is invalid, keep the old one
+            logger.exception(
+                f'Modified module source "{source.directory}" is invalid!',
+            )
 
     def on_application_config_modified(self):
         """
@@ -770,65 +1259,455 @@ class ModuleManager:
         Reloadnig the module manager only occurs if the user has configured
         `hot_reload_config`.
         """
-        if not self.application_config.get(
-            'astrality',
-            {},
-        ).get(
-            'hot_reload_config',
-            False,
-        ):
+        if not self.hot_reload_config:
             # Hot reloading is not enabled, so we return early
             logger.info('"hot_reload" disabled.')
             return
 
         # Hot reloading is enabled, get the new configuration dict
         logger.info('Reloading $ASTRALITY_CONFIG_HOME...')
-        (
-            new_application_config,
-            new_modules,
-            new_context,
-            directory,
-        ) = user_configuration(
-            config_directory=self.config_directory,
-        )
-
         try:
-            # Reinstantiate this object
-            new_module_manager = ModuleManager(
+            (
+                new_application_config,
+                new_modules,
+                new_context,
+                directory,
+            ) = user_configuration(
+                config_directory=self.config_directory,
+            )
+            self.reload(
                 config=new_application_config,
                 modules=new_modules,
                 context=new_context,
-                directory=directory,
             )
+        except Exception:
+            # New configuration is invalid, just keep the old one
+            logger.exception('New configuration detected, but it is invalid!')
 
-            # Run all old exit actions, since the new config is valid
-            self.exit()
+    def reload(
+        self,
+        config: AstralityYAMLConfigDict,
+        modules: Dict[str, ModuleConfigDict],
+        context: Context,
+    ) -> None:
+        """
+        Replace configuration of managed modules.
 
-            # Swap place with the new configuration
-            self = new_module_manager
+        Only modules with modified configurations are exited and started anew,
+        while unchanged modules keep running. All modules are restarted if
+        global modules options other than `enabled_modules` change.
 
-            # Run startup commands from the new configuration
-            self.finish_tasks()
-        except Exception:
-            # New configuration is invalid, just keep the old one
-            # TODO: Test this behaviour
-            logger.error('New configuration detected, but it is invalid!')
-            pass
+        :param config: New global configuration options.
+        :param modules: New dictionary containing globally defined modules.
+        :param context: New global context.
+        """
+        global_modules_config = GlobalModulesConfig(
+            config=config.get('modules', {}),
+            config_directory=self.config_directory,
+        )
+        definitions = self.module_definitions(
+            modules=modules,
+            global_modules_config=global_modules_config,
+            context=context,
+        )
+
+        restart_all = self.restarting_options(self.application_config) \
+            != self.restarting_options(config)
+
+        removed = [
+            name
+            for name
+            in self.modules
+            if restart_all
+            or self.module_configs.get(name) != definitions.get(name)
+        ]
+        inserted = {
+            name: definition
+            for name, definition
+            in definitions.items()
+            if restart_all
+            or name not in self.modules
+            or self.module_configs.get(name) != definition
+        }
+
+        # Kept modules persist their creations through the existing store, so
+        # it is shared with the new configuration instead of being replaced
+        created_files = self.global_modules_config.created_files
+        created_files.archive_backups = global_modules_config.archive_backups
+        global_modules_config.created_files = created_files
+
+        self.application_config = config
+        self.global_modules_config = global_modules_config
+        self.reprocess_modified_files = \
+            global_modules_config.reprocess_modified_files
+
+        # Update context in place, as it is shared with all actions
+        context_modified = context != self.configured_context
+        self.application_context.update(context)
+        self.configured_context = context.copy()
 
-    def recompile_modified_template(self, modified: Path):
+        self.replace_modules(removed=removed, inserted=inserted)
+
+        if context_modified:
+            self.recompile_templates(skip=inserted)
+
+        if hasattr(self, 'autoupdater'):
+            self.autoupdater.stop()
+            self.autoupdater = Autoupdater(
+                enabled_modules=global_modules_config.enabled_modules,
+                interval=global_modules_config.autoupdate_interval,
+                on_update=self.reload_module_source,
+            )
+            self.autoupdater.start()
+
+        logger.info(
+            f'Reloaded {len(inserted)} module(s), '
+            f'removed {len(set(removed) - set(inserted))} module(s), '
+            f'kept {len(self.modules) - len(inserted)} module(s).',
+        )
+
+    @staticmethod
+    def restarting_options(
+        config: AstralityYAMLConfigDict,
+    ) -> Dict[str, Any]:
+        """
+        Return global modules options which restart all modules when modified.
+
+        :param config: Global configuration options.
+        :return: Dictionary with all modules options except `enabled_modules`.
+        """
+        options: Dict[str, Any] = {
+            **ASTRALITY_DEFAULT_GLOBAL_SETTINGS['modules'],
+            **config.get('modules', {}),
+        }
+        options.pop('enabled_modules')
+        return options
+
+    def fingerprints(self) -> Dict[str, str]:
+        """
+        Return fingerprint of the configuration of each managed module.
+
+        Fingerprints are equal across processes if, and only if, the module
+        configurations and the options returned by :meth:`restarting_options`
+        are equal.
+
+        :return: Dictionary with module names as keys and hexdigests as values.
+        """
+        options = self.restarting_options(self.application_config)
+        return {
+            name: fingerprint((options, self.module_configs[name]))
+            for name
+            in self.modules
+        }
+
+    def hand_off(self, fingerprints: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Hand off modules to a new process, and stop managing any modules.
+
+        Modules with fingerprints equal to those of the new process are kept
+        running, while all other modules execute their on_exit blocks.
+
+        :param fingerprints: Module fingerprints of the new process, as
+            returned by :meth:`fingerprints`.
+        :return: State which can be adopted by the new process with
+            :meth:`adopt`, serializable as JSON.
+        """
+        with self._reload_lock:
+            kept = {
+                name: digest
+                for name, digest
+                in self.fingerprints().items()
+                if fingerprints.get(name) == digest
+            }
+            children = psutil.Process().children(recursive=False)
+            children.extend(
+                process
+                for process
+                in self.adopted_processes
+                if process.is_running()
+            )
+            state = {
+                'pid': os.getpid(),
+                'fingerprints': kept,
+                'context': fingerprint(self.configured_context),
+                'events': {
+                    name: self.last_module_events.get(
+                        name,
+                        self.modules[name].event_listener.event(),
+                    )
+                    for name
+                    in kept
+                },
+                'compilations': {
+                    name: self.modules[name].compilation_records()
+                    for name
+                    in kept
+                },
+                'processes': [
+                    {'pid': process.pid, 'create_time': process.create_time()}
+                    for process
+                    in children
+                ],
+            }
+
+            logger.info(
+                f'Handing off {len(kept)} module(s), exiting '
+                f'{len(self.modules) - len(kept)} module(s).',
+            )
+            self.execute(action='all', block='on_exit', skip=kept)
+            self.modules = {}
+            self.module_configs = {}
+            self.last_module_events = {}
+
+            self.directory_watcher.stop()
+            if hasattr(self, 'autoupdater'):
+                self.autoupdater.stop()
+
+            return state
+
+    def adopt(self, state: Dict[str, Any]) -> None:
+        """
+        Adopt modules handed off by a previous process.
+
+        Adopted modules skip their setup and startup actions, except for
+        context imports, and execute on_event blocks only if their event has
+        changed since the handoff.
+        Modules are only adopted if their configuration is unchanged, and all
+        their compilation targets still exist.
+
+        :param state: State returned by :meth:`hand_off` in the previous
+            process.
+        """
+        assert not self.startup_done
+        fingerprints = self.fingerprints()
+        for name, digest in state['fingerprints'].items():
+            if fingerprints.get(name) != digest:
+                continue
+
+            records = state['compilations'][name]
+            if not all(
+                Path(target).exists()
+                for *_, targets in records
+                for target in targets
+            ):
+                continue
+
+            self.modules[name].restore_compilations(records)
+            self.adopted_modules[name] = state['events'][name]
+
+        self.adopted_context_modified = \
+            state['context'] != fingerprint(self.configured_context)
+
+        for process_info in state['processes']:
+            try:
+                process = psutil.Process(pid=process_info['pid'])
+                if process.create_time() == process_info['create_time']:
+                    self.adopted_processes.append(process)
+            except psutil.Error:
+                continue
+
+        logger.info(
+            f'Adopted {len(self.adopted_modules)} module(s) and '
+            f'{len(self.adopted_processes)} process(es) from the previous '
+            f'Astrality process.',
+        )
+
+    def replace_modules(
+        self,
+        removed: Iterable[str],
+        inserted: Dict[str, ModuleDefinition],
+    ) -> None:
+        """
+        Exit and remove modules, and insert and start new modules.
+
+        :param removed: Names of managed modules to be exited and removed.
+        :param inserted: Definitions of modules to be inserted, and started if
+            startup has already been done.
+        """
+        for name in removed:
+            module = self.modules.pop(name, None)
+            self.module_configs.pop(name, None)
+            self.last_module_events.pop(name, None)
+            if module:
+                self.execute(action='all', block='on_exit', module=module)
+                if module.event_variants:
+                    module.event_variants.stop()
+
+        for name, (module_config, module_directory) in inserted.items():
+            self.insert_module(
+                name=name,
+                module_config=module_config,
+                module_directory=module_directory,
+            )
+
+        # Exit modules which depend on removed or invalid modules
+        previous_modules = dict(self.modules)
+        Requirement.pop_missing_module_dependencies(self.modules)
+        for name, module in previous_modules.items():
+            if name in self.modules:
+                continue
+
+            self.module_configs.pop(name, None)
+            self.last_module_events.pop(name, None)
+            if name not in inserted and self.startup_done:
+                self.execute(action='all', block='on_exit', module=module)
+
+        if not self.startup_done:
+            return
+
+        for name in inserted:
+            if name not in self.modules:
+                continue
+
+            module = self.modules[name]
+            self.last_module_events[name] = module.event_listener.event()
+            self.execute(action='all', block='on_setup', module=module)
+            self.execute(action='all', block='on_startup', module=module)
+            self.precompile_events(modules=[name])
+
+    def precompile_events(self, modules: Iterable[str]) -> None:
+        """
+        Render templates for upcoming events in the background.
+
+        Only modules with `precompile_events: true` are affected.
+
+        :param modules: Names of managed modules.
+        """
+        for name in modules:
+            event_variants = self.modules[name].event_variants
+            if event_variants:
+                event_variants.start()
+
+    def reload_module(self, name: str) -> None:
+        """
+        Exit managed module and start it anew with its current configuration.
+
+        :param name: Name of managed module.
+        """
+        with self._reload_lock:
+            module_config, module_directory = self.module_configs[name]
+            self.replace_modules(
+                removed=[name],
+                inserted={
+                    name: (copy.deepcopy(module_config), module_directory),
+                },
+            )
+
+    def recompile_templates(self, skip: Iterable[str] = ()) -> None:
+        """
+        Compile templates of started modules anew, using the current context.
+
+        :param skip: Names of modules which should not be recompiled.
+        """
+        if not self.startup_done:
+            return
+
+        for name, module in self.modules.items():
+            if name in skip:
+                continue
+
+            for action in ('compile', 'stow'):
+                self.execute(action=action, block='on_startup', module=module)
+
+    def reload_module_source(self, source: ModuleSource) -> None:
+        """
+        Replace modules defined in module source with its current definition.
+
+        Modules which have been removed or modified are exited, while new and
+        modified modules are set up and started. Unchanged modules are kept
+        running as is.
+
+        :param source: Module source which should be compiled anew. All
+            enabled sources sharing its directory are reloaded.
+        """
+        with self._reload_lock:
+            logger.info(f'Reloading modules defined in "{source.directory}".')
+            enabled_modules = self.global_modules_config.enabled_modules
+            sources = self.global_modules_config.external_module_sources
+            for module_source in sources:
+                if module_source.directory != source.directory:
+                    continue
+
+                cached = {
+                    attribute: value
+                    for attribute, value
+                    in vars(module_source).items()
+                    if attribute in ('_modules', '_context', '_config')
+                }
+                old_modules = cached.get('_modules', {})
+                old_context = cached.get('_context', Context())
+                module_source.reset()
+
+                try:
+                    # Context keys already defined elsewhere take precedence
+                    new_context = module_source.context(
+                        context=self.application_context,
+                    )
+                    for key, value in new_context.items():
+                        if key in old_context \
+                                or key not in self.application_context:
+                            self.application_context[key] = value
+
+                    new_modules = module_source.modules(
+                        context=self.application_context,
+                    )
+                except Exception:
+                    # Keep using the previous configuration of the module source
+                    vars(module_source).update(cached)
+                    raise
+
+                context_modified = new_context != old_context
+                definitions = {
+                    name: (module_config, module_source.directory)
+                    for name, module_config
+                    in new_modules.items()
+                    if name in enabled_modules
+                }
+                inserted = {
+                    name: definition
+                    for name, definition
+                    in definitions.items()
+                    if self.module_configs.get(name) != definition
+                }
+                self.replace_modules(
+                    removed=[
+                        name
+                        for name
+                        in old_modules
+                        if name in self.modules
+                        and self.module_configs.get(name)
+                        != definitions.get(name)
+                    ],
+                    inserted=inserted,
+                )
+                if context_modified:
+                    self.recompile_templates(skip=inserted)
+
+    def recompile_modified_template(
+        self,
+        modified: Path,
+        force: bool = False,
+    ) -> None:
         """
         Recompile any modified template if configured.
 
         This requires setting the global setting:
         reprocess_modified_files: true
+
+        :param modified: Path to modified template.
+        :param force: Recompile regardless of `reprocess_modified_files`.
         """
-        if not self.reprocess_modified_files:
+        if not self.reprocess_modified_files and not force:
             return
 
         # Run any compile action a new if that compile action uses the modifed
         # path as a template.
         for module in self.modules.values():
             for action_block in module.all_action_blocks():
+                if not action_block.constructed:
+                    # The action block has never been executed
+                    continue
+
                 for compile_action in action_block._compile_actions:
                     if modified in compile_action:
                         compile_action.execute(dry_run=self.dry_run)
@@ -860,15 +1739,38 @@ class ModuleManager:
     @property
     def keep_running(self) -> bool:
         """Return True if ModuleManager needs to keep running."""
-        if self.reprocess_modified_files:
-            return True
+        with self._reload_lock:
+            if self.reprocess_modified_files:
+                return True
+
+            if any(module.keep_running for module in self.modules.values()):
+                return True
+
+            current_process = psutil.Process()
+            children = current_process.children(recursive=False)
+            if children:
+                return True
+
+            return any(
+                process.is_running()
+                for process
+                in self.adopted_processes
+            )
 
-        if any(module.keep_running for module in self.modules.values()):
-            return True
+    def enable_metrics(self) -> tracing.ActionMetrics:
+        """
+        Start aggregating statistics of executed actions.
 
-        current_process = psutil.Process()
-        children = current_process.children(recursive=False)
-        return bool(children)
+        Actions are only traced while metrics or other tracing hooks are
+        enabled, as tracing is skipped altogether otherwise.
+
+        :return: ActionMetrics object, which is the same for repeated calls.
+        """
+        if self.action_metrics is None:
+            self.action_metrics = tracing.ActionMetrics()
+            tracing.hooks.register(self.action_metrics)
+
+        return self.action_metrics
 
     def __len__(self) -> int:
         """Return the number of managed modules."""
@@ -876,5 +1778,12 @@ class ModuleManager:
 
     def __del__(self) -> None:
         """Close filesystem watcher if enabled."""
+        action_metrics = getattr(self, 'action_metrics', None)
+        if action_metrics is not None:
+            tracing.hooks.unregister(action_metrics)
+
         if hasattr(self, 'directory_watcher'):
             self.directory_watcher.stop()
+
+        if hasattr(self, 'autoupdater'):
+            self.autoupdater.stop()
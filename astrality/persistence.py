@@ -1,17 +1,32 @@
 """Module which keeps track of module setup block actions and created files."""
 
+import errno
 import hashlib
+import itertools
 import logging
+import math
 import os
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, cast
 
 from mypy_extensions import TypedDict
 
-from astrality import actions, utils
+from astrality import utils
 from astrality.xdg import XDG
 
+# Default number of files cleaned up concurrently
+CLEANUP_WORKERS = 8
+
+# Maximum number of files removed from created_files.yml with a single write
+CLEANUP_BATCH_SIZE = 32
+
 
 class CreationMethod(Enum):
     """Ways modules can create files."""
@@ -32,9 +47,12 @@ class CreationInfo(TypedDict):
     # Set to None if PermissionError
     hash: Optional[str]
 
-    # Possible backup of replaced existing file
+    # Possible backup of replaced existing file, or archive containing it
     backup: Optional[str]
 
+    # Name of backup within archive, only present for archived backups
+    member: str
+
 
 # Contents of $XDG_DATA_HOME/astrality/created_files.yml.
 # Example: {'module_name': {'/created/file': {...}, '/another/file': {...}}}
@@ -42,7 +60,15 @@ CreationsYAML = Dict[str, Dict[str, CreationInfo]]
 
 
 class CreatedFiles:
-    """Object which persists which files that have been created by modules."""
+    """
+    Object which persists which files that have been created by modules.
+
+    Modules might create files concurrently, so all access to
+    :attr:`creations` and the persisted file is serialized.
+
+    :param archive_backups: If True, files backed up together are packed into
+        a single compressed tar archive.
+    """
 
     # Dictionary read from created_files.yml containing files created by modules
     creations: CreationsYAML
@@ -50,9 +76,11 @@ class CreatedFiles:
     # Path to file containing module created files
     _path: Path
 
-    def __init__(self) -> None:
+    def __init__(self, archive_backups: bool = False) -> None:
         """Constuct CreatedFiles object."""
         self.creations = utils.load_yaml(path=self.path)
+        self.archive_backups = archive_backups
+        self._lock = threading.RLock()
 
     def wrapper_for(self, module: str) -> 'ModuleCreatedFiles':
         """
@@ -87,6 +115,8 @@ class CreatedFiles:
         creation_method: CreationMethod,
         contents: Iterable[Path],
         targets: Iterable[Path],
+        write: bool = True,
+        hashes: Optional[Iterable[Optional[str]]] = None,
     ) -> None:
         """
         Insert files created by a module.
@@ -95,37 +125,57 @@ class CreatedFiles:
         :param creation_method: Type of action which has created the file.
         :param contents: The source files used in creating the files.
         :param targets: The files that have be created.
+        :param write: If False, changes are not persisted before the next call
+            to :meth:`write`.
+        :param hashes: MD5 hexdigests of the created files, in the same order
+            as targets. Files without a known hash are read and hashed.
         """
         # We do not want to insert empty sections, to reduce reduntant clutter
         if not contents:
             return
 
-        modified = False
-        module_section = self.creations.setdefault(module, {})
-
-        for content, target in zip(contents, targets):
-            # Do not insert files that actually do not exist
-            if not target.exists():
-                continue
-
-            creation = module_section.setdefault(
-                str(target),
-                {},  # type: ignore
-            )
-            if creation.get('content') != str(content):
-                modified = True
-                creation['content'] = str(content)
-                creation['method'] = creation_method.value
-                creation.setdefault('backup', None)  # type: ignore
-
-                try:
-                    creation['hash'] = hashlib.md5(
-                        target.read_bytes(),
-                    ).hexdigest()
-                except PermissionError:
-                    creation['hash'] = None
+        if hashes is None:
+            hashes = itertools.repeat(None)
+
+        with self._lock:
+            modified = False
+            module_section = self.creations.setdefault(module, {})
+            for content, target, content_hash \
+                    in zip(contents, targets, hashes):
+                # Do not insert files that actually do not exist
+                if not target.exists():
+                    continue
+
+                creation = module_section.setdefault(
+                    str(target),
+                    {},  # type: ignore
+                )
+                if creation.get('content') != str(content):
+                    modified = True
+                    creation['content'] = str(content)
+                    creation['method'] = creation_method.value
+                    creation.setdefault('backup', None)  # type: ignore
+                elif creation_method is CreationMethod.SYMLINK:
+                    # Recreated symlinks have identical content
+                    continue
+
+                # Hashes are kept up to date, as cleanup compares against them
+                if not content_hash:
+                    try:
+                        content_hash = utils.file_hash(target)
+                    except PermissionError:
+                        content_hash = None
+
+                if 'hash' not in creation or creation['hash'] != content_hash:
+                    modified = True
+                    creation['hash'] = content_hash
+
+            if modified and write:
+                self.write()
 
-        if modified:
+    def write(self) -> None:
+        """Persist all file creations to disk."""
+        with self._lock:
             utils.dump_yaml(data=self.creations, path=self.path)
 
     def by(self, module) -> List[Path]:
@@ -135,80 +185,336 @@ class CreatedFiles:
         :param module: Name of module.
         :return: List of paths to created files.
         """
-        return [
-            Path(creation)
-            for creation
-            in self.creations.get(module, {}).keys()
-        ]
-
-    def cleanup(self, module: str, dry_run: bool = False) -> None:
+        with self._lock:
+            return [
+                Path(creation)
+                for creation
+                in self.creations.get(module, {}).keys()
+            ]
+
+    def cleanup(
+        self,
+        module: str,
+        dry_run: bool = False,
+        workers: int = CLEANUP_WORKERS,
+    ) -> None:
         """
-        Delete files created by module.
+        Delete files created by module, restoring any backups.
+
+        Files are deleted concurrently in batches, and each batch is removed
+        from the record as soon as it has been cleaned up, such that an
+        interrupted cleanup resumes where it left off. Files which have been
+        modified since they were created, according to their recorded MD5
+        hash, are left alone together with their backups, and remain recorded
+        as created by the module.
 
         :param module: Name of module, file creation of which will be deleted.
         :param dry_run: If True, no files will be deleted, only logging will
             occur.
+        :param workers: Maximum number of files cleaned up concurrently.
         """
         logger = logging.getLogger(__name__)
-        module_creations = self.creations.get(module, {})
-        for creation, info in module_creations.items():
-            creation_method = info['method']
-            content = info['content']
-            backup = info['backup']
-            log_msg = (
-                f'[Cleanup] Deleting "{creation}" '
-                f'({creation_method} content from "{content}"). '
-                f'Backup replacement: {backup}.'
-            )
-            if dry_run:
-                logger.info('SKIPPED: ' + log_msg)
-                continue
+        with self._lock:
+            module_creations = dict(self.creations.get(module, {}))
+        if dry_run:
+            for creation, info in module_creations.items():
+                logger.info('SKIPPED: ' + self._cleanup_message(creation, info))
+            return
 
-            creation_path = Path(creation)
-            if creation_path.exists():
-                logger.info(log_msg)
-                creation_path.unlink()
-            else:
-                logger.info(log_msg + ' [No longer exists!]')
-
-            if backup and Path(backup).exists():
-                utils.move(  # type: ignore
-                    source=info['backup'],
-                    destination=creation,
-                    follow_symlinks=False,
+        # Archived backups are grouped, such that each archive is read once
+        tasks: Dict[Optional[str], List[str]] = {}
+        for creation, info in module_creations.items():
+            archive = info['backup'] if 'member' in info else None
+            tasks.setdefault(archive, []).append(creation)
+
+        workers = max(workers, 1)
+        files = tasks.pop(None, [])
+        batch_size = min(
+            CLEANUP_BATCH_SIZE,
+            max(math.ceil(len(files) / workers), 1),
+        )
+        groups = [
+            files[index:index + batch_size]
+            for index
+            in range(0, len(files), batch_size)
+        ]
+        groups.extend(tasks.values())
+
+        def clean(creations: List[str]) -> None:
+            cleaned: List[str] = []
+            try:
+                self._cleanup_files(
+                    creations={
+                        creation: module_creations[creation]
+                        for creation
+                        in creations
+                    },
+                    cleaned=cleaned,
                 )
+            finally:
+                if cleaned:
+                    with self._lock:
+                        module_section = self.creations.get(module, {})
+                        for creation in cleaned:
+                            module_section.pop(creation, None)
+                        if not module_section:
+                            self.creations.pop(module, None)
+                        self.write()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Consumed in order to raise any exceptions
+            list(executor.map(clean, groups))
+
+        # Archives only contain backups of a single module
+        with self._lock:
+            kept = {
+                info['backup']
+                for info
+                in self.creations.get(module, {}).values()
+            }
+        for info in module_creations.values():
+            archive = info['backup']
+            if 'member' in info and archive and archive not in kept \
+                    and os.path.exists(archive):
+                os.remove(archive)
+
+    def _cleanup_files(
+        self,
+        creations: Dict[str, CreationInfo],
+        cleaned: List[str],
+    ) -> None:
+        """
+        Delete created files and restore their backups.
 
-        if not dry_run:
-            self.creations.pop(module, None)
-            utils.dump_yaml(data=self.creations, path=self.path)
+        All archived backups must be contained in the same archive.
+
+        :param creations: Dictionary with created files and their information.
+        :param cleaned: List which files are appended to as soon as they have
+            been cleaned up, excluding modified files.
+        """
+        logger = logging.getLogger(__name__)
+        tar = None
+        try:
+            for creation, info in creations.items():
+                creation_path = Path(creation)
+                if not self._unmodified(path=creation_path, info=info):
+                    logger.warning(
+                        f'[Cleanup] Skipping "{creation}", as it has been '
+                        f'modified since it was created. '
+                        f'Backup: {info["backup"]}.',
+                    )
+                    continue
+
+                log_msg = self._cleanup_message(creation, info)
+                if os.path.lexists(creation):
+                    logger.info(log_msg)
+                    creation_path.unlink()
+                else:
+                    logger.info(log_msg + ' [No longer exists!]')
+
+                backup = info['backup']
+                if not backup or not os.path.exists(backup):
+                    cleaned.append(creation)
+                    continue
+
+                if 'member' in info:
+                    if tar is None:
+                        tar = tarfile.open(backup)
+
+                    # Archives are created by Astrality, and trusted as such
+                    options: Dict[str, Any] = {'filter': 'fully_trusted'} \
+                        if hasattr(tarfile, 'fully_trusted_filter') else {}
+                    member = tar.getmember(info['member'])
+                    member.name = creation_path.name
+                    tar.extract(
+                        member,
+                        path=str(creation_path.parent),
+                        **options,
+                    )
+                else:
+                    utils.move(
+                        source=backup,
+                        destination=creation,
+                        follow_symlinks=False,
+                    )
+                cleaned.append(creation)
+        finally:
+            if tar is not None:
+                tar.close()
+
+    @staticmethod
+    def _unmodified(path: Path, info: CreationInfo) -> bool:
+        """
+        Return True if created file is unmodified since it was created.
+
+        Files which can not be hashed, or lack a recorded hash, are regarded
+        as unmodified.
 
-    def backup(self, module: str, path: Path) -> Optional[Path]:
+        :param path: Path to created file.
+        :param info: Information recorded for created file.
+        """
+        if not os.path.lexists(path):
+            return True
+
+        if info.get('method') == CreationMethod.SYMLINK.value:
+            # The content of symlinks belongs to the module
+            return path.is_symlink()
+
+        recorded_hash = info.get('hash')
+        if not recorded_hash or path.is_symlink() or not path.is_file():
+            return True
+
+        try:
+            return utils.file_hash(path) == recorded_hash
+        except PermissionError:
+            return True
+
+    @staticmethod
+    def _cleanup_message(creation: str, info: CreationInfo) -> str:
+        """Return log message for cleanup of created file."""
+        # Backups are persisted before the files replacing them
+        return (
+            f'[Cleanup] Deleting "{creation}" '
+            f'({info.get("method", "not")} content from '
+            f'"{info.get("content")}"). '
+            f'Backup replacement: {info["backup"]}.'
+        )
+
+    def backup(
+        self,
+        module: str,
+        path: Path,
+        write: bool = True,
+    ) -> Optional[Path]:
         """
         Take backup of path if it exists and is not created by Astrality.
 
         :param module: Module requesting file to be backed up.
         :param path: Path to file to back up.
-        :return: Optional path to backup file.
+        :param write: If False, the backup is not persisted before the next
+            call to :meth:`write`.
+        :return: Optional path to backup file, or to the archive containing
+            it.
         """
-        if path in self or not path.exists():
-            return None
-
-        filepath_hash = hashlib.md5(
-            str(path).encode('utf-8'),
-        ).hexdigest()[:7]
-        backup_filename = path.name + '-' + filepath_hash
-        backup = XDG().data(f'backups/{module}/{backup_filename}')
-        utils.move(
-            source=path,
-            destination=backup,
-            follow_symlinks=False,
+        return self.backup_all(module=module, paths=[path], write=write).get(
+            path,
         )
 
-        self.creations.setdefault(module, {})[str(path)] = {  # type: ignore
-            'backup': str(backup),
+    def backup_all(
+        self,
+        module: str,
+        paths: Iterable[Path],
+        write: bool = True,
+    ) -> Dict[Path, Path]:
+        """
+        Take backups of all paths which exist and are not created by Astrality.
+
+        All backups are planned up front and persisted at once. Files are
+        renamed into the backup directory, and only copied if they reside on
+        another file system. If `archive_backups` is enabled, the files are
+        packed into a single compressed tar archive instead.
+
+        :param module: Module requesting files to be backed up.
+        :param paths: Paths to files to back up.
+        :param write: If False, the backups are not persisted before the next
+            call to :meth:`write`.
+        :return: Dictionary with backed up paths as keys, and backup files, or
+            the archive containing them, as values.
+        """
+        created: Set[str] = set()
+        with self._lock:
+            for module_creations in self.creations.values():
+                created.update(module_creations)
+
+        planned = [
+            path
+            for path
+            in dict.fromkeys(paths)
+            if str(path) not in created and path.exists()
+        ]
+        if not planned:
+            return {}
+
+        directory = XDG().data(f'backups/{module}', directory=True)
+        names = {
+            path: path.name + '-' + hashlib.md5(
+                str(path).encode('utf-8'),
+            ).hexdigest()[:7]
+            for path
+            in planned
         }
-        utils.dump_yaml(data=self.creations, path=self.path)
-        return backup
+        # Directories are never archived, as their contents might be large
+        archived = [
+            path
+            for path
+            in planned
+            if self.archive_backups and (path.is_symlink() or path.is_file())
+        ]
+        backups: Dict[Path, Path] = {}
+        if archived:
+            archive = self._archive(directory=directory, names={
+                path: names[path]
+                for path
+                in archived
+            })
+            for path in archived:
+                backups[path] = archive
+
+        for path in planned:
+            if path in backups:
+                continue
+
+            backup = directory / names[path]
+            try:
+                os.rename(str(path), str(backup))
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    raise
+
+                utils.move(
+                    source=path,
+                    destination=backup,
+                    follow_symlinks=False,
+                )
+
+            backups[path] = backup
+
+        with self._lock:
+            module_section = self.creations.setdefault(module, {})
+            for path, backup in backups.items():
+                info: Dict[str, str] = {'backup': str(backup)}
+                if path in archived:
+                    info['member'] = names[path]
+                module_section[str(path)] = cast(CreationInfo, info)
+
+            if write:
+                self.write()
+        return backups
+
+    @staticmethod
+    def _archive(directory: Path, names: Dict[Path, str]) -> Path:
+        """
+        Move files into new compressed tar archive.
+
+        :param directory: Directory to place archive in.
+        :param names: Dictionary with files as keys and their names within the
+            archive as values.
+        :return: Path to archive.
+        """
+        file_descriptor, archive = tempfile.mkstemp(
+            dir=str(directory),
+            prefix=time.strftime('%Y%m%dT%H%M%S-'),
+            suffix='.tar.gz',
+        )
+        with open(file_descriptor, 'wb') as archive_file, \
+                tarfile.open(fileobj=archive_file, mode='w:gz') as tar:
+            for path, name in names.items():
+                tar.add(str(path), arcname=name, recursive=False)
+
+        for path in names:
+            path.unlink()
+
+        return Path(archive)
 
     def __contains__(self, path) -> bool:
         """Return True if path has been created by Astrality."""
@@ -223,6 +529,131 @@ class CreatedFiles:
         return f'CreatedFiles(path={self.path})'
 
 
+class CompilationStore:
+    """
+    Content addressed store of compiled templates.
+
+    Templates compiled without an explicit target are compiled to a path
+    determined by the action options. Identical compilations from different
+    actions are stored only once, named by the MD5 hexdigest of their content
+    and their file mode, and the compilation targets are hard links to the
+    stored file.
+
+    Stored files are referenced by the files recorded in :class:`CreatedFiles`
+    which link to them, and are deleted by :meth:`collect_garbage` when no
+    longer referenced.
+
+    :param directory: Directory of stored files. Defaults to
+        $XDG_DATA_HOME/astrality/store.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        """Construct compilation store object."""
+        self.directory = directory or XDG().data(
+            resource='store',
+            directory=True,
+        )
+
+    def add(
+        self,
+        target: Path,
+        content_hash: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        Store compiled target, replacing it with a link to identical content.
+
+        :param target: Path to compiled file.
+        :param content_hash: MD5 hexdigest of target, if already known.
+        :return: Path to stored file, or None if the file system does not
+            support hard links.
+        """
+        if content_hash is None:
+            content_hash = hashlib.md5(target.read_bytes()).hexdigest()
+
+        mode = stat.S_IMODE(target.stat().st_mode)
+        stored = self.directory / f'{content_hash}-{mode:o}'
+        try:
+            if not stored.exists():
+                os.link(str(target), str(stored))
+            elif not os.path.samefile(str(stored), str(target)):
+                # Link to a temporary name first, as target must never be
+                # missing
+                temporary = target.with_name(
+                    f'.{target.name}.{os.getpid()}.link',
+                )
+                if temporary.exists():
+                    temporary.unlink()
+                os.link(str(stored), str(temporary))
+                os.replace(str(temporary), str(target))
+        except OSError as error:
+            logger = logging.getLogger(__name__)
+            logger.debug(f'Could not store "{target}": {error}')
+            return None
+
+        return stored
+
+    def reference_counts(self, created_files: CreatedFiles) -> Dict[Path, int]:
+        """
+        Return number of created files linking to each stored file.
+
+        :param created_files: Files created by modules.
+        :return: Dictionary with stored file keys and reference count values.
+        """
+        stored_files = {
+            (stats.st_dev, stats.st_ino): stored
+            for stored, stats
+            in ((stored, stored.stat()) for stored in self.directory.iterdir())
+        }
+        counts = dict.fromkeys(stored_files.values(), 0)
+        for module_creations in created_files.creations.values():
+            for creation in module_creations:
+                try:
+                    stats = os.stat(creation)
+                except OSError:
+                    continue
+
+                stored = stored_files.get((stats.st_dev, stats.st_ino))
+                if stored:
+                    counts[stored] += 1
+
+        return counts
+
+    def collect_garbage(
+        self,
+        created_files: CreatedFiles,
+        dry_run: bool = False,
+    ) -> List[Path]:
+        """
+        Delete stored files which are no longer referenced by created files.
+
+        :param created_files: Files created by modules.
+        :param dry_run: If True, no files will be deleted, only logging will
+            occur.
+        :return: List of unreferenced stored files.
+        """
+        logger = logging.getLogger(__name__)
+        unreferenced = sorted(
+            stored
+            for stored, count
+            in self.reference_counts(created_files=created_files).items()
+            if not count
+        )
+        for stored in unreferenced:
+            log_msg = f'[Garbage collection] Deleting unreferenced "{stored}".'
+            if dry_run:
+                logger.info('SKIPPED: ' + log_msg)
+                continue
+
+            logger.info(log_msg)
+            stored.unlink()
+
+        return unreferenced
+
+    def __repr__(self) -> str:
+        """Return string representation of CompilationStore object."""
+        return f'CompilationStore(directory={self.directory})'
+
+
 class ModuleCreatedFiles:
     """Wrapper Class for managing created files by specific module."""
 
@@ -236,20 +667,44 @@ class ModuleCreatedFiles:
         self.module = module
         self.creation_store = creation_store
 
-    def backup(self, path: Path) -> Optional[Path]:
+    def backup(self, path: Path, write: bool = True) -> Optional[Path]:
         """
         Backup path if not created by Astrality.
 
         :param path: Path to file to be backed up.
+        :param write: If False, postpone persisting the backup.
         :return: Optional path to backup.
         """
-        return self.creation_store.backup(module=self.module, path=path)
+        return self.creation_store.backup(
+            module=self.module,
+            path=path,
+            write=write,
+        )
+
+    def backup_all(
+        self,
+        paths: Iterable[Path],
+        write: bool = True,
+    ) -> Dict[Path, Path]:
+        """
+        Backup all paths not created by Astrality at once.
+
+        :param paths: Paths to files to be backed up.
+        :param write: If False, postpone persisting the backups.
+        :return: Dictionary with backed up paths and their backups.
+        """
+        return self.creation_store.backup_all(
+            module=self.module,
+            paths=paths,
+            write=write,
+        )
 
     def insert_creation(
         self,
         content: Path,
         target: Path,
         method: CreationMethod,
+        content_hash: Optional[str] = None,
     ) -> None:
         """
         Persist file created by self.module.
@@ -257,14 +712,47 @@ class ModuleCreatedFiles:
         :param content: Path to content used to create new file.
         :param target: Path to created file.
         :param method: Action method used to create file.
+        :param content_hash: MD5 hexdigest of created file, if already known.
         """
         self.creation_store.insert(
             module=self.module,
             contents=[content],
             targets=[target],
             creation_method=method,
+            hashes=[content_hash],
+        )
+
+    def insert_creations(
+        self,
+        contents: List[Path],
+        targets: List[Path],
+        method: CreationMethod,
+        write: bool = True,
+    ) -> None:
+        """
+        Persist several files created by self.module.
+
+        :param contents: Paths to contents used to create new files.
+        :param targets: Paths to created files, in the same order as contents.
+        :param method: Action method used to create files.
+        :param write: If False, postpone persisting the creations.
+        """
+        self.creation_store.insert(
+            module=self.module,
+            contents=contents,
+            targets=targets,
+            creation_method=method,
+            write=write,
         )
 
+    def write(self) -> None:
+        """Persist all file creations to disk."""
+        self.creation_store.write()
+
+
+# Serializes read-modify-write cycles of the executed actions file
+_executed_actions_lock = threading.Lock()
+
 
 class ExecutedActions:
     """
@@ -298,6 +786,9 @@ class ExecutedActions:
         :param action_type: Type of action, see ActionBlock.action_types.
         :param action_options: Configuration of action to be performed.
         """
+        # Imported here, as actions imports this module
+        from astrality import actions
+
         assert action_type in actions.ActionBlock.action_types
         if not action_options:
             # Empty actions can be disregarded.
@@ -323,24 +814,31 @@ class ExecutedActions:
         if not self.new_actions:
             return
 
-        file_data = utils.load_yaml(path=self.path)
-        file_data.setdefault(self.module, {})
+        # Modules might execute their setup blocks concurrently
+        with _executed_actions_lock:
+            file_data = utils.load_yaml(path=self.path)
+            file_data.setdefault(self.module, {})
 
-        for action_type, action_options in self.new_actions.items():
-            file_data[self.module].setdefault(
-                action_type,
-                [],
-            ).extend(action_options)
+            for action_type, action_options in self.new_actions.items():
+                file_data[self.module].setdefault(
+                    action_type,
+                    [],
+                ).extend(action_options)
 
-        utils.dump_yaml(
-            path=self.path,
-            data=file_data,
-        )
+            utils.dump_yaml(
+                path=self.path,
+                data=file_data,
+            )
 
     def reset(self) -> None:
         """Delete all executed module actions."""
-        file_data = utils.load_yaml(path=self.path)
-        reset_actions = file_data.pop(self.module, None)
+        with _executed_actions_lock:
+            file_data = utils.load_yaml(path=self.path)
+            reset_actions = file_data.pop(self.module, None)
+            utils.dump_yaml(
+                path=self.path,
+                data=file_data,
+            )
 
         logger = logging.getLogger(__name__)
         if not reset_actions:
@@ -354,10 +852,6 @@ class ExecutedActions:
                 utils.yaml_str({self.module: reset_actions}),
             )
 
-        utils.dump_yaml(
-            path=self.path,
-            data=file_data,
-        )
         self.old_actions = {}
 
     @property
@@ -377,3 +871,50 @@ class ExecutedActions:
     def __repr__(self) -> str:
         """Return string representation of ExecutedActions object."""
         return f'ExecutedActions(module_name={self.module}, path={self.path})'
+
+
+class RepositoryUpdates:
+    """Object which persists when module repositories were last updated."""
+
+    # Path to file containing update timestamps
+    _path: Path
+
+    def __init__(self) -> None:
+        """Construct RepositoryUpdates object."""
+        self.updates: Dict[str, float] = utils.load_yaml(path=self.path) or {}
+
+    def last_update(self, repository: str) -> float:
+        """
+        Return time of last update of repository.
+
+        :param repository: Unique string id of repository, e.g. 'user/repo'.
+        :return: Seconds since the epoch, 0 if never updated.
+        """
+        return self.updates.get(repository, 0.0)
+
+    def record(self, repository: str, timestamp: float) -> None:
+        """
+        Persist time of update of repository.
+
+        :param repository: Unique string id of repository, e.g. 'user/repo'.
+        :param timestamp: Seconds since the epoch.
+        """
+        self.updates[repository] = timestamp
+        utils.dump_yaml(path=self.path, data=self.updates)
+
+    @property
+    def path(self) -> Path:
+        """Return path to file which stores repository update timestamps."""
+        if hasattr(self, '_path'):
+            return self._path
+
+        xdg = XDG('astrality')
+        self._path = xdg.data(resource='autoupdates.yml')
+        if os.stat(self._path).st_size == 0:
+            utils.dump_yaml(data={}, path=self._path)
+
+        return self._path
+
+    def __repr__(self) -> str:
+        """Return string representation of RepositoryUpdates object."""
+        return f'RepositoryUpdates(path={self.path})'
@@ -0,0 +1,163 @@
+"""
+Module for profiling where Astrality spends its time.
+
+Measurements are grouped into categories, for instance 'phases', 'modules',
+and 'actions', and each measurement records wall time, CPU time, and the
+number of times it has been measured. Profiling is disabled by default, and
+measuring is then practically free.
+
+Example usage:
+
+>>> from astrality.profiler import profiler
+>>> with profiler.measure('phases', 'user_configuration'):
+>>>     user_configuration()
+"""
+
+import cProfile
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+class Measurement:
+    """Accumulated wall time, CPU time, and count of a measured operation."""
+
+    __slots__ = ('wall', 'cpu', 'count')
+
+    def __init__(self) -> None:
+        """Construct empty measurement."""
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.count = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return JSON serializable representation of measurement."""
+        return {'wall': self.wall, 'cpu': self.cpu, 'count': self.count}
+
+
+class Profiler:
+    """
+    Object which records measurements of named operations.
+
+    :ivar enabled: If False, measurements are not recorded.
+    """
+
+    def __init__(self) -> None:
+        """Construct disabled profiler."""
+        self.enabled = False
+        self.measurements: Dict[str, Dict[str, Measurement]] = {}
+        self._lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._start_wall = 0.0
+        self._start_cpu = 0.0
+
+    def enable(self, cprofile: bool = False) -> None:
+        """
+        Start recording measurements.
+
+        :param cprofile: If True, also run the cProfile deterministic profiler.
+        """
+        self.enabled = True
+        self.measurements = {}
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self) -> None:
+        """Stop recording measurements."""
+        self.enabled = False
+        if self._cprofile:
+            self._cprofile.disable()
+
+    @contextmanager
+    def measure(self, category: str, name: str) -> Iterator[None]:
+        """
+        Measure time spent within context.
+
+        :param category: Category of measurement, for example 'modules'.
+        :param name: Name of measured operation, for example a module name.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            with self._lock:
+                measurement = self.measurements \
+                    .setdefault(category, {}) \
+                    .setdefault(name, Measurement())
+                measurement.wall += wall
+                measurement.cpu += cpu
+                measurement.count += 1
+
+    def report(self) -> Dict:
+        """
+        Return JSON serializable report of all measurements.
+
+        :return: Dictionary with a 'total' key containing the wall and CPU time
+            since the profiler was enabled, and one key for each category.
+        """
+        report: Dict = {
+            'total': {
+                'wall': time.perf_counter() - self._start_wall,
+                'cpu': time.process_time() - self._start_cpu,
+            },
+        }
+        with self._lock:
+            for category, measurements in self.measurements.items():
+                report[category] = {
+                    name: measurement.as_dict()
+                    for name, measurement
+                    in sorted(
+                        measurements.items(),
+                        key=lambda item: item[1].wall,
+                        reverse=True,
+                    )
+                }
+        return report
+
+    def dump(
+        self,
+        report: Optional[Path] = None,
+        cprofile: Optional[Path] = None,
+        action_metrics: Optional[Dict] = None,
+    ) -> None:
+        """
+        Write profiling results to disk.
+
+        :param report: Path to write JSON report to.
+        :param cprofile: Path to write cProfile statistics to, readable by
+            the `pstats` module.
+        :param action_metrics: Action statistics included in the JSON report,
+            as returned by :meth:`astrality.tracing.ActionMetrics.summary`.
+        """
+        logger = logging.getLogger(__name__)
+        if report:
+            data = self.report()
+            if action_metrics is not None:
+                data['action_metrics'] = action_metrics
+            report.parent.mkdir(parents=True, exist_ok=True)
+            report.write_text(json.dumps(data, indent=2))
+            logger.info(f'[profile] Wrote profiling report to "{report}".')
+
+        if cprofile and self._cprofile:
+            self._cprofile.create_stats()
+            self._cprofile.dump_stats(str(cprofile))
+            logger.info(f'[profile] Wrote cProfile statistics to "{cprofile}".')
+
+
+# Application wide profiler instance
+profiler = Profiler()
@@ -9,6 +9,7 @@ from typing import Union, Dict, TYPE_CHECKING, Iterable
 from mypy_extensions import TypedDict
 
 from astrality import utils
+from astrality.scheduler import DependencyGraph
 
 
 if TYPE_CHECKING:
@@ -94,20 +95,20 @@ class Requirement:
         :return: Dictionary with removed modules which miss their module
             dependencies.
         """
-        original_length = len(modules)
-
-        for module_name, module in list(modules.items()):
-            if not Requirement.satisfied_module_dependencies(
-                module=module,
-                enabled_modules=tuple(modules.keys()),
-            ):
-                del modules[module_name]
-                continue
-
-        if original_length != len(modules):
-            return Requirement.pop_missing_module_dependencies(
-                modules=modules,
+        graph = DependencyGraph({
+            module_name: module.depends_on
+            for module_name, module
+            in modules.items()
+        })
+        unsatisfied = graph.unsatisfied()
+
+        # Log the first missing dependency of each module, in module order
+        for module_name in [name for name in modules if name in unsatisfied]:
+            Requirement.satisfied_module_dependencies(
+                module=modules[module_name],
+                enabled_modules=modules.keys() - unsatisfied,
             )
+            del modules[module_name]
 
         return modules
 
@@ -0,0 +1,275 @@
+"""
+Module for ordering work according to dependencies between items.
+
+A :class:`DependencyGraph` is used both for modules, which depend on other
+modules through `requires: {module: ...}` statements, and for action blocks,
+which depend on each other through trigger actions. All graph operations are
+linear in the number of nodes and edges.
+"""
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+Node = TypeVar('Node', bound=Hashable)
+
+
+class DependencyGraph(Generic[Node]):
+    """
+    Directed graph where each node lists the nodes it depends on.
+
+    :param dependencies: Mapping from node to the nodes it depends on.
+        Dependencies which are not nodes themselves are regarded as missing.
+        The iteration order of the mapping is used to break ties, keeping
+        orderings stable.
+    """
+
+    def __init__(self, dependencies: Mapping[Node, Iterable[Node]]) -> None:
+        """Construct dependency graph."""
+        self.dependencies: Dict[Node, List[Node]] = {
+            node: list(node_dependencies)
+            for node, node_dependencies
+            in dependencies.items()
+        }
+        self.dependents: Dict[Node, List[Node]] = {
+            node: []
+            for node
+            in self.dependencies
+        }
+        for node, node_dependencies in self.dependencies.items():
+            for dependency in node_dependencies:
+                if dependency in self.dependents:
+                    self.dependents[dependency].append(node)
+
+    def unsatisfied(self) -> Set[Node]:
+        """
+        Return nodes which directly or indirectly depend on missing nodes.
+
+        :return: Set of nodes which can not have their dependencies satisfied.
+        """
+        unsatisfied = {
+            node
+            for node, node_dependencies
+            in self.dependencies.items()
+            if any(
+                dependency not in self.dependencies
+                for dependency
+                in node_dependencies
+            )
+        }
+        queue: Deque[Node] = deque(unsatisfied)
+        while queue:
+            for dependent in self.dependents[queue.popleft()]:
+                if dependent not in unsatisfied:
+                    unsatisfied.add(dependent)
+                    queue.append(dependent)
+
+        return unsatisfied
+
+    def cycles(self) -> List[List[Node]]:
+        """
+        Return all dependency cycles, using Tarjan's algorithm.
+
+        :return: List of strongly connected components with more than one
+            node, or with a node depending on itself.
+        """
+        index: Dict[Node, int] = {}
+        lowlink: Dict[Node, int] = {}
+        stack: List[Node] = []
+        on_stack: Set[Node] = set()
+        cycles: List[List[Node]] = []
+
+        for root in self.dependencies:
+            if root in index:
+                continue
+
+            # Iterative depth first search, avoiding the recursion limit
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._present_dependencies(root)))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append(
+                            (child, iter(self._present_dependencies(child))),
+                        )
+                        break
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                    if lowlink[node] != index[node]:
+                        continue
+
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+
+                    if len(component) > 1 \
+                            or node in self.dependencies[node]:
+                        cycles.append(component[::-1])
+
+        return cycles
+
+    def topological_order(self) -> List[Node]:
+        """
+        Return nodes ordered such that dependencies come before dependents.
+
+        Nodes which are part of cycles are placed after all other nodes which
+        they do not depend on, in their original order.
+
+        :return: List of all nodes.
+        """
+        remaining = {
+            node: len(self._present_dependencies(node))
+            for node
+            in self.dependencies
+        }
+        order: List[Node] = []
+        ready = deque(node for node, count in remaining.items() if not count)
+        while ready or len(order) < len(remaining):
+            if not ready:
+                # Only cycles remain, break the first one
+                ready.append(next(
+                    node
+                    for node, count
+                    in remaining.items()
+                    if count > 0
+                ))
+
+            node = ready.popleft()
+            if remaining[node] < 0:
+                continue
+
+            remaining[node] = -1
+            order.append(node)
+            for dependent in self.dependents[node]:
+                if remaining[dependent] > 0:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+
+        return order
+
+    def schedule(
+        self,
+        function: Callable[[Node], None],
+        workers: int = 1,
+    ) -> None:
+        """
+        Call function with every node, dependencies before dependents.
+
+        Nodes which do not depend on each other are processed concurrently
+        when more than one worker is allowed. Nodes which depend on a node for
+        which function raised an exception are still processed, as the graph
+        only determines order. The first exception is raised when all nodes
+        have been processed.
+
+        :param function: Callable taking a node as its only argument.
+        :param workers: Maximum number of nodes processed concurrently.
+        """
+        order = self.topological_order()
+        if workers <= 1 or len(order) <= 1:
+            for node in order:
+                function(node)
+            return
+
+        # Dependencies within cycles are ignored when scheduling concurrently
+        position = {node: number for number, node in enumerate(order)}
+        remaining = {
+            node: sum(
+                1
+                for dependency
+                in self._present_dependencies(node)
+                if position[dependency] < position[node]
+            )
+            for node
+            in order
+        }
+        lock = threading.Lock()
+        finished = threading.Event()
+        errors: List[BaseException] = []
+        unfinished = [len(order)]
+
+        def process(node: Node) -> None:
+            try:
+                function(node)
+            except BaseException as error:
+                errors.append(error)
+                logger = logging.getLogger(__name__)
+                logger.exception(f'Could not process "{node}".')
+
+            ready = []
+            with lock:
+                for dependent in self.dependents[node]:
+                    if position[dependent] < position[node]:
+                        continue
+
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+
+                unfinished[0] -= 1
+                if not unfinished[0]:
+                    finished.set()
+
+            for dependent in ready:
+                executor.submit(process, dependent)
+
+        # Collected before submitting, as processed nodes modify remaining
+        initial = [node for node in order if remaining[node] == 0]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for node in initial:
+                executor.submit(process, node)
+            finished.wait()
+
+        if errors:
+            raise errors[0]
+
+    def _present_dependencies(self, node: Node) -> List[Node]:
+        """Return dependencies of node which are part of the graph."""
+        return [
+            dependency
+            for dependency
+            in self.dependencies[node]
+            if dependency in self.dependencies
+        ]
+
+
+def describe_cycle(cycle: List[Node], name: Optional[Callable] = None) -> str:
+    """
+    Return human readable representation of dependency cycle.
+
+    :param cycle: List of nodes forming a cycle.
+    :param name: Callable returning the name of a node. Defaults to str.
+    :return: String of the form 'a -> b -> a'.
+    """
+    name = name or str
+    return ' -> '.join(name(node) for node in cycle + cycle[:1])
@@ -223,3 +223,29 @@ def test_stowing(action_block_factory, create_temp_files):
 
     # Check if non_template has been symlinked
     assert (template.parent / 'symlink_me').resolve() == symlink_target
+
+
+def test_lazy_construction_of_actions(
+    global_modules_config,
+    test_config_directory,
+    tmpdir,
+):
+    """Action objects should only be constructed when first accessed."""
+    touched = Path(tmpdir) / 'touched.tmp'
+    action_block = ActionBlock(
+        action_block={'run': {'shell': 'touch ' + str(touched)}},
+        directory=test_config_directory,
+        replacer=lambda x: x,
+        context_store=Context(),
+        global_modules_config=global_modules_config,
+        module_name='test',
+    )
+    assert not action_block.constructed
+    assert 'run' in action_block.action_block
+    assert not action_block.performed_compilations()
+    assert not action_block.constructed
+
+    action_block.execute(default_timeout=1)
+    assert action_block.constructed
+    assert touched.is_file()
+    assert len(action_block._run_actions) == 1
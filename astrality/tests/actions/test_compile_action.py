@@ -4,7 +4,7 @@ import os
 from pathlib import Path
 
 from astrality.actions import CompileAction
-from astrality.persistence import CreatedFiles
+from astrality.persistence import CompilationStore, CreatedFiles
 
 
 def test_null_object_pattern():
@@ -447,3 +447,55 @@ def test_creation_of_backup(create_temp_files):
     # And when cleaning up the module, the backup should be restored
     CreatedFiles().cleanup(module='test')
     assert target.read_text() == 'original'
+
+
+def test_identical_temporary_compile_targets_are_deduplicated(tmpdir):
+    """Identical compilations should share the same stored file."""
+    template_source = Path(tmpdir, 'template.tmp')
+    template_source.write_text('content')
+
+    created_files = CreatedFiles()
+    compile_actions = [
+        CompileAction(
+            options={'content': str(template_source), 'include': include},
+            directory=Path('/'),
+            replacer=lambda x: x,
+            context_store={},
+            creation_store=created_files.wrapper_for(module='test'),
+        )
+        for include
+        in (r'(.+)', r'(template.+)')
+    ]
+    target1, target2 = (
+        compile_action.execute()[template_source]
+        for compile_action
+        in compile_actions
+    )
+
+    assert target1 != target2
+    assert target2.read_text() == 'content'
+    assert os.path.samefile(target1, target2)
+    assert CompilationStore().reference_counts(created_files) == {
+        CompilationStore().directory / (
+            '9a0364b9e99bb480dd25e1f0284c8555-'
+            f'{target1.stat().st_mode & 0o777:o}'
+        ): 2,
+    }
+
+
+def test_explicit_compile_targets_are_not_deduplicated(
+    template_directory,
+    tmpdir,
+):
+    """Targets specified by the user should never be hard links."""
+    target = Path(tmpdir, 'target')
+    compile_action = CompileAction(
+        options={'content': 'no_context.template', 'target': str(target)},
+        directory=template_directory,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    compile_action.execute()
+    assert target.stat().st_nlink == 1
+    assert list(CompilationStore().directory.iterdir()) == []
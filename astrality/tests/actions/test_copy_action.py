@@ -1,6 +1,9 @@
 """Tests for astrality.actions.CopyAction."""
 
 from pathlib import Path
+from unittest import mock
+
+import pytest
 
 from astrality.actions import CopyAction
 from astrality.persistence import CreatedFiles
@@ -217,3 +220,105 @@ def test_backup_of_copy_target(create_temp_files):
     # And when cleaning up the module, the backup should be restored
     CreatedFiles().cleanup(module='test')
     assert target.read_text() == 'original'
+
+
+def test_backups_are_persisted_before_copying(create_temp_files):
+    """Backups should be recorded even if copying fails."""
+    target, content = create_temp_files(2)
+    target.write_text('original')
+    content.write_text('new')
+
+    copy_action = CopyAction(
+        options={'content': str(content.name), 'target': str(target)},
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    with mock.patch('astrality.utils.copy', side_effect=OSError):
+        with pytest.raises(OSError):
+            copy_action.execute()
+    assert not target.exists()
+
+    CreatedFiles().cleanup(module='test')
+    assert target.read_text() == 'original'
+
+
+def test_skipping_identical_copy_targets(create_temp_files):
+    """Targets with identical size and mtime should not be copied again."""
+    content, target = create_temp_files(2)
+    content.write_text('content')
+
+    copy_action = CopyAction(
+        options={'content': str(content), 'target': str(target)},
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    copy_action.execute()
+    assert target.read_text() == 'content'
+    assert copy_action.bytes_copied == len('content')
+    assert copy_action.bytes_skipped == 0
+
+    # The second execution should leave the identical target alone
+    target_inode = target.stat().st_ino
+    copy_action.execute()
+    assert target.stat().st_ino == target_inode
+    assert copy_action.bytes_copied == 0
+    assert copy_action.bytes_skipped == len('content')
+
+    # Modified content should be copied anew
+    content.write_text('new content')
+    copy_action.execute()
+    assert target.read_text() == 'new content'
+    assert copy_action.bytes_copied == len('new content')
+
+
+def test_content_comparison_of_copy_targets(create_temp_files):
+    """With compare: content, only differing file contents are copied."""
+    content, target = create_temp_files(2)
+    content.write_text('content')
+    target.write_text('content')
+
+    copy_action = CopyAction(
+        options={
+            'content': str(content),
+            'target': str(target),
+            'compare': 'content',
+        },
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    copy_action.execute()
+    assert copy_action.bytes_skipped == len('content')
+
+    # Same size, but different content
+    target.write_text('CONTENT')
+    copy_action.execute()
+    assert target.read_text() == 'content'
+    assert copy_action.bytes_copied == len('content')
+
+
+def test_always_copying_with_no_comparison(create_temp_files):
+    """With compare: none, targets are always copied."""
+    content, target = create_temp_files(2)
+    content.write_text('content')
+
+    copy_action = CopyAction(
+        options={
+            'content': str(content),
+            'target': str(target),
+            'compare': 'none',
+        },
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    copy_action.execute()
+    copy_action.execute()
+    assert copy_action.bytes_copied == len('content')
+    assert copy_action.bytes_skipped == 0
@@ -1,7 +1,11 @@
 """Tests for astrality.actions.SymlinkAction."""
 
 from pathlib import Path
+from unittest import mock
 
+import pytest
+
+from astrality import utils
 from astrality.actions import SymlinkAction
 from astrality.persistence import CreatedFiles
 
@@ -226,3 +230,113 @@ def test_backup_of_symlink_target(create_temp_files):
     # And when cleaning up the module, the backup should be restored
     CreatedFiles().cleanup(module='test')
     assert target.read_text() == 'original'
+
+
+def test_backups_are_persisted_before_symlinking(create_temp_files):
+    """Backups should be recorded even if symlinking fails."""
+    target, content = create_temp_files(2)
+    target.write_text('original')
+    content.write_text('new')
+
+    symlink_action = SymlinkAction(
+        options={'content': str(content.name), 'target': str(target)},
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    with mock.patch.object(Path, 'symlink_to', side_effect=OSError):
+        with pytest.raises(OSError):
+            symlink_action.execute()
+    assert not target.exists()
+
+    CreatedFiles().cleanup(module='test')
+    assert target.read_text() == 'original'
+
+
+def test_planning_of_symlinks(create_temp_files):
+    """Symlinks should be partitioned into create, replace, and correct."""
+    (
+        content1,
+        content2,
+        content3,
+        content4,
+        missing,
+        existing,
+        correct,
+        outdated,
+    ) = create_temp_files(8)
+    missing.unlink()
+    correct.unlink()
+    correct.symlink_to(content3)
+    outdated.unlink()
+    outdated.symlink_to(content1)
+
+    plan = utils.plan_symlinks({
+        content1: missing,
+        content2: existing,
+        content3: correct,
+        content4: outdated,
+    })
+    assert plan.create == {content1: missing}
+    assert plan.replace == {content2: existing, content4: outdated}
+    assert plan.correct == {content3: correct}
+
+
+def test_no_persistence_writes_when_symlinks_are_correct(
+    tmpdir,
+    monkeypatch,
+):
+    """Re-executing a symlink action should not touch created_files.yml."""
+    content = Path(tmpdir) / 'content'
+    for number in range(20):
+        (content / str(number)).mkdir(parents=True)
+        (content / str(number) / 'file').touch()
+    target = Path(tmpdir) / 'target'
+
+    symlink_action = SymlinkAction(
+        options={'content': str(content), 'target': str(target)},
+        directory=content,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+
+    writes = []
+    original_dump_yaml = utils.dump_yaml
+
+    def counting_dump_yaml(path, data):
+        writes.append(path)
+        original_dump_yaml(path=path, data=data)
+
+    monkeypatch.setattr(utils, 'dump_yaml', counting_dump_yaml)
+
+    # All symlinks are persisted with a single write
+    symlink_action.execute()
+    assert len(writes) == 1
+    assert len(CreatedFiles().by(module='test')) == 20
+
+    # No-op executions do not write at all
+    symlink_action.execute()
+    assert len(writes) == 1
+
+
+def test_replacing_outdated_symlink_created_by_astrality(create_temp_files):
+    """Symlinks created by Astrality pointing elsewhere should be replaced."""
+    old_content, new_content, target = create_temp_files(3)
+    old_content.write_text('old')
+    new_content.write_text('new')
+    target.unlink()
+
+    for content in (old_content, new_content):
+        symlink_action = SymlinkAction(
+            options={'content': str(content), 'target': str(target)},
+            directory=content.parent,
+            replacer=lambda x: x,
+            context_store={},
+            creation_store=CreatedFiles().wrapper_for(module='test'),
+        )
+        symlink_action.execute()
+
+    assert target.resolve() == new_content
+    assert CreatedFiles().creations['test'][str(target)]['backup'] is None
@@ -1,8 +1,12 @@
 """Test module for enabled modules sourced from Github."""
+import time
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
+from astrality import config
+from astrality.config import EnabledModules
 from astrality.exceptions import GithubModuleError
 from astrality.github import clone_or_pull_repo, clone_repo
 from astrality.utils import run_shell
@@ -114,6 +118,7 @@ def test_clone_or_pull_repository_by_updating_outdated_repository(tmpdir):
         user='jakobgm',
         repository='color-schemes.astrality',
         modules_directory=modules_directory,
+        depth=None,
     )
 
     # Move master to first commit in repository
@@ -137,3 +142,171 @@ def test_clone_or_pull_repository_by_updating_outdated_repository(tmpdir):
     )
     assert updated_repo_dir == repo_dir
     assert readme.is_file()
+
+
+def test_shallow_clone_of_repository(tmpdir, github_remote):
+    """Only the newest commit should be cloned."""
+    github_remote('user', 'repo', {'modules.yml': 'first'})
+    github_remote('user', 'repo', {'modules.yml': 'second'})
+
+    modules_directory = Path(tmpdir.mkdir('modules'))
+    repo_dir = clone_repo(
+        user='user',
+        repository='repo',
+        modules_directory=modules_directory,
+    )
+    assert (repo_dir / 'modules.yml').read_text() == 'second'
+
+    commits = run_shell(
+        command='git rev-list --count HEAD',
+        fallback=False,
+        working_directory=repo_dir,
+    )
+    assert commits.strip() == '1'
+
+
+def test_pulling_shallow_clone(tmpdir, github_remote):
+    """Shallow clones should be updatable."""
+    github_remote('user', 'repo', {'modules.yml': 'first'})
+    modules_directory = Path(tmpdir.mkdir('modules'))
+    repo_dir = clone_repo(
+        user='user',
+        repository='repo',
+        modules_directory=modules_directory,
+    )
+
+    github_remote('user', 'repo', {'modules.yml': 'second'})
+    clone_or_pull_repo(
+        user='user',
+        repository='repo',
+        modules_directory=modules_directory,
+    )
+    assert (repo_dir / 'modules.yml').read_text() == 'second'
+
+
+def test_parallel_cloning_of_enabled_github_modules(
+    github_remote,
+    patch_xdg_directory_standard,
+):
+    """All enabled GitHub repositories should be cloned on initialization."""
+    for repository in ('repo1', 'repo2', 'repo3'):
+        github_remote('user', repository, {'modules.yml': repository})
+
+    EnabledModules(
+        enabling_statements=[
+            {'name': 'github::user/repo1'},
+            {'name': 'github::user/repo2::module1'},
+            {'name': 'github::user/repo2::module2'},
+            {'name': 'github::user/repo3', 'autoupdate': True},
+        ],
+        config_directory=Path('/'),
+        modules_directory=Path('/'),
+    )
+
+    repositories = patch_xdg_directory_standard / 'repositories/github/user'
+    for repository in ('repo1', 'repo2', 'repo3'):
+        assert (repositories / repository / 'modules.yml').read_text() \
+            == repository
+
+
+def test_github_repositories_are_cloned_concurrently(monkeypatch):
+    """Repositories should be cloned by a pool of workers."""
+    def slow_clone_repo(user, repository, modules_directory):
+        time.sleep(0.2)
+        (modules_directory / user / repository).mkdir(parents=True)
+
+    monkeypatch.setattr(config, 'clone_repo', slow_clone_repo)
+
+    start = time.perf_counter()
+    EnabledModules(
+        enabling_statements=[
+            {'name': f'github::user/repo{number}'}
+            for number
+            in range(4)
+        ],
+        config_directory=Path('/'),
+        modules_directory=Path('/'),
+    )
+    assert time.perf_counter() - start < 0.6
+
+
+def test_failing_clone_of_one_github_repository(
+    github_remote,
+    patch_xdg_directory_standard,
+):
+    """Other repositories should be cloned before the error is raised."""
+    github_remote('user', 'existing', {'modules.yml': 'existing'})
+
+    with pytest.raises(GithubModuleError):
+        EnabledModules(
+            enabling_statements=[
+                {'name': 'github::user/non_existent'},
+                {'name': 'github::user/existing'},
+            ],
+            config_directory=Path('/'),
+            modules_directory=Path('/'),
+        )
+
+    repositories = patch_xdg_directory_standard / 'repositories/github/user'
+    assert (repositories / 'existing' / 'modules.yml').is_file()
+    assert not (repositories / 'non_existent').exists()
+
+
+def test_updating_github_sources(
+    github_remote,
+    patch_xdg_directory_standard,
+):
+    """Existing repositories should only be pulled when requested."""
+    github_remote('user', 'repo', {'modules.yml': 'first'})
+    github_remote('user', 'unchanged', {'modules.yml': 'unchanged'})
+    enabling_statements = [
+        {'name': 'github::user/repo', 'autoupdate': True},
+        {'name': 'github::user/unchanged', 'autoupdate': True},
+    ]
+    EnabledModules(
+        enabling_statements=enabling_statements,
+        config_directory=Path('/'),
+        modules_directory=Path('/'),
+    )
+
+    modules_file = patch_xdg_directory_standard \
+        / 'repositories/github/user/repo/modules.yml'
+    assert modules_file.read_text() == 'first'
+
+    # Initialization does not pull already cloned repositories
+    github_remote('user', 'repo', {'modules.yml': 'second'})
+    enabled_modules = EnabledModules(
+        enabling_statements=enabling_statements,
+        config_directory=Path('/'),
+        modules_directory=Path('/'),
+    )
+    assert modules_file.read_text() == 'first'
+
+    # Only sources with new commits are returned
+    updated = enabled_modules.update_github_sources()
+    assert [source.github_repo for source in updated] == ['repo']
+    assert modules_file.read_text() == 'second'
+
+
+def test_failed_clone_keeps_sibling_repositories(tmpdir):
+    """Only the partial clone of a failed clone should be removed."""
+    modules_directory = Path(tmpdir.mkdir('modules'))
+    sibling = modules_directory / 'jakobgm' / 'sibling'
+    sibling.mkdir(parents=True)
+
+    def partial_clone(command, **kwargs):
+        (modules_directory / 'jakobgm' / 'failing' / '.git').mkdir(
+            parents=True,
+        )
+        return False
+
+    with mock.patch('astrality.github.run_shell', partial_clone):
+        with pytest.raises(GithubModuleError):
+            clone_repo(
+                user='jakobgm',
+                repository='failing',
+                modules_directory=modules_directory,
+            )
+
+    assert sibling.is_dir()
+    assert not (modules_directory / 'jakobgm' / 'failing').exists()
@@ -15,7 +15,6 @@ from astrality.config import (
     ModuleSource,
 )
 from astrality.tests.utils import RegexCompare
-from astrality.utils import run_shell
 
 
 @pytest.fixture
@@ -440,12 +439,13 @@ class TestGithubModuleSource:
             },
         }
 
-    @pytest.mark.slow
     def test_use_of_autoupdating_github_source(
         self,
+        github_remote,
         patch_xdg_directory_standard,
     ):
         """When autoupdate is True, the latest revision should be pulled."""
+        github_remote('jakobgm', 'test-module.astrality', {'a': 'a'})
         github_module_source = GithubModuleSource(
             enabling_statement={
                 'name': 'github::jakobgm/test-module.astrality',
@@ -463,31 +463,18 @@ class TestGithubModuleSource:
         )
         assert repo_dir.is_dir()
 
-        # Move master to first commit in repository
-        result = run_shell(
-            command='git reset --hard d4c9723',
-            timeout=5,
-            fallback=False,
-            working_directory=repo_dir,
+        # The readme does not exist in the cloned commit
+        github_remote(
+            'jakobgm',
+            'test-module.astrality',
+            {'README.rst': 'readme'},
         )
-        assert result is not False
-
-        # The readme does not exist in this commit
         readme = repo_dir / 'README.rst'
         assert not readme.is_file()
 
-        del github_module_source
-        github_module_source = GithubModuleSource(
-            enabling_statement={
-                'name': 'github::jakobgm/test-module.astrality',
-                'autoupdate': True,
-            },
-            modules_directory=Path('/what/ever'),
-        )
-        github_module_source.modules({})
-
-        # The autoupdating should update the module to origin/master
+        # Autoupdating should update the module to origin/master
         # containing the README.rst file
+        github_module_source.update()
         assert readme.is_file()
 
 
@@ -2,10 +2,12 @@
 import os
 from pathlib import Path
 import shutil
+import subprocess
 
 import pytest
 
 import astrality
+from astrality import github
 from astrality.actions import ActionBlock
 from astrality.config import GlobalModulesConfig, user_configuration
 from astrality.context import Context
@@ -230,3 +232,55 @@ def patch_astrality_config_home(monkeypatch):
         'ASTRALITY_CONFIG_HOME',
         str(example_config),
     )
+
+
+@pytest.fixture
+def github_remote(tmpdir, monkeypatch):
+    """
+    Replace GitHub with local bare repositories.
+
+    Return function which commits files to a repository, creating the
+    repository if it does not exist.
+    """
+    remote = Path(tmpdir) / 'remote'
+    monkeypatch.setattr(
+        github,
+        'GITHUB_URL',
+        remote.as_uri() + '/{user}/{repository}.git',
+    )
+    git_environment = {
+        **os.environ,
+        'GIT_AUTHOR_NAME': 'test',
+        'GIT_AUTHOR_EMAIL': 'test@example.com',
+        'GIT_COMMITTER_NAME': 'test',
+        'GIT_COMMITTER_EMAIL': 'test@example.com',
+    }
+
+    def git(*args, cwd):
+        subprocess.run(
+            ('git', *args),
+            cwd=str(cwd),
+            env=git_environment,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def commit(user, repository, files):
+        bare = remote / user / f'{repository}.git'
+        work = remote / user / repository
+        if not bare.is_dir():
+            bare.mkdir(parents=True)
+            git('init', '--bare', cwd=bare)
+            work.mkdir()
+            git('init', cwd=work)
+            git('remote', 'add', 'origin', str(bare), cwd=work)
+
+        for name, content in files.items():
+            (work / name).write_text(content)
+        git('add', '.', cwd=work)
+        git('commit', '-m', 'commit', cwd=work)
+        git('push', 'origin', 'HEAD:refs/heads/master', cwd=work)
+        git('symbolic-ref', 'HEAD', 'refs/heads/master', cwd=bare)
+
+    return commit
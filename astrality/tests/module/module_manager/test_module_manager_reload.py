@@ -0,0 +1,330 @@
+"""Tests for hot reloading of ModuleManager configurations."""
+
+import threading
+from pathlib import Path
+
+from astrality.context import Context
+from astrality.module import ModuleManager
+from astrality.persistence import CreatedFiles
+
+
+def touching_module(directory, name, exit_name=None):
+    """Return module configuration touching files on startup and exit."""
+    return {
+        'on_startup': {'run': {'shell': f'touch {directory / name}'}},
+        'on_exit': {
+            'run': {'shell': f'touch {directory / (exit_name or name)}.exit'},
+        },
+    }
+
+
+def test_reloading_only_modified_modules(tmpdir):
+    """Unchanged modules should be kept running."""
+    temp_dir = Path(tmpdir)
+    config = {'modules': {'run_timeout': 1}}
+    module_manager = ModuleManager(
+        config=config,
+        modules={
+            'kept': touching_module(temp_dir, 'kept'),
+            'modified': touching_module(temp_dir, 'modified'),
+            'removed': touching_module(temp_dir, 'removed'),
+        },
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    kept_module = module_manager.modules['kept']
+
+    module_manager.reload(
+        config=config,
+        modules={
+            'kept': touching_module(temp_dir, 'kept'),
+            'modified': touching_module(temp_dir, 'modified2', 'modified'),
+            'added': touching_module(temp_dir, 'added'),
+        },
+        context=Context(),
+    )
+
+    assert module_manager.modules['kept'] is kept_module
+    assert set(module_manager.modules) == {'kept', 'modified', 'added'}
+    assert set(module_manager.last_module_events) == set(module_manager.modules)
+
+    assert not (temp_dir / 'kept.exit').exists()
+    assert (temp_dir / 'modified.exit').exists()
+    assert (temp_dir / 'modified2').exists()
+    assert (temp_dir / 'removed.exit').exists()
+    assert (temp_dir / 'added').exists()
+    module_manager.exit()
+
+
+def test_reloading_with_modified_modules_options(tmpdir):
+    """All modules should be restarted when global module options change."""
+    temp_dir = Path(tmpdir)
+    modules = {'A': touching_module(temp_dir, 'A')}
+    module_manager = ModuleManager(
+        config={'modules': {'run_timeout': 1}},
+        modules=modules,
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    module_a = module_manager.modules['A']
+
+    module_manager.reload(
+        config={'modules': {'run_timeout': 2}},
+        modules=modules,
+        context=Context(),
+    )
+    assert module_manager.modules['A'] is not module_a
+    assert (temp_dir / 'A.exit').exists()
+    assert module_manager.global_modules_config.run_timeout == 2
+    module_manager.exit()
+
+
+def test_reloading_with_modified_context(tmpdir):
+    """Templates of unchanged modules should be compiled with new context."""
+    temp_dir = Path(tmpdir)
+    template = temp_dir / 'template'
+    template.write_text('{{ section.key }}')
+    target = temp_dir / 'target'
+
+    def modules():
+        return {
+            'A': {'compile': {'content': str(template), 'target': str(target)}},
+        }
+
+    module_manager = ModuleManager(
+        modules=modules(),
+        context=Context({'section': {'key': 'old'}}),
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    module_a = module_manager.modules['A']
+    assert target.read_text() == 'old'
+
+    module_manager.reload(
+        config={},
+        modules=modules(),
+        context=Context({'section': {'key': 'new'}}),
+    )
+    assert module_manager.modules['A'] is module_a
+    assert target.read_text() == 'new'
+    module_manager.exit()
+
+
+def test_kept_modules_keep_creations_of_inserted_modules(tmpdir):
+    """Creations of kept and inserted modules should all be persisted."""
+    temp_dir = Path(tmpdir)
+    template = temp_dir / 'template'
+    template.write_text('content')
+
+    def compiling_module(name):
+        return {
+            'on_startup': {
+                'compile': {
+                    'content': str(template),
+                    'target': str(temp_dir / name),
+                },
+            },
+        }
+
+    module_manager = ModuleManager(
+        modules={'kept': compiling_module('kept')},
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    created_files = module_manager.global_modules_config.created_files
+
+    module_manager.reload(
+        config={},
+        modules={
+            'kept': compiling_module('kept'),
+            'added': compiling_module('added'),
+        },
+        context=Context(),
+    )
+    assert module_manager.global_modules_config.created_files \
+        is created_files
+
+    # The kept module writes its creations after the reload
+    module_manager.execute(action='compile', block='on_startup')
+    assert CreatedFiles().by(module='added') == [temp_dir / 'added']
+    assert CreatedFiles().by(module='kept') == [temp_dir / 'kept']
+    module_manager.exit()
+
+
+def test_hot_reloading_modified_configuration_file(tmpdir):
+    """The running module manager itself should be reloaded."""
+    config_directory = Path(tmpdir)
+    (config_directory / 'astrality.yml').write_text(
+        'astrality:\n'
+        '    hot_reload_config: true\n',
+    )
+    modules_file = config_directory / 'modules.yml'
+    modules_file.write_text('A:\n    run:\n        shell: echo A\n')
+
+    module_manager = ModuleManager(
+        config={'astrality': {'hot_reload_config': True}},
+        modules={'A': {'run': {'shell': 'echo A'}}},
+        directory=config_directory,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    module_a = module_manager.modules['A']
+
+    modules_file.write_text(
+        'A:\n    run:\n        shell: echo A\n'
+        'B:\n    run:\n        shell: echo B\n',
+    )
+    module_manager.on_application_config_modified()
+
+    assert set(module_manager.modules) == {'A', 'B'}
+    assert module_manager.modules['A'] is module_a
+    module_manager.exit()
+
+
+def test_hot_reloading_modified_module_source(tmpdir):
+    """Only the modified module source should be reloaded."""
+    config_directory = Path(tmpdir)
+    (config_directory / 'astrality.yml').write_text(
+        'astrality:\n'
+        '    hot_reload_config: true\n',
+    )
+    source_directory = config_directory / 'modules' / 'source'
+    source_directory.mkdir(parents=True)
+    modules_file = source_directory / 'modules.yml'
+    modules_file.write_text(
+        'A:\n    run:\n        shell: echo A\n'
+        'B:\n    run:\n        shell: echo B\n',
+    )
+
+    module_manager = ModuleManager(
+        config={'astrality': {'hot_reload_config': True}},
+        context=Context(),
+        directory=config_directory,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    module_a = module_manager.modules['source::A']
+    module_b = module_manager.modules['source::B']
+
+    modules_file.write_text(
+        'A:\n    run:\n        shell: echo A\n'
+        'B:\n    run:\n        shell: echo modified\n',
+    )
+    module_manager.file_system_modified(modules_file)
+    assert module_manager.modules['source::A'] is module_a
+    assert module_manager.modules['source::B'] is not module_b
+
+    # Invalid module sources are ignored, keeping the old configuration
+    module_b = module_manager.modules['source::B']
+    modules_file.write_text('A: [')
+    module_manager.file_system_modified(modules_file)
+    assert module_manager.modules == {
+        'source::A': module_a,
+        'source::B': module_b,
+    }
+    assert 'source::A' in module_manager.global_modules_config.enabled_modules
+    module_manager.exit()
+
+
+def test_modified_module_source_context(tmpdir):
+    """Templates should be compiled anew when source context is modified."""
+    config_directory = Path(tmpdir)
+    source_directory = config_directory / 'modules' / 'source'
+    source_directory.mkdir(parents=True)
+    context_file = source_directory / 'context.yml'
+    context_file.write_text('section:\n    key: old\n')
+    (source_directory / 'template').write_text('{{ section.key }}')
+    target = config_directory / 'target'
+    (source_directory / 'modules.yml').write_text(
+        'A:\n'
+        '    compile:\n'
+        '        content: template\n'
+        f'        target: {target}\n',
+    )
+
+    module_manager = ModuleManager(
+        config={'astrality': {'hot_reload_config': True}},
+        context=Context(),
+        directory=config_directory,
+    )
+    module_manager.finish_tasks()
+    module_manager.directory_watcher.stop()
+    assert target.read_text() == 'old'
+
+    context_file.write_text('section:\n    key: new\n')
+    module_manager.file_system_modified(context_file)
+    assert target.read_text() == 'new'
+    module_manager.exit()
+
+
+def test_reloading_modified_triggers(tmpdir):
+    """Execution plans of reloaded modules should reflect new triggers."""
+    temp_dir = Path(tmpdir)
+    config = {'modules': {'run_timeout': 1}}
+
+    def module(trigger):
+        return {
+            'on_startup': {'trigger': {'block': trigger}},
+            'on_event': {'run': {'shell': f'touch {temp_dir / "event"}'}},
+            'on_exit': {'run': {'shell': f'touch {temp_dir / "exit"}'}},
+        }
+
+    module_manager = ModuleManager(
+        config=config,
+        modules={'A': module(trigger='on_event')},
+        directory=temp_dir,
+    )
+    assert module_manager.modules['A'].execution_plan(block='on_startup') \
+        == (('on_startup', None), ('on_event', None))
+
+    module_manager.reload(
+        config=config,
+        modules={'A': module(trigger='on_exit')},
+        context=Context(),
+    )
+    assert module_manager.modules['A'].execution_plan(block='on_startup') \
+        == (('on_startup', None), ('on_exit', None))
+
+
+def test_main_loop_waits_for_background_reloads(tmpdir):
+    """Module events should not be handled while modules are reloaded."""
+    temp_dir = Path(tmpdir)
+    module_manager = ModuleManager(
+        config={'modules': {'run_timeout': 1}},
+        modules={'A': touching_module(temp_dir, 'A')},
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+
+    reloading = threading.Event()
+    reloaded = threading.Event()
+
+    def reload():
+        with module_manager._reload_lock:
+            reloading.set()
+            reloaded.wait()
+
+    reload_thread = threading.Thread(target=reload)
+    reload_thread.start()
+    reloading.wait()
+
+    finished = threading.Event()
+
+    def main_loop_iteration():
+        module_manager.has_unfinished_tasks()
+        module_manager.finish_tasks()
+        finished.set()
+
+    main_loop = threading.Thread(target=main_loop_iteration)
+    main_loop.start()
+    assert not finished.wait(timeout=0.2)
+
+    reloaded.set()
+    assert finished.wait(timeout=5)
+    for thread in (reload_thread, main_loop):
+        thread.join()
+    module_manager.exit()
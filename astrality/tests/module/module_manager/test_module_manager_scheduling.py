@@ -0,0 +1,58 @@
+"""Tests for the order of module execution in ModuleManager."""
+
+from pathlib import Path
+
+from astrality.context import Context
+from astrality.module import ModuleManager
+
+
+def appending_module(log_file, name, requires=()):
+    """Return module configuration appending its name to log file."""
+    return {
+        'requires': [{'module': dependency} for dependency in requires],
+        'run': {'shell': f'echo {name} >> {log_file}'},
+    }
+
+
+def test_modules_are_executed_after_their_dependencies(tmpdir):
+    """Modules should run after the modules they require."""
+    log_file = Path(tmpdir) / 'log'
+    module_manager = ModuleManager(
+        config={'modules': {'run_timeout': 1}},
+        modules={
+            'A': appending_module(log_file, 'A', requires=['C']),
+            'B': appending_module(log_file, 'B', requires=['A']),
+            'C': appending_module(log_file, 'C'),
+        },
+        context=Context(),
+        directory=Path(tmpdir),
+    )
+    module_manager.execute(action='run', block='on_startup')
+    assert log_file.read_text().split() == ['C', 'A', 'B']
+
+
+def test_parallel_execution_of_independent_modules(tmpdir):
+    """Independent modules may run concurrently, dependents still wait."""
+    log_file = Path(tmpdir) / 'log'
+    modules = {
+        f'module{number}': appending_module(log_file, f'module{number}')
+        for number
+        in range(4)
+    }
+    modules['dependent'] = appending_module(
+        log_file,
+        'dependent',
+        requires=list(modules),
+    )
+    module_manager = ModuleManager(
+        config={'modules': {'run_timeout': 1, 'parallel_modules': 4}},
+        modules=modules,
+        context=Context(),
+        directory=Path(tmpdir),
+    )
+    assert module_manager.global_modules_config.parallel_modules == 4
+
+    module_manager.execute(action='run', block='on_startup')
+    lines = log_file.read_text().split()
+    assert len(lines) == 5
+    assert lines[-1] == 'dependent'
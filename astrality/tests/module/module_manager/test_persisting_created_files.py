@@ -1,7 +1,12 @@
 """Tests for ensuring that all files that are created are persisted."""
 
+import time
+from pathlib import Path
+from unittest import mock
+
 import pytest
 
+from astrality import utils
 from astrality.module import ModuleManager
 from astrality.persistence import CreatedFiles
 
@@ -81,3 +86,43 @@ def test_that_created_files_are_persisted(method, create_temp_files):
     created_files = CreatedFiles()
     assert created_files.by(module='A') == []
     assert created_files.by(module='B') == []
+
+
+@pytest.mark.parametrize('method', ['compile', 'copy', 'symlink'])
+def test_creations_of_parallel_modules_are_persisted(method, tmpdir):
+    """Files created by concurrently executed modules should all be kept."""
+    temp_dir = Path(tmpdir)
+    modules = {}
+    targets = {}
+    for name in ('A', 'B'):
+        actions = []
+        for number in range(25):
+            content = temp_dir / f'{name}{number}.template'
+            content.write_text(f'{name}{number}')
+            actions.append({
+                'content': str(content),
+                'target': str(temp_dir / f'{name}{number}.target'),
+            })
+        modules[name] = {method: actions}
+        targets[name] = [Path(action['target']) for action in actions]
+
+    dump_yaml = utils.dump_yaml
+
+    def slow_dump_yaml(path, data):
+        # Give other modules a chance to modify data while it is dumped
+        for module_creations in data.values():
+            for _ in module_creations:
+                time.sleep(0.0001)
+        dump_yaml(path=path, data=data)
+
+    module_manager = ModuleManager(
+        config={'modules': {'parallel_modules': 2}},
+        modules=modules,
+        directory=temp_dir,
+    )
+    with mock.patch('astrality.persistence.utils.dump_yaml', slow_dump_yaml):
+        module_manager.finish_tasks()
+
+    persisted = utils.load_yaml(path=CreatedFiles().path)
+    for name in ('A', 'B'):
+        assert sorted(persisted[name]) == sorted(map(str, targets[name]))
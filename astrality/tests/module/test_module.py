@@ -4,6 +4,7 @@ import logging
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from unittest import mock
 
 from freezegun import freeze_time
 import pytest
@@ -935,3 +936,172 @@ def test_defining_on_startup_block_at_root_indentation(caplog):
     )
     assert module.execute(action='run', block='on_startup') \
         == (('echo overwritten', 'overwritten'),)
+
+
+def test_startup_timings_of_modules():
+    """Time spent in each startup phase should be recorded per module."""
+    modules = {
+        'A': {'on_startup': {'run': {'shell': 'echo A'}}},
+        'B': {'enabled': False},
+    }
+    module_manager = ModuleManager(modules=modules)
+    module_manager.finish_tasks()
+
+    timings = module_manager.startup_timings
+    assert set(timings['A'].keys()) == {
+        'requires',
+        'initialize',
+        'on_setup',
+        'on_startup',
+    }
+    assert all(seconds >= 0 for seconds in timings['A'].values())
+    assert 'initialize' not in timings['B']
+
+
+def test_cyclic_triggers_are_ignored(conf_path, caplog):
+    """Action blocks triggering each other should not recurse forever."""
+    modules = {
+        'A': {
+            'on_startup': {
+                'trigger': [{'block': 'on_event'}],
+                'run': [{'shell': 'echo startup'}],
+            },
+            'on_event': {
+                'trigger': [{'block': 'on_startup'}, {'block': 'on_exit'}],
+                'run': [{'shell': 'echo on_event'}],
+            },
+            'on_exit': {
+                'run': [{'shell': 'echo exit'}],
+            },
+        },
+    }
+    module_manager = ModuleManager(
+        modules=modules,
+        directory=conf_path,
+    )
+    module = module_manager.modules['A']
+    assert module.cyclic_triggers == {
+        (('on_startup', None), ('on_startup', None)),
+        (('on_startup', None), ('on_event', None)),
+        (('on_event', None), ('on_startup', None)),
+        (('on_event', None), ('on_event', None)),
+    }
+    assert 'Action blocks trigger each other in a cycle' in caplog.text
+
+    results = module.execute(action='run', block='on_startup')
+    assert results == (('echo startup', 'startup'),)
+
+    results = module.execute(action='run', block='on_event')
+    assert results == (('echo on_event', 'on_event'), ('echo exit', 'exit'))
+
+
+def test_diamond_shaped_triggers_execute_each_block_once(conf_path):
+    """Blocks triggered by several blocks should only be executed once."""
+    modules = {
+        'A': {
+            'on_startup': {
+                'trigger': [{'block': 'on_event'}, {'block': 'on_exit'}],
+                'run': [{'shell': 'echo startup'}],
+            },
+            'on_event': {
+                'trigger': [{'block': 'on_modified', 'path': 'templateA'}],
+                'run': [{'shell': 'echo on_event'}],
+            },
+            'on_exit': {
+                'trigger': [{'block': 'on_modified', 'path': 'templateA'}],
+                'run': [{'shell': 'echo exit'}],
+            },
+            'on_modified': {
+                'templateA': {
+                    'run': [{'shell': 'echo modified.templateA'}],
+                },
+            },
+        },
+    }
+    module_manager = ModuleManager(modules=modules, directory=conf_path)
+    module = module_manager.modules['A']
+    template = conf_path / 'templateA'
+
+    assert module.execution_plan(block='on_startup') == (
+        ('on_startup', None),
+        ('on_event', None),
+        ('on_modified', template),
+        ('on_exit', None),
+    )
+    results = module.execute(action='all', block='on_startup')
+    assert results == (
+        ('echo startup', 'startup'),
+        ('echo on_event', 'on_event'),
+        ('echo modified.templateA', 'modified.templateA'),
+        ('echo exit', 'exit'),
+    )
+
+
+def test_execution_plan_is_only_compiled_once(conf_path):
+    """Triggers should not be evaluated anew for each action type."""
+    modules = {
+        'A': {
+            'on_startup': {
+                'trigger': [{'block': 'on_event'}],
+                'run': [{'shell': 'echo startup'}],
+            },
+            'on_event': {
+                'run': [{'shell': 'echo on_event'}],
+            },
+        },
+    }
+    module_manager = ModuleManager(modules=modules, directory=conf_path)
+    module = module_manager.modules['A']
+
+    with mock.patch.object(
+        module,
+        '_triggered_blocks',
+        wraps=module._triggered_blocks,
+    ) as triggered_blocks:
+        module.execute(action='all', block='on_startup')
+        module.execute(action='run', block='on_startup')
+
+        # Once for each of the two planned blocks
+        assert triggered_blocks.call_count == 2
+
+    assert module.execution_plans == {
+        ('on_startup', None): (('on_startup', None), ('on_event', None)),
+    }
+
+
+def test_execution_plan_does_not_construct_actions(conf_path):
+    """Triggers should be planned from the action options alone."""
+    modules = {
+        'A': {
+            'on_startup': {
+                'trigger': [{'block': 'on_event'}],
+                'run': [{'shell': 'echo startup'}],
+            },
+            'on_event': {
+                'run': [{'shell': 'echo on_event'}],
+            },
+        },
+    }
+    module_manager = ModuleManager(modules=modules, directory=conf_path)
+    module = module_manager.modules['A']
+
+    assert module.execution_plan(block='on_startup') \
+        == (('on_startup', None), ('on_event', None))
+    for name in ('on_startup', 'on_event'):
+        assert not module.get_action_block(name=name).constructed
+
+
+def test_triggering_non_existent_on_modified_block(conf_path, caplog):
+    modules = {
+        'A': {
+            'on_startup': {
+                'trigger': [{'block': 'on_modified', 'path': 'missing'}],
+                'run': [{'shell': 'echo startup'}],
+            },
+        },
+    }
+    module_manager = ModuleManager(modules=modules, directory=conf_path)
+    module = module_manager.modules['A']
+    assert module.execute(action='run', block='on_startup') \
+        == (('echo startup', 'startup'),)
+    assert 'Triggered non-existent "on_modified" block' in caplog.text
@@ -34,3 +34,12 @@ def test_that_setup_block_is_only_executed_once(tmpdir):
     module_manager = ModuleManager(modules=modules)
     module_manager.finish_tasks()
     assert not touched.exists()
+
+
+def test_that_empty_setup_blocks_do_not_read_setup_file(
+    patch_xdg_directory_standard,
+):
+    """Modules without setup actions should not need to touch setup.yml."""
+    module_manager = ModuleManager(modules={'A': {'run': {'shell': 'echo'}}})
+    module_manager.finish_tasks()
+    assert not (patch_xdg_directory_standard / 'setup.yml').exists()
@@ -0,0 +1,84 @@
+"""Tests for the content addressed store of compiled templates."""
+
+import os
+from pathlib import Path
+
+from astrality.persistence import (
+    CompilationStore,
+    CreatedFiles,
+    CreationMethod,
+)
+
+
+def test_identical_compilations_are_stored_once(tmpdir):
+    """Targets with identical content should be links to the same file."""
+    store = CompilationStore(directory=Path(tmpdir, 'store'))
+    store.directory.mkdir()
+    target1, target2, target3 = (Path(tmpdir, name) for name in 'abc')
+    target1.write_text('content')
+    target2.write_text('content')
+    target3.write_text('other content')
+
+    stored1 = store.add(target=target1)
+    stored2 = store.add(target=target2)
+    stored3 = store.add(target=target3)
+
+    assert stored1 == stored2
+    assert stored1 != stored3
+    assert os.path.samefile(target1, target2)
+    assert target2.read_text() == 'content'
+    assert len(list(store.directory.iterdir())) == 2
+
+    # Adding a target twice changes nothing
+    assert store.add(target=target1) == stored1
+    assert len(list(store.directory.iterdir())) == 2
+
+
+def test_file_modes_are_stored_separately(tmpdir):
+    """Identical content with different permissions should not be shared."""
+    store = CompilationStore(directory=Path(tmpdir, 'store'))
+    store.directory.mkdir()
+    target1, target2 = Path(tmpdir, 'a'), Path(tmpdir, 'b')
+    target1.write_text('content')
+    target2.write_text('content')
+    target2.chmod(0o755)
+
+    assert store.add(target=target1) != store.add(target=target2)
+    assert not os.path.samefile(target1, target2)
+
+
+def test_garbage_collection_of_unreferenced_compilations(
+    tmpdir,
+    create_temp_files,
+):
+    """Only stored files not linked from created files should be deleted."""
+    store = CompilationStore()
+    content1, content2, target1, target2 = create_temp_files(4)
+    target1.write_text('one')
+    target2.write_text('two')
+    stored1 = store.add(target=target1)
+    stored2 = store.add(target=target2)
+
+    created_files = CreatedFiles()
+    created_files.insert(
+        module='name',
+        creation_method=CreationMethod.COMPILE,
+        contents=[content1, content2],
+        targets=[target1, target2],
+    )
+    assert store.reference_counts(created_files) == {stored1: 1, stored2: 1}
+
+    target2.unlink()
+    assert store.reference_counts(created_files) == {stored1: 1, stored2: 0}
+
+    assert store.collect_garbage(created_files, dry_run=True) == [stored2]
+    assert stored2.exists()
+
+    assert store.collect_garbage(created_files) == [stored2]
+    assert not stored2.exists()
+    assert stored1.exists()
+
+    # Cleaning up the module removes the last reference
+    created_files.cleanup(module='name')
+    assert store.collect_garbage(created_files) == [stored1]
+    assert list(store.directory.iterdir()) == []
@@ -1,7 +1,14 @@
 """Tests for astrality.persistence.CreatedFiles."""
 
+import errno
+import hashlib
+import os
 from pathlib import Path
 import shutil
+import tarfile
+from unittest import mock
+
+import pytest
 
 from astrality.persistence import (
     CreatedFiles,
@@ -207,6 +214,26 @@ def test_that_creations_are_properly_hashed(
         != created_files.creations['name'][str(target3)]['hash']
 
 
+def test_inserting_creations_with_known_hashes(create_temp_files):
+    """Known hashes should be used instead of reading the created files."""
+    target1, target2, content = create_temp_files(3)
+    target1.write_text('content')
+    target2.write_text('content')
+
+    created_files = CreatedFiles()
+    created_files.insert(
+        module='name',
+        creation_method=CreationMethod.COMPILE,
+        contents=[content, content],
+        targets=[target1, target2],
+        hashes=['known_hash', None],
+    )
+    assert created_files.creations['name'][str(target1)]['hash'] \
+        == 'known_hash'
+    assert created_files.creations['name'][str(target2)]['hash'] \
+        == hashlib.md5(b'content').hexdigest()
+
+
 def test_creating_created_files_object_for_specific_module(create_temp_files):
     """You should be able to construct a CreatedFiles wrapper for a module."""
     content, target = create_temp_files(2)
@@ -329,3 +356,209 @@ def test_taking_backup_of_symlinks(create_temp_files):
     created_files.cleanup(module='name')
     assert original_symlink.resolve() == original_target
     assert original_symlink.read_text() == 'original content'
+
+
+def test_backing_up_several_files_at_once(create_temp_files):
+    """All backups should be persisted with a single write."""
+    content, created, *externals = create_temp_files(5)
+    for external in externals:
+        external.write_text(external.name)
+
+    created_files = CreatedFiles()
+    created_files.insert(
+        module='name',
+        creation_method=CreationMethod.COPY,
+        contents=[content],
+        targets=[created],
+    )
+    missing = Path(created.parent, 'missing')
+    with mock.patch.object(created_files, 'write') as write:
+        backups = created_files.backup_all(
+            module='name',
+            paths=[created, missing, *externals, externals[0]],
+        )
+    write.assert_called_once_with()
+
+    assert set(backups) == set(externals)
+    for external, backup in backups.items():
+        assert not external.exists()
+        assert backup.read_text() == external.name
+        assert created_files.creations['name'][str(external)]['backup'] \
+            == str(backup)
+
+    for external in externals:
+        content.write_text('new')
+        shutil.copy2(str(content), str(external))
+    created_files.cleanup('name')
+    assert [external.read_text() for external in externals] \
+        == [external.name for external in externals]
+
+
+def test_backups_are_copied_across_file_systems(create_temp_files):
+    """Files should be moved by copying when they can not be renamed."""
+    external, = create_temp_files(1)
+    external.write_text('original')
+
+    def rename(source, destination):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    created_files = CreatedFiles()
+    with mock.patch('astrality.persistence.os.rename', rename):
+        backup = created_files.backup(module='name', path=external)
+
+    assert backup.read_text() == 'original'
+    assert not external.exists()
+
+
+def test_archiving_backups(create_temp_files):
+    """Backups can be packed into a single compressed archive."""
+    first, second, symlink, symlink_target = create_temp_files(4)
+    first.write_text('first')
+    second.write_text('second')
+    symlink.unlink()
+    symlink.symlink_to(symlink_target)
+
+    created_files = CreatedFiles(archive_backups=True)
+    backups = created_files.backup_all(
+        module='name',
+        paths=[first, second, symlink],
+    )
+    archive, = set(backups.values())
+    assert archive.name.endswith('.tar.gz')
+    assert not os.path.lexists(first)
+    assert not os.path.lexists(symlink)
+    with tarfile.open(str(archive)) as tar:
+        assert len(tar.getnames()) == 3
+
+    for path in (first, second, symlink):
+        path.write_text('new')
+        created_files.insert(
+            module='name',
+            creation_method=CreationMethod.COPY,
+            contents=[symlink_target],
+            targets=[path],
+        )
+
+    created_files.cleanup('name')
+    assert first.read_text() == 'first'
+    assert second.read_text() == 'second'
+    assert symlink.resolve() == symlink_target
+    assert not archive.exists()
+
+
+def test_that_cleanup_skips_modified_files(create_temp_files, caplog):
+    """Files modified since created should neither be deleted nor replaced."""
+    content, target, other_target = create_temp_files(3)
+    target.write_text('original')
+
+    created_files = CreatedFiles()
+    backup = created_files.backup(module='name', path=target)
+    for created in (target, other_target):
+        created.write_text('created')
+    created_files.insert(
+        module='name',
+        creation_method=CreationMethod.COPY,
+        contents=[content, content],
+        targets=[target, other_target],
+    )
+
+    target.write_text('modified by user')
+    created_files.cleanup(module='name')
+
+    assert target.read_text() == 'modified by user'
+    assert backup.read_text() == 'original'
+    assert not other_target.exists()
+    assert 'modified since it was created' in caplog.text
+    assert created_files.by(module='name') == [target]
+
+
+def test_that_recreated_files_update_recorded_hash(create_temp_files):
+    """Files created anew from the same content should not count as modified."""
+    content, target = create_temp_files(2)
+    created_files = CreatedFiles()
+    for text in ('first', 'second'):
+        target.write_text(text)
+        created_files.insert(
+            module='name',
+            creation_method=CreationMethod.COMPILE,
+            contents=[content],
+            targets=[target],
+        )
+
+    created_files.cleanup(module='name')
+    assert not target.exists()
+
+
+def test_that_interrupted_cleanup_is_resumed(create_temp_files):
+    """Files cleaned up before an interruption should not be cleaned again."""
+    content, first, second = create_temp_files(3)
+    first.write_text('original')
+
+    created_files = CreatedFiles()
+    created_files.backup(module='name', path=first)
+    for created in (first, second):
+        created.write_text('created')
+    created_files.insert(
+        module='name',
+        creation_method=CreationMethod.COPY,
+        contents=[content, content],
+        targets=[first, second],
+    )
+
+    def interrupt(path, info):
+        if path == second:
+            raise KeyboardInterrupt
+        return True
+
+    with mock.patch.object(created_files, '_unmodified', interrupt):
+        with pytest.raises(KeyboardInterrupt):
+            created_files.cleanup(module='name', workers=1)
+
+    # The restored backup is not deleted when the cleanup is resumed
+    assert first.read_text() == 'original'
+    assert second.exists()
+    created_files = CreatedFiles()
+    created_files.cleanup(module='name')
+    assert first.read_text() == 'original'
+    assert not second.exists()
+    assert created_files.by(module='name') == []
+
+
+def test_cleanup_of_files_created_after_interrupted_cleanup(
+    create_temp_files,
+):
+    """Files created anew after an interrupted cleanup should be cleaned up."""
+    content, first, second = create_temp_files(3)
+    first.write_text('original')
+
+    created_files = CreatedFiles()
+
+    def create_files():
+        created_files.backup(module='name', path=first)
+        for created in (first, second):
+            created.write_text('created')
+        created_files.insert(
+            module='name',
+            creation_method=CreationMethod.COPY,
+            contents=[content, content],
+            targets=[first, second],
+        )
+
+    def interrupt(path, info):
+        if path == second:
+            raise KeyboardInterrupt
+        return True
+
+    create_files()
+    with mock.patch.object(created_files, '_unmodified', interrupt):
+        with pytest.raises(KeyboardInterrupt):
+            created_files.cleanup(module='name', workers=1)
+    assert first.read_text() == 'original'
+
+    # Astrality is started anew before the cleanup is resumed
+    create_files()
+    created_files = CreatedFiles()
+    created_files.cleanup(module='name')
+    assert first.read_text() == 'original'
+    assert not second.exists()
+    assert created_files.by(module='name') == []
@@ -0,0 +1,117 @@
+"""Tests for astrality.autoupdate."""
+
+import time
+from pathlib import Path
+
+from astrality.autoupdate import Autoupdater
+from astrality.config import EnabledModules
+from astrality.module import ModuleManager
+from astrality.persistence import RepositoryUpdates
+
+
+def test_rate_limiting_of_autoupdates(
+    github_remote,
+    patch_xdg_directory_standard,
+):
+    """Repositories should be pulled at most once per interval."""
+    github_remote('user', 'repo', {'modules.yml': 'first'})
+    enabled_modules = EnabledModules(
+        enabling_statements=[{'name': 'github::user/repo', 'autoupdate': True}],
+        config_directory=Path('/'),
+        modules_directory=Path('/'),
+    )
+    modules_file = patch_xdg_directory_standard \
+        / 'repositories/github/user/repo/modules.yml'
+
+    updated_sources = []
+    autoupdater = Autoupdater(
+        enabled_modules=enabled_modules,
+        interval=3600,
+        on_update=updated_sources.append,
+    )
+    assert autoupdater.update() == []
+    assert RepositoryUpdates().last_update('user/repo') > 0
+    assert autoupdater.seconds_until_due() > 3500
+
+    # New commits are not pulled within the interval, even after restarts
+    github_remote('user', 'repo', {'modules.yml': 'second'})
+    autoupdater = Autoupdater(
+        enabled_modules=enabled_modules,
+        interval=3600,
+        on_update=updated_sources.append,
+    )
+    assert autoupdater.due_sources() == []
+    assert autoupdater.update() == []
+    assert modules_file.read_text() == 'first'
+
+    # But they are pulled when the interval has passed
+    autoupdater.interval = 0
+    assert autoupdater.update() == updated_sources
+    assert len(updated_sources) == 1
+    assert modules_file.read_text() == 'second'
+
+
+def test_hot_swapping_updated_github_modules(
+    github_remote,
+    tmpdir,
+):
+    """Only new and modified modules should be restarted."""
+    temp_dir = Path(tmpdir)
+    modules = """
+a:
+    on_startup:
+        run:
+            shell: touch {temp_dir}/a_started_{version}
+    on_exit:
+        run:
+            shell: touch {temp_dir}/a_exited
+c:
+    on_exit:
+        run:
+            shell: touch {temp_dir}/c_exited
+"""
+    github_remote(
+        'user',
+        'repo',
+        {'modules.yml': modules.format(temp_dir=temp_dir, version=1)},
+    )
+
+    # Prevent the background job from pulling during the test
+    RepositoryUpdates().record(repository='user/repo', timestamp=time.time())
+
+    module_manager = ModuleManager(
+        config={
+            'modules': {
+                'enabled_modules': [
+                    {'name': 'github::user/repo', 'autoupdate': True},
+                ],
+                'run_timeout': 1,
+            },
+        },
+        directory=temp_dir,
+    )
+    module_manager.finish_tasks()
+    assert (temp_dir / 'a_started_1').exists()
+
+    github_remote(
+        'user',
+        'repo',
+        {
+            'modules.yml': modules.format(temp_dir=temp_dir, version=2)
+            + 'b:\n    run:\n        shell: touch ' + str(temp_dir / 'b'),
+        },
+    )
+    source, = module_manager.autoupdater.sources
+    assert source.update()
+    module_manager.reload_module_source(source)
+
+    assert (temp_dir / 'a_exited').exists()
+    assert (temp_dir / 'a_started_2').exists()
+    assert (temp_dir / 'b').exists()
+    assert not (temp_dir / 'c_exited').exists()
+    assert set(module_manager.modules) == {
+        'github::user/repo::a',
+        'github::user/repo::b',
+        'github::user/repo::c',
+    }
+    module_manager.exit()
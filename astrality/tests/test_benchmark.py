@@ -0,0 +1,116 @@
+"""Tests for astrality.benchmark."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from astrality import benchmark
+
+
+def test_synthesizing_configuration(tmpdir):
+    """All modules and templates should be created."""
+    config_directory = benchmark.synthesize_configuration(
+        directory=Path(tmpdir),
+        modules=3,
+        templates=2,
+        sections=4,
+    )
+    assert (config_directory / 'astrality.yml').is_file()
+    assert (config_directory / 'context.yml').is_file()
+    assert len(list((config_directory / 'templates').glob('*/*'))) == 6
+
+    template = config_directory / 'templates' / 'module0' / 'template0'
+    assert template.read_text().count('{{') == 4
+
+
+def test_isolated_environment_is_restored(tmpdir):
+    """Environment variables should be restored after benchmarking."""
+    original = os.environ.get('XDG_DATA_HOME')
+    with benchmark.isolated_environment(Path(tmpdir)):
+        assert os.environ['XDG_DATA_HOME'] == str(Path(tmpdir) / 'data')
+        assert os.environ['ASTRALITY_CONFIG_HOME'] \
+            == str(Path(tmpdir) / 'config')
+
+    assert os.environ.get('XDG_DATA_HOME') == original
+
+
+def test_running_all_benchmarks():
+    """Each benchmark should report statistics."""
+    results = benchmark.run_benchmarks(
+        modules=2,
+        templates=2,
+        sections=2,
+        repeat=1,
+    )
+    assert set(results) == set(benchmark.BENCHMARKS)
+    for statistics in results.values():
+        assert statistics['repeat'] == 1
+        assert 0 < statistics['min'] <= statistics['median']
+
+
+def test_comparing_results():
+    """Only benchmarks slower than the tolerance are regressions."""
+    baseline = {
+        'fast': {'median': 1.0},
+        'slow': {'median': 1.0},
+        'removed': {'median': 1.0},
+    }
+    results = {
+        'fast': {'median': 1.1},
+        'slow': {'median': 2.0},
+        'added': {'median': 1.0},
+    }
+    assert benchmark.compare_results(
+        baseline=baseline,
+        results=results,
+        tolerance=0.2,
+    ) == {'slow': 2.0}
+
+
+def test_storing_and_comparing_results_from_command_line(tmpdir, capsys):
+    """Regressions against stored results should give a failing exit code."""
+    output = Path(tmpdir) / 'results.json'
+    arguments = [
+        '--modules', '1',
+        '--templates', '1',
+        '--sections', '1',
+        '--repeat', '1',
+        '--benchmark', 'resolve_targets',
+    ]
+    assert benchmark.main(arguments + ['--output', str(output)]) == 0
+
+    stored = json.loads(output.read_text())
+    assert stored['parameters'] == {'modules': 1, 'templates': 1, 'sections': 1}
+    assert set(stored['results']) == {'resolve_targets'}
+
+    stored['results']['resolve_targets']['median'] = 1e-12
+    output.write_text(json.dumps(stored))
+    assert benchmark.main(arguments + ['--compare', str(output)]) == 1
+    assert 'Regression: resolve_targets' in capsys.readouterr().out
+
+
+def test_maintenance_modules_do_not_import_heavy_dependencies():
+    """Maintenance commands should start without loading heavy dependencies."""
+    times = benchmark.import_times(
+        'import ' + ', '.join(benchmark.MAINTENANCE_MODULES),
+    )
+    imported = {import_time.module.split('.')[0] for import_time in times}
+    assert not imported & set(benchmark.LAZY_DEPENDENCIES)
+
+
+@pytest.mark.slow
+def test_maintenance_modules_import_within_budget():
+    """Maintenance modules should be imported within the time budget."""
+    times = benchmark.import_times(
+        'import ' + ', '.join(benchmark.MAINTENANCE_MODULES),
+    )
+    duration = sum(
+        import_time.cumulative
+        for import_time
+        in times
+        if import_time.depth == 0
+        and import_time.module in benchmark.MAINTENANCE_MODULES
+    )
+    assert 0 < duration < benchmark.MAINTENANCE_IMPORT_BUDGET
@@ -0,0 +1,130 @@
+"""Tests for astrality.cache."""
+
+from pathlib import Path
+
+import pytest
+
+from astrality import cache, compiler
+from astrality.config import user_configuration
+from astrality.context import Context
+from astrality.utils import compile_yaml
+
+
+@pytest.fixture
+def cold_cache(monkeypatch):
+    """Forget in-memory cache state, simulating a new process."""
+    monkeypatch.setattr(cache, '_caches', {})
+
+
+def test_deterministic_templates():
+    """Templates with external dependencies should be detected."""
+    assert compiler.is_deterministic('key: {{ value }}')
+    assert compiler.is_deterministic((
+        '{% for i in range(3) %}{{ i }}{% endfor %}'
+    ))
+    assert not compiler.is_deterministic('key: {{ env.HOME }}')
+    assert not compiler.is_deterministic('key: {{ "echo" | shell }}')
+    assert not compiler.is_deterministic('{% include "other.yml" %}')
+    assert not compiler.is_deterministic('{{ unclosed')
+
+
+def test_warm_compilation_skips_jinja(tmpdir, monkeypatch, cold_cache):
+    """Cached results should be reused across cache instances."""
+    template = Path(tmpdir, 'template.yml')
+    template.write_text('key: {{ value }}')
+    context = Context({'value': 1})
+
+    assert compile_yaml(path=template, context=context, cache=True) \
+        == {'key': 1}
+
+    monkeypatch.setattr(cache, '_caches', {})
+    with monkeypatch.context() as patch:
+        patch.setattr(compiler, 'compile_template_to_string', None)
+        result = compile_yaml(path=template, context=context, cache=True)
+    assert result == {'key': 1}
+
+    # Each lookup returns a new copy
+    result['key'] = 2
+    assert compile_yaml(path=template, context=context, cache=True) \
+        == {'key': 1}
+
+
+def test_cache_invalidation(tmpdir, cold_cache):
+    """Changed templates and contexts should be compiled anew."""
+    template = Path(tmpdir, 'template.yml')
+    template.write_text('key: {{ value }}')
+
+    assert compile_yaml(
+        path=template,
+        context=Context({'value': 1}),
+        cache=True,
+    ) == {'key': 1}
+    assert compile_yaml(
+        path=template,
+        context=Context({'value': 2}),
+        cache=True,
+    ) == {'key': 2}
+
+    template.write_text('other_key: {{ value }}')
+    assert compile_yaml(
+        path=template,
+        context=Context({'value': 2}),
+        cache=True,
+    ) == {'other_key': 2}
+
+
+def test_nondeterministic_templates_are_not_cached(
+    tmpdir,
+    monkeypatch,
+    cold_cache,
+):
+    """Templates using environment variables should always be compiled."""
+    template = Path(tmpdir, 'template.yml')
+    template.write_text('key: {{ env.EXAMPLE_ENV_VARIABLE }}')
+
+    assert compile_yaml(path=template, context=Context(), cache=True) \
+        == {'key': 'test_value'}
+
+    monkeypatch.setitem(
+        compiler.os.environ,
+        'EXAMPLE_ENV_VARIABLE',
+        'new_value',
+    )
+    assert compile_yaml(path=template, context=Context(), cache=True) \
+        == {'key': 'new_value'}
+    assert not cache.compiled_yaml_cache().entries
+
+
+def test_warm_user_configuration(tmpdir, monkeypatch, cold_cache):
+    """Warm starts should not compile any configuration templates."""
+    config_directory = Path(tmpdir)
+    (config_directory / 'context.yml').write_text('section:\n  key: value')
+    (config_directory / 'astrality.yml').write_text(
+        'astrality:\n  hot_reload_config: {{ section.key == "value" }}',
+    )
+    (config_directory / 'modules.yml').write_text(
+        'A:\n  run:\n    shell: echo {{ section.key }}',
+    )
+
+    cold_result = user_configuration(config_directory=config_directory)
+
+    monkeypatch.setattr(cache, '_caches', {})
+    with monkeypatch.context() as patch:
+        patch.setattr(compiler, 'compile_template_to_string', None)
+        warm_result = user_configuration(config_directory=config_directory)
+
+    assert warm_result == cold_result
+    assert warm_result[0]['astrality']['hot_reload_config'] is True
+    assert warm_result[1] == {'A': {'run': {'shell': 'echo value'}}}
+
+
+def test_corrupt_cache_file_is_ignored(tmpdir, cold_cache):
+    """Unreadable cache files should be treated as empty caches."""
+    cache_file = cache.compiled_yaml_cache().path
+    cache_file.write_bytes(b'not a pickle')
+
+    template = Path(tmpdir, 'template.yml')
+    template.write_text('key: value')
+    assert compile_yaml(path=template, context=Context(), cache=True) \
+        == {'key': 'value'}
+    assert str(template) in cache.CompiledYAMLCache(cache_file).entries
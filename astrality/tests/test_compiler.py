@@ -1,7 +1,9 @@
 """Tests for the compiler module."""
 
+import hashlib
 import logging
 import os
+import time
 from pathlib import Path
 
 import pytest
@@ -11,6 +13,7 @@ from astrality.compiler import (
     compile_template,
     compile_template_to_string,
     jinja_environment,
+    stream_template,
 )
 from astrality.context import Context
 
@@ -50,6 +53,31 @@ def test_integer_indexed_templates(jinja_test_env):
     assert template.render(context) == 'one\ntwo\ntwo'
 
 
+@pytest.mark.slow
+def test_benchmark_of_integer_index_resolution(tmpdir):
+    """Thousands of resolved integer indices should render quickly."""
+    context = Context({
+        'colors': {index: f'color{index}' for index in range(0, 2000, 2)},
+    })
+    template = Path(tmpdir) / 'template'
+    template.write_text(
+        '{% for index in range(20000) %}{{ colors[index] }}\n{% endfor %}',
+    )
+
+    start = time.perf_counter()
+    result = compile_template_to_string(template=template, context=context)
+    duration = time.perf_counter() - start
+    logging.getLogger(__name__).info(
+        f'Rendered 20000 indexed lookups in {duration:.3f} seconds.',
+    )
+
+    lines = result.splitlines()
+    assert lines[3] == 'color2'
+    assert lines[1999] == 'color1998'
+    assert lines[19999] == 'color1998'
+    assert duration < 2
+
+
 def test_compilation_of_jinja_template(test_templates_folder):
     template = test_templates_folder / 'env_vars'
     target = Path('/tmp/astrality') / template.name
@@ -232,3 +260,62 @@ def test_writing_template_file_with_invalid_permissions(tmpdir):
         permissions=permissions,
     )
     assert (target.stat().st_mode & 0o777) == 0o732
+
+
+def test_streaming_template_to_target_with_checksum(tmpdir):
+    tmpdir = Path(tmpdir)
+    template = tmpdir / 'template'
+    template.write_text(
+        '{% for i in range(1000) %}{{ key }}{{ i }}\n{% endfor %}',
+    )
+    target = tmpdir / 'target'
+    target.write_text('old content')
+
+    content_hash = stream_template(
+        template=template,
+        target=target,
+        context=Context({'key': 'value'}),
+        checksum=True,
+    )
+    content = target.read_bytes()
+    assert content.startswith(b'value0\nvalue1\n')
+    assert content_hash == hashlib.md5(content).hexdigest()
+    assert set(tmpdir.iterdir()) == {template, target}
+
+
+def test_failing_template_rendering_leaves_target_untouched(tmpdir):
+    tmpdir = Path(tmpdir)
+    template = tmpdir / 'template'
+    template.write_text('{{ 1 / 0 }}')
+    target = tmpdir / 'target'
+    target.write_text('old content')
+
+    with pytest.raises(ZeroDivisionError):
+        compile_template(
+            template=template,
+            target=target,
+            context={},
+            shell_command_working_directory=tmpdir,
+        )
+
+    assert target.read_text() == 'old content'
+    assert set(tmpdir.iterdir()) == {template, target}
+
+
+def test_compiling_template_to_symlinked_target(tmpdir):
+    tmpdir = Path(tmpdir)
+    template = tmpdir / 'template'
+    template.write_text('new content')
+    linked_file = tmpdir / 'linked_file'
+    linked_file.write_text('old content')
+    target = tmpdir / 'target'
+    target.symlink_to(linked_file)
+
+    compile_template(
+        template=template,
+        target=target,
+        context={},
+        shell_command_working_directory=tmpdir,
+    )
+    assert target.is_symlink()
+    assert linked_file.read_text() == 'new content'
@@ -1,11 +1,13 @@
 """Tests for Context class."""
 from math import inf
 from pathlib import Path
+import pickle
 import shutil
 
 import pytest
 
-from astrality.context import Context
+from astrality import utils
+from astrality.context import Context, ImportedContext, ImportedContextCache
 
 
 class TestContextClass:
@@ -69,6 +71,34 @@ class TestContextClass:
             'Integer index "2" is non-existent and ' \
             'had no lower index to be substituted for'
 
+    def test_integer_index_resolution_to_nearest_lower_index(self):
+        config = Context({1: 'one', 3: 'three', 5.5: 'five', 10: 'ten'})
+        assert config[2] == 'one'
+        assert config[4] == 'three'
+        assert config[5] == 'three'
+        assert config[6] == 'five'
+        assert config[100] == 'ten'
+
+    def test_integer_index_resolution_below_lowest_index(self):
+        config = Context({1: 'one', 3: 'three'})
+        assert config[0] == 'one'
+        assert config[-5] == 'one'
+
+        config[-1] = 'minus one'
+        assert config[0] == 'minus one'
+        assert config[-2] == 'minus one'
+
+    def test_integer_index_resolution_of_copies(self):
+        config = Context({1: 'one'})
+        copy = config.copy()
+        copy[3] = 'three'
+        assert copy[4] == 'three'
+        assert config[4] == 'one'
+
+        unpickled = pickle.loads(pickle.dumps(copy))
+        assert unpickled[2] == 'one'
+        assert unpickled[5] == 'three'
+
     def test_index_resolution_with_string_key(self):
         config = Context()
         config[2] = 'some_value'
@@ -76,6 +106,12 @@ class TestContextClass:
             config['test']
         assert exception.value.args[0] == 'test'
 
+    def test_missing_string_key_without_integer_keys(self):
+        config = Context({'key': 'value'})
+        with pytest.raises(KeyError) as exception:
+            config['test']
+        assert exception.value.args[0] == 'test'
+
     def test_use_of_recursive_config_objects_created_by_dicts(self):
         conf_dict = {
             'key1': 'value1',
@@ -267,3 +303,335 @@ def test_instantiating_with_directory_path(tmpdir):
             1: 'primary_value',
         },
     })
+
+
+class TestCopyOnWrite:
+    """Tests for structural sharing between copied contexts."""
+
+    def test_modifying_copy_does_not_affect_original(self):
+        context = Context({'colors': {1: 'red'}, 'font': 'mono'})
+        copy = context.copy()
+        copy['colors'][2] = 'blue'
+        copy['font'] = 'sans'
+
+        assert context == {'colors': {1: 'red'}, 'font': 'mono'}
+        assert copy == {'colors': {1: 'red', 2: 'blue'}, 'font': 'sans'}
+
+    def test_modifying_original_does_not_affect_copy(self):
+        context = Context({'colors': {1: 'red'}})
+        copy = Context(context)
+        context['colors'][1] = 'blue'
+
+        assert copy['colors'][1] == 'red'
+        assert context['colors'][1] == 'blue'
+
+    def test_copies_share_structure_until_modified(self):
+        context = Context({'colors': {1: 'red'}, 'fonts': {1: 'mono'}})
+        copy = context.copy()
+        assert copy._dict['colors']._dict is context._dict['colors']._dict
+
+        copy['colors'][1] = 'blue'
+        assert copy._dict['colors']._dict is not context._dict['colors']._dict
+        assert copy._dict['fonts']._dict is context._dict['fonts']._dict
+
+    def test_snapshot_is_immutable(self):
+        context = Context({'colors': {1: 'red'}})
+        snapshot = context.snapshot()
+
+        with pytest.raises(TypeError):
+            snapshot['colors'] = 'blue'
+
+        with pytest.raises(TypeError):
+            snapshot['colors'][1] = 'blue'
+
+        for value in snapshot.values():
+            with pytest.raises(TypeError):
+                value[1] = 'blue'
+
+    def test_snapshot_is_unaffected_by_later_modifications(self):
+        context = Context({'colors': {1: 'red'}})
+        snapshot = context.snapshot()
+        context['colors'][1] = 'blue'
+        context['new'] = 'value'
+
+        assert snapshot == {'colors': {1: 'red'}}
+        assert snapshot['colors'][2] == 'red'
+
+    def test_snapshot_is_unaffected_by_earlier_retrieved_sub_contexts(self):
+        context = Context({'colors': {1: 'a'}, 'nested': {'fonts': {1: 'a'}}})
+        colors = context['colors']
+        fonts = context['nested']['fonts']
+        snapshot = context.snapshot()
+        copy = context.copy()
+
+        colors[1] = 'X'
+        fonts[1] = 'X'
+        assert context['colors'][1] == 'X'
+        assert context['nested']['fonts'][1] == 'X'
+        for unaffected in (snapshot, copy):
+            assert unaffected['colors'][1] == 'a'
+            assert unaffected['nested']['fonts'][1] == 'a'
+
+    def test_changed_paths_between_context_and_snapshot(self):
+        context = Context({
+            'colors': {1: 'red', 2: 'blue'},
+            'fonts': {1: 'mono'},
+            'removed': 'value',
+        })
+        snapshot = context.snapshot()
+        assert context.changed_paths(snapshot) == set()
+
+        context['colors'][2] = 'green'
+        context['added'] = {'key': 'value'}
+        context.update({'removed': 1})
+        assert context.changed_paths(snapshot) == {
+            ('colors', 2),
+            ('added',),
+            ('removed',),
+        }
+        assert snapshot.changed_paths(context) == context.changed_paths(
+            snapshot,
+        )
+
+    def test_changed_paths_distinguishes_value_types(self):
+        context = Context({'value': 1})
+        snapshot = context.snapshot()
+        context['value'] = True
+        assert context.changed_paths(snapshot) == {('value',)}
+
+    def test_reverse_update_preserves_existing_keys(self):
+        context = Context({'key': 'original'})
+        context.reverse_update({'key': 'new', 'other': 'value'})
+        assert context == {'key': 'original', 'other': 'value'}
+
+    def test_pickling_shared_context(self):
+        context = Context({'colors': {1: 'red'}})
+        snapshot = context.snapshot()
+        assert pickle.dumps(context) == pickle.dumps(Context(context._dict))
+
+        unpickled = pickle.loads(pickle.dumps(snapshot))
+        unpickled['colors'] = 'modifiable'
+        assert unpickled['colors'] == 'modifiable'
+
+    def test_pickled_state_is_the_dictionary(self):
+        context = Context({'colors': {1: 'red'}, 2: 'two'})
+        assert context.__getstate__() is context._dict
+
+        unpickled = pickle.loads(
+            pickle.dumps(context, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        assert unpickled == context
+        assert unpickled[3] == 'two'
+
+        empty = pickle.loads(
+            pickle.dumps(Context(), protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        empty['key'] = 'value'
+        assert empty == {'key': 'value'}
+
+
+class TestContextJournal:
+    """Tests for versioning of context modifications."""
+
+    def test_version_increases_with_modifications(self):
+        context = Context()
+        initial_version = context.version
+
+        context['key'] = 'value'
+        assert context.version > initial_version
+
+    def test_diff_of_top_level_keys(self):
+        context = Context({'unchanged': 1, 'changed': 2})
+        version = context.version
+        assert context.diff(since_version=version) == set()
+
+        context['changed'] = 3
+        context['added'] = 4
+        assert context.diff(since_version=version) == {
+            ('changed',),
+            ('added',),
+        }
+
+    def test_diff_of_nested_sections(self):
+        context = Context({
+            'colors': {'background': {1: 'black'}, 'foreground': 'white'},
+            'fonts': {1: 'mono'},
+        })
+        version = context.version
+
+        context['colors']['background'][2] = 'grey'
+        assert context.version > version
+        assert context.diff(since_version=version) == {
+            ('colors', 'background', 2),
+        }
+
+        version = context.version
+        context['fonts'] = {1: 'sans'}
+        assert context.diff(since_version=version) == {('fonts',)}
+
+    def test_assigning_equal_value_is_not_a_modification(self):
+        context = Context({'colors': {1: 'red'}, 'number': 1})
+        version = context.version
+
+        context['colors'] = {1: 'red'}
+        context['number'] = 1
+        assert context.version == version
+        assert context.diff(since_version=version) == set()
+
+        context['number'] = True
+        assert context.diff(since_version=version) == {('number',)}
+
+    def test_import_context_of_unchanged_file(self, tmpdir):
+        context_file = Path(tmpdir) / 'context.yml'
+        context_file.write_text('colors:\n  1: red\nfonts:\n  1: mono\n')
+        context = Context()
+        context.import_context(from_path=context_file)
+        version = context.version
+
+        context.import_context(from_path=context_file)
+        assert context.diff(since_version=version) == set()
+
+        context_file.write_text('colors:\n  1: blue\nfonts:\n  1: mono\n')
+        context.import_context(from_path=context_file)
+        assert context.diff(since_version=version) == {('colors',)}
+
+    def test_modified_since_with_integer_index_resolution(self):
+        context = Context({'colors': {1: 'red', 2: 'blue'}})
+        version = context.version
+        assert not context.modified_since(('colors', 3), version)
+
+        # Index 3 resolves to index 2
+        context['colors'][2] = 'green'
+        assert context.modified_since(('colors', 3), version)
+        assert not context.modified_since(('colors', 1), version)
+
+        # Inserting index 3 changes what index 3 resolves to
+        version = context.version
+        context['colors'][3] = 'yellow'
+        assert context.modified_since(('colors', 3), version)
+        assert context.modified_since(('colors', 4), version)
+        assert not context.modified_since(('colors', 2), version)
+
+    def test_modified_since_of_non_existent_path(self):
+        context = Context({'colors': {1: 'red'}})
+        version = context.version
+        assert not context.modified_since(('fonts', 1), version)
+
+        context['fonts'] = {1: 'mono'}
+        assert context.modified_since(('fonts', 1), version)
+
+    def test_copies_do_not_share_journal_modifications(self):
+        context = Context({'colors': {1: 'red'}})
+        version = context.version
+        snapshot = context.snapshot()
+
+        context['colors'][1] = 'blue'
+        assert context.diff(since_version=version) == {('colors', 1)}
+        assert snapshot.diff(since_version=version) == set()
+        assert snapshot.version == version
+
+
+class TestImportedContextCache:
+    """Tests for caching of imported context files."""
+
+    @pytest.fixture
+    def compilations(self, monkeypatch):
+        """Return list of compiled context files."""
+        compiled = []
+        compile_yaml = utils.compile_yaml
+
+        def counting_compile_yaml(path, context):
+            compiled.append(path)
+            return compile_yaml(path=path, context=context)
+
+        monkeypatch.setattr(utils, 'compile_yaml', counting_compile_yaml)
+        return compiled
+
+    def test_unchanged_file_is_parsed_once(self, tmpdir, compilations):
+        context_file = Path(tmpdir) / 'context.yml'
+        context_file.write_text('colors:\n  1: red\n')
+
+        context = Context()
+        context.import_context(from_path=context_file)
+        context.import_context(from_path=context_file)
+        Context().import_context(from_path=context_file)
+        assert len(compilations) == 1
+
+        context_file.write_text('colors:\n  1: blue\n')
+        context.import_context(from_path=context_file)
+        assert len(compilations) == 2
+        assert context['colors'][1] == 'blue'
+
+    def test_referenced_context_keys_invalidate_cache(
+        self,
+        tmpdir,
+        compilations,
+    ):
+        context_file = Path(tmpdir) / 'context.yml'
+        context_file.write_text('colors:\n  1: {{ scheme.background }}\n')
+
+        context = Context({'scheme': {'background': 'red'}, 'other': 1})
+        context.import_context(from_path=context_file)
+        assert context['colors'][1] == 'red'
+
+        context['other'] = 2
+        context.import_context(from_path=context_file)
+        assert len(compilations) == 1
+
+        context['scheme']['background'] = 'blue'
+        context.import_context(from_path=context_file)
+        assert len(compilations) == 2
+        assert context['colors'][1] == 'blue'
+
+    def test_templates_using_environment_are_not_cached(
+        self,
+        tmpdir,
+        compilations,
+    ):
+        context_file = Path(tmpdir) / 'context.yml'
+        context_file.write_text('section:\n  home: {{ env.HOME }}\n')
+
+        Context().import_context(from_path=context_file)
+        Context().import_context(from_path=context_file)
+        assert len(compilations) == 2
+
+    def test_imported_sections_are_not_shared(self, tmpdir):
+        context_file = Path(tmpdir) / 'context.yml'
+        context_file.write_text('colors:\n  1: red\n')
+
+        context = Context()
+        context.import_context(from_path=context_file)
+        context['colors'][1] = 'blue'
+
+        other_context = Context()
+        other_context.import_context(
+            from_path=context_file,
+            from_section='colors',
+            to_section='palette',
+        )
+        assert other_context == {'palette': {1: 'red'}}
+
+    def test_least_recently_used_files_are_evicted(self, tmpdir):
+        cache = ImportedContextCache(maxsize=2)
+        context = Context()
+        paths = []
+        for number in range(3):
+            path = Path(tmpdir) / f'{number}.yml'
+            path.write_text(f'section:\n  key: {number}\n')
+            paths.append(path)
+
+        cache.get(path=paths[0], context=context)
+        cache.get(path=paths[1], context=context)
+        cache.get(path=paths[0], context=context)
+        cache.get(path=paths[2], context=context)
+
+        cached_paths = {key[0] for key in cache._entries}
+        assert cached_paths == {str(paths[0]), str(paths[2])}
+
+    def test_sections_are_converted_lazily(self):
+        imported_context = ImportedContext({
+            'section1': {'key': 'value'},
+            'section2': {'key': 'value'},
+        })
+        assert imported_context.section('section1') == {'key': 'value'}
+        assert list(imported_context._sections) == ['section1']
@@ -0,0 +1,381 @@
+"""Tests for astrality.control."""
+
+import json
+import socket
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from astrality.context import Context
+from astrality.control import (
+    ControlError,
+    ControlServer,
+    request_handoff,
+    run_client,
+    send_command,
+)
+from astrality.module import ModuleManager
+from astrality.tests.utils import Retry
+
+
+def module_manager(temp_dir, exit_message='exit', color='red'):
+    """Return module manager with module appending to log in temp_dir."""
+    return ModuleManager(
+        config={'modules': {'run_timeout': 1}},
+        modules={
+            'A': {
+                'on_startup': {
+                    'run': {'shell': f'echo startup >> {temp_dir / "log"}'},
+                    'compile': {
+                        'content': 'template',
+                        'target': str(temp_dir / 'target'),
+                    },
+                },
+                'on_event': {
+                    'run': {'shell': f'echo event >> {temp_dir / "log"}'},
+                },
+                'on_exit': {
+                    'run': {
+                        'shell': f'echo {exit_message} >> {temp_dir / "log"}',
+                    },
+                },
+            },
+        },
+        context=Context({'colors': {'primary': color}}),
+        directory=temp_dir,
+    )
+
+
+@pytest.fixture
+def control(tmpdir):
+    """Return started control server managing modules in tmpdir."""
+    temp_dir = Path(tmpdir)
+    (temp_dir / 'template').write_text('{{ colors.primary }}')
+    old_module_manager = module_manager(temp_dir)
+    old_module_manager.finish_tasks()
+    old_module_manager.directory_watcher.stop()
+
+    control_server = ControlServer(
+        module_manager=old_module_manager,
+        path=temp_dir / 'control.sock',
+        on_handoff=mock.Mock(),
+    )
+    control_server.start()
+    yield control_server
+    control_server.stop()
+    old_module_manager.exit()
+
+
+def test_status_and_metrics(control):
+    status = send_command('status', socket_file=control.path)
+    assert status['startup_done']
+    assert status['events'] == {'A': 'static'}
+
+    # Actions are measured from the first metrics command onwards
+    assert send_command('metrics', socket_file=control.path) == {}
+    send_command('event', {'module': 'A'}, socket_file=control.path)
+    metrics = send_command('metrics', socket_file=control.path)
+    assert metrics['run']['count'] == 1
+
+
+def test_forcing_event(control):
+    log = control.path.parent / 'log'
+    assert send_command(
+        'event',
+        arguments={'module': 'A'},
+        socket_file=control.path,
+    ) == 'static'
+    assert log.read_text().split() == ['startup', 'event']
+
+
+def test_recompiling_modified_template(control):
+    template = control.path.parent / 'template'
+    target = control.path.parent / 'target'
+    assert target.read_text() == 'red'
+
+    template.write_text('{{ colors.primary }}!')
+    send_command(
+        'recompile',
+        arguments={'path': str(template)},
+        socket_file=control.path,
+    )
+    assert target.read_text() == 'red!'
+
+
+def test_restarting_module(control):
+    log = control.path.parent / 'log'
+    old_module = control.module_manager.modules['A']
+
+    send_command(
+        'reload',
+        arguments={'module': 'A'},
+        socket_file=control.path,
+    )
+    assert control.module_manager.modules['A'] is not old_module
+    assert log.read_text().split() == ['startup', 'exit', 'startup']
+
+
+def test_invalid_commands(control):
+    with pytest.raises(ControlError, match='Unknown command "foo"'):
+        send_command('foo', socket_file=control.path)
+
+    with pytest.raises(ControlError, match='Module "B" is not enabled'):
+        send_command(
+            'event',
+            arguments={'module': 'B'},
+            socket_file=control.path,
+        )
+
+    with pytest.raises(
+        ControlError,
+        match='Invalid arguments for command "status"',
+    ):
+        send_command(
+            'status',
+            arguments={'invalid': 'argument'},
+            socket_file=control.path,
+        )
+
+    assert control.respond(b'{') == {
+        'ok': False,
+        'error': 'Request must be valid JSON.',
+    }
+
+
+def test_failing_commands_are_logged(control, caplog):
+    """Errors raised by actions should not be reported as invalid requests."""
+    with mock.patch.object(
+        control.module_manager,
+        'recompile_templates',
+        side_effect=ValueError('broken action'),
+    ):
+        with pytest.raises(ControlError, match='ValueError: broken action'):
+            send_command('recompile', socket_file=control.path)
+
+    assert 'Control command failed!' in caplog.text
+    assert 'Traceback' in caplog.text
+
+
+def test_stopping_removes_socket(control):
+    control.stop()
+    assert not control.path.exists()
+
+    with pytest.raises(ConnectionError):
+        send_command('status', socket_file=control.path)
+
+
+def test_starting_on_socket_of_live_process(control, caplog):
+    """The socket of a live process should not be taken over."""
+    other = ControlServer(
+        module_manager=control.module_manager,
+        path=control.path,
+    )
+    other.start()
+    assert 'Another Astrality process is listening' in caplog.text
+    other.stop()
+    assert send_command('status', socket_file=control.path)['pid']
+
+
+def test_starting_on_stale_socket(tmpdir):
+    """Sockets left behind by dead processes should be replaced."""
+    temp_dir = Path(tmpdir)
+    path = temp_dir / 'control.sock'
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    assert path.exists()
+
+    control_server = ControlServer(
+        module_manager=module_manager(temp_dir),
+        path=path,
+    )
+    control_server.start()
+    try:
+        assert send_command('status', socket_file=path)['pid']
+    finally:
+        control_server.stop()
+        control_server.module_manager.exit()
+
+
+def test_command_line_client(control, monkeypatch, capsys):
+    monkeypatch.setattr(
+        'astrality.control.socket_path',
+        lambda: control.path,
+    )
+    assert run_client(command='status') == 0
+    assert json.loads(capsys.readouterr().out)['events'] == {'A': 'static'}
+
+    assert run_client(command='status', argument='A') == 2
+    assert run_client(command='event', argument='B') == 1
+    assert 'Module "B" is not enabled' in capsys.readouterr().err
+
+
+def test_handing_off_unchanged_modules(control):
+    """Unchanged modules should neither be exited nor started anew."""
+    temp_dir = control.path.parent
+    new_module_manager = module_manager(temp_dir)
+    assert request_handoff(new_module_manager, socket_file=control.path)
+    assert Retry()(lambda: control.on_handoff.called)
+    assert control.module_manager.modules == {}
+    assert new_module_manager.adopted_modules == {'A': 'static'}
+
+    new_module_manager.finish_tasks()
+    new_module_manager.directory_watcher.stop()
+    assert (temp_dir / 'log').read_text().split() == ['startup']
+
+    # Adopted compilations are recompiled when templates are modified
+    (temp_dir / 'template').write_text('{{ colors.primary }}!')
+    new_module_manager.recompile_modified_template(
+        modified=temp_dir / 'template',
+        force=True,
+    )
+    assert (temp_dir / 'target').read_text() == 'red!'
+
+    new_module_manager.exit()
+    assert (temp_dir / 'log').read_text().split() == ['startup', 'exit']
+
+
+def test_handing_off_modified_modules(control):
+    """Modified modules should be exited by the old process."""
+    temp_dir = control.path.parent
+    new_module_manager = module_manager(temp_dir, exit_message='goodbye')
+    assert request_handoff(new_module_manager, socket_file=control.path)
+    assert new_module_manager.adopted_modules == {}
+    assert (temp_dir / 'log').read_text().split() == ['startup', 'exit']
+
+    new_module_manager.finish_tasks()
+    new_module_manager.exit()
+    assert (temp_dir / 'log').read_text().split() \
+        == ['startup', 'exit', 'startup', 'goodbye']
+
+
+def test_handing_off_with_modified_context(control):
+    """Adopted modules should be recompiled if the context is modified."""
+    temp_dir = control.path.parent
+    new_module_manager = module_manager(temp_dir, color='blue')
+    assert request_handoff(new_module_manager, socket_file=control.path)
+    assert new_module_manager.adopted_modules == {'A': 'static'}
+    assert new_module_manager.adopted_context_modified
+
+    new_module_manager.finish_tasks()
+    new_module_manager.exit()
+    assert (temp_dir / 'target').read_text() == 'blue'
+    assert (temp_dir / 'log').read_text().split() == ['startup', 'exit']
+
+
+def test_handing_off_with_deleted_compilation_target(control):
+    """Modules are started anew if their compilation targets are deleted."""
+    temp_dir = control.path.parent
+    (temp_dir / 'target').unlink()
+    new_module_manager = module_manager(temp_dir)
+    assert request_handoff(new_module_manager, socket_file=control.path)
+    assert new_module_manager.adopted_modules == {}
+
+    new_module_manager.finish_tasks()
+    new_module_manager.exit()
+    assert (temp_dir / 'target').read_text() == 'red'
+
+
+def test_handoff_without_running_process(tmpdir):
+    new_module_manager = module_manager(Path(tmpdir))
+    assert not request_handoff(
+        new_module_manager,
+        socket_file=Path(tmpdir) / 'control.sock',
+    )
+    assert new_module_manager.adopted_modules == {}
+
+
+def importing_module_manager(temp_dir, greeting='hello'):
+    """Return module manager with module compiling imported context."""
+    return ModuleManager(
+        config={'modules': {'run_timeout': 1}},
+        modules={
+            'A': {
+                'on_startup': {
+                    'import_context': {
+                        'from_path': str(temp_dir / 'colors.yml'),
+                    },
+                    'compile': {
+                        'content': 'template',
+                        'target': str(temp_dir / 'target'),
+                    },
+                },
+                'on_event': {
+                    'compile': {
+                        'content': 'event_template',
+                        'target': str(temp_dir / 'event_target'),
+                    },
+                },
+            },
+        },
+        context=Context({'greeting': {'text': greeting}}),
+        directory=temp_dir,
+    )
+
+
+@pytest.fixture
+def importing_control(tmpdir):
+    """Return started control server managing module importing context."""
+    temp_dir = Path(tmpdir)
+    (temp_dir / 'colors.yml').write_text('colors:\n  primary: red\n')
+    (temp_dir / 'template').write_text('{{ colors.primary }}')
+    (temp_dir / 'event_template').write_text(
+        '{{ greeting.text }} {{ colors.primary }}',
+    )
+    old_module_manager = importing_module_manager(temp_dir)
+    old_module_manager.finish_tasks()
+    old_module_manager.execute(action='all', block='on_event')
+    old_module_manager.directory_watcher.stop()
+
+    control_server = ControlServer(
+        module_manager=old_module_manager,
+        path=temp_dir / 'control.sock',
+        on_handoff=mock.Mock(),
+    )
+    control_server.start()
+    yield control_server
+    control_server.stop()
+    old_module_manager.exit()
+
+
+def test_adopted_modules_import_context(importing_control):
+    """Context imports of adopted modules should be executed anew."""
+    temp_dir = importing_control.path.parent
+    new_module_manager = importing_module_manager(temp_dir)
+    assert request_handoff(
+        new_module_manager,
+        socket_file=importing_control.path,
+    )
+    assert new_module_manager.adopted_modules == {'A': 'static'}
+
+    new_module_manager.finish_tasks()
+    new_module_manager.directory_watcher.stop()
+    assert 'colors' in new_module_manager.application_context
+
+    (temp_dir / 'template').write_text('{{ colors.primary }}!')
+    new_module_manager.recompile_modified_template(
+        modified=temp_dir / 'template',
+        force=True,
+    )
+    assert (temp_dir / 'target').read_text() == 'red!'
+    new_module_manager.exit()
+
+
+def test_recompiling_all_adopted_compilations(importing_control):
+    """All restored compilations should be recompiled with a new context."""
+    temp_dir = importing_control.path.parent
+    assert (temp_dir / 'event_target').read_text() == 'hello red'
+
+    new_module_manager = importing_module_manager(temp_dir, greeting='bye')
+    assert request_handoff(
+        new_module_manager,
+        socket_file=importing_control.path,
+    )
+    assert new_module_manager.adopted_context_modified
+
+    new_module_manager.finish_tasks()
+    new_module_manager.directory_watcher.stop()
+    assert (temp_dir / 'target').read_text() == 'red'
+    assert (temp_dir / 'event_target').read_text() == 'bye red'
+    new_module_manager.exit()
@@ -0,0 +1,69 @@
+"""Tests for astrality.profiler."""
+
+import json
+import os
+import pstats
+from pathlib import Path
+
+from astrality.astrality import main
+from astrality.profiler import Profiler, profiler
+
+
+def test_disabled_profiler_records_nothing():
+    """Measurements should only be recorded when profiling is enabled."""
+    disabled_profiler = Profiler()
+    with disabled_profiler.measure('phases', 'nothing'):
+        pass
+
+    assert disabled_profiler.measurements == {}
+
+
+def test_measurements_are_accumulated():
+    """Repeated measurements should be summed and counted."""
+    enabled_profiler = Profiler()
+    enabled_profiler.enable()
+
+    for _ in range(3):
+        with enabled_profiler.measure('actions', 'compile'):
+            sum(range(1000))
+
+    with enabled_profiler.measure('actions', 'run'):
+        pass
+
+    report = enabled_profiler.report()
+    assert report['actions']['compile']['count'] == 3
+    assert report['actions']['compile']['wall'] > 0
+    assert report['actions']['run']['count'] == 1
+    assert report['total']['wall'] >= report['actions']['compile']['wall']
+
+
+def test_profiling_startup_of_main_process(
+    monkeypatch,
+    test_config_directory,
+    tmpdir,
+):
+    """Profiling reports should be written after startup."""
+    monkeypatch.setitem(
+        os.environ,
+        'ASTRALITY_CONFIG_HOME',
+        str(test_config_directory),
+    )
+    report_path = Path(tmpdir, 'profile.json')
+    cprofile = Path(tmpdir, 'profile.pstats')
+    main(
+        modules=['../test_modules/two_modules::bangladesh'],
+        test=True,
+        profile=report_path,
+        cprofile=cprofile,
+    )
+    assert not profiler.enabled
+
+    report = json.loads(report_path.read_text())
+    assert {'user_configuration', 'module_manager', 'on_startup'} \
+        <= set(report['phases'].keys())
+    assert 'actions' in report
+    assert 'modules' in report
+    assert 'action_metrics' in report
+
+    stats = pstats.Stats(str(cprofile))
+    assert stats.total_calls > 0
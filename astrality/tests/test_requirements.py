@@ -155,3 +155,17 @@ def test_recursive_module_requirements():
     assert Requirement.pop_missing_module_dependencies(
         modules={'A': moduleA, 'B': moduleB, 'C': moduleC},
     ) == {}
+
+
+def test_module_dependencies_with_long_dependency_chain():
+    """Missing dependencies should be found without rescanning all modules."""
+    modules = {
+        f'module{number}': Module(
+            name=f'module{number}',
+            module_config={'requires': [{'module': f'module{number + 1}'}]},
+            module_directory=Path(__file__).parent,
+        )
+        for number
+        in range(500)
+    }
+    assert Requirement.pop_missing_module_dependencies(modules=modules) == {}
@@ -0,0 +1,129 @@
+"""Tests for astrality.scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from astrality.scheduler import DependencyGraph, describe_cycle
+
+
+def test_unsatisfied_dependencies_propagate_to_dependents():
+    """Nodes depending on nodes with missing dependencies are unsatisfied."""
+    graph = DependencyGraph({
+        'A': ['B'],
+        'B': ['C'],
+        'C': ['missing'],
+        'D': [],
+        'E': ['D', 'A'],
+    })
+    assert graph.unsatisfied() == {'A', 'B', 'C', 'E'}
+
+
+def test_unsatisfied_dependencies_of_long_chain():
+    """Propagation should not be limited by the recursion limit."""
+    graph = DependencyGraph({
+        number: [number + 1]
+        for number
+        in range(10000)
+    })
+    assert len(graph.unsatisfied()) == 10000
+
+
+def test_cycles():
+    """All strongly connected components should be reported."""
+    graph = DependencyGraph({
+        'A': ['B'],
+        'B': ['C'],
+        'C': ['A'],
+        'D': ['D'],
+        'E': ['A'],
+        'F': [],
+    })
+    cycles = graph.cycles()
+    assert sorted(sorted(cycle) for cycle in cycles) == [
+        ['A', 'B', 'C'],
+        ['D'],
+    ]
+
+
+def test_describing_cycle():
+    assert describe_cycle(['A', 'B']) == 'A -> B -> A'
+
+
+def test_topological_order_is_stable():
+    """Dependencies are ordered first, otherwise the original order is kept."""
+    graph = DependencyGraph({
+        'A': ['C'],
+        'B': [],
+        'C': [],
+        'D': ['A', 'missing'],
+    })
+    order = graph.topological_order()
+    assert order.index('C') < order.index('A') < order.index('D')
+    assert graph.topological_order()[:2] == ['B', 'C']
+
+
+def test_topological_order_with_cycles():
+    """All nodes should be ordered even if they depend on each other."""
+    graph = DependencyGraph({
+        'A': ['B'],
+        'B': ['A'],
+        'C': ['A'],
+    })
+    order = graph.topological_order()
+    assert sorted(order) == ['A', 'B', 'C']
+    assert order[-1] == 'C'
+
+
+def test_concurrent_scheduling_respects_dependencies():
+    """Independent nodes run concurrently, but never before dependencies."""
+    graph = DependencyGraph({
+        'first': [],
+        'second': [],
+        'third': [],
+        'dependent': ['first', 'second', 'third'],
+    })
+    finished = []
+    lock = threading.Lock()
+
+    def process(node):
+        time.sleep(0.1)
+        with lock:
+            finished.append(node)
+
+    start = time.perf_counter()
+    graph.schedule(function=process, workers=3)
+    assert time.perf_counter() - start < 0.35
+    assert finished[-1] == 'dependent'
+    assert set(finished) == {'first', 'second', 'third', 'dependent'}
+
+
+def test_concurrent_scheduling_with_cycles():
+    graph = DependencyGraph({'A': ['B'], 'B': ['A'], 'C': []})
+    processed = []
+    graph.schedule(function=processed.append, workers=2)
+    assert sorted(processed) == ['A', 'B', 'C']
+
+
+def test_exceptions_are_raised_after_all_nodes_are_processed():
+    graph = DependencyGraph({'A': [], 'B': ['A'], 'C': []})
+    processed = []
+
+    def process(node):
+        processed.append(node)
+        if node == 'A':
+            raise ValueError(node)
+
+    with pytest.raises(ValueError):
+        graph.schedule(function=process, workers=2)
+    assert sorted(processed) == ['A', 'B', 'C']
+
+
+def test_concurrent_scheduling_processes_each_node_once():
+    """Dependents of early processed nodes should not be scheduled twice."""
+    for _ in range(200):
+        graph = DependencyGraph({'A': [], 'B': ['A'], 'C': [], 'D': ['C']})
+        processed = []
+        graph.schedule(function=processed.append, workers=2)
+        assert sorted(processed) == ['A', 'B', 'C', 'D']
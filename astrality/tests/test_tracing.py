@@ -0,0 +1,144 @@
+"""Tests for astrality.tracing."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from astrality import tracing
+from astrality.actions import CopyAction
+from astrality.module import ModuleManager
+from astrality.persistence import CreatedFiles
+
+
+@pytest.fixture
+def hooks(monkeypatch):
+    """Return fresh hook registry used by all actions."""
+    hooks = tracing.HookRegistry()
+    monkeypatch.setattr(tracing, 'hooks', hooks)
+    return hooks
+
+
+def test_start_and_end_events_of_action(hooks, create_temp_files):
+    """Registered hooks should receive start and end events."""
+    content, target = create_temp_files(2)
+    content.write_text('content')
+
+    events = []
+    hooks.register(events.append)
+
+    copy_action = CopyAction(
+        options={'content': str(content), 'target': str(target)},
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    copy_action.execute()
+
+    start, end = events
+    assert start.phase == 'start'
+    assert start.duration is None
+    assert end.phase == 'end'
+    assert end.module == 'test'
+    assert end.action == 'copy'
+    assert end.options == {'content': str(content), 'target': str(target)}
+    assert end.duration > 0
+    assert end.bytes_written == len('content')
+    assert end.files_touched == 1
+
+    # Unregistered hooks should not receive any more events
+    hooks.unregister(events.append)
+    copy_action.execute()
+    assert len(events) == 2
+
+
+def test_failing_hooks_do_not_interrupt_actions(hooks, create_temp_files):
+    """Exceptions raised by hooks should be logged and ignored."""
+    content, target = create_temp_files(2)
+    content.write_text('content')
+
+    def failing_hook(event):
+        raise RuntimeError
+
+    hooks.register(failing_hook)
+    copy_action = CopyAction(
+        options={'content': str(content), 'target': str(target)},
+        directory=content.parent,
+        replacer=lambda x: x,
+        context_store={},
+        creation_store=CreatedFiles().wrapper_for(module='test'),
+    )
+    copy_action.execute()
+    assert target.read_text() == 'content'
+
+
+def test_percentiles():
+    """Percentiles should use the nearest-rank method."""
+    values = [float(value) for value in range(1, 101)]
+    assert tracing.percentile(values, 50) == 50.0
+    assert tracing.percentile(values, 95) == 95.0
+    assert tracing.percentile([3.0], 95) == 3.0
+    assert tracing.percentile([], 50) == 0.0
+
+
+def test_action_metrics_of_module_manager(hooks):
+    """ModuleManager should aggregate statistics of executed actions."""
+    modules = {
+        'A': {'run': [{'shell': 'echo 1'}, {'shell': 'echo 2'}]},
+        'B': {'run': {'shell': 'echo 3'}},
+    }
+    module_manager = ModuleManager(modules=modules, metrics=True)
+    module_manager.finish_tasks()
+
+    summary = module_manager.action_metrics.summary()
+    assert summary['run']['count'] == 3
+    assert 0 < summary['run']['p50'] <= summary['run']['p95']
+    assert summary['run']['total'] >= summary['run']['p95']
+    assert summary['block:run']['count'] == 2
+
+
+def test_metrics_are_disabled_by_default(hooks):
+    """No hooks should be registered unless metrics are asked for."""
+    module_manager = ModuleManager(modules={'A': {'run': {'shell': 'echo'}}})
+    assert module_manager.action_metrics is None
+    assert not hooks
+
+    metrics = module_manager.enable_metrics()
+    assert module_manager.enable_metrics() is metrics
+    assert hooks
+
+
+def test_action_metrics_keep_bounded_number_of_durations():
+    """Percentiles should only use recent durations, totals all of them."""
+    metrics = tracing.ActionMetrics(window=3)
+    for duration in (10.0, 1.0, 2.0, 3.0):
+        metrics(tracing.ActionEvent(
+            phase='end',
+            module='A',
+            action='run',
+            options={},
+            duration=duration,
+        ))
+
+    assert len(metrics.durations['run']) == 3
+    summary = metrics.summary()['run']
+    assert summary['count'] == 4
+    assert summary['total'] == 16.0
+    assert summary['p95'] == 3.0
+
+
+def test_json_lines_exporter(hooks, tmpdir):
+    """End events should be appended as JSON lines."""
+    path = Path(tmpdir, 'metrics', 'actions.jsonl')
+    hooks.register(tracing.JSONLinesExporter(path=path))
+
+    module_manager = ModuleManager(modules={'A': {'run': {'shell': 'echo'}}})
+    module_manager.finish_tasks()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event['action'] for event in events] == ['run', 'block:run']
+    assert events[0]['module'] == 'A'
+    assert events[0]['options'] == {'shell': 'echo'}
+    assert events[1]['module'] == 'A'
+    assert events[1]['options'] == {'run': {'shell': 'echo'}}
@@ -0,0 +1,115 @@
+"""Tests for templates pre-rendered for upcoming events."""
+
+from pathlib import Path
+
+from astrality.context import Context
+from astrality.module import ModuleManager
+from astrality.utils import dump_yaml
+
+EVENTS = ('monday', 'tuesday', 'wednesday')
+
+
+def themed_module_manager(
+    tmpdir,
+    template='{{ colors.background }}',
+    precompile_events=True,
+):
+    """Return module manager with a module swapping colors each weekday."""
+    directory = Path(tmpdir)
+    dump_yaml(
+        data={event: {'background': event} for event in EVENTS},
+        path=directory / 'colors.yml',
+    )
+    (directory / 'theme.template').write_text(template)
+    module_manager = ModuleManager(
+        modules={
+            'theme': {
+                'event_listener': {'type': 'weekday'},
+                'precompile_events': precompile_events,
+                'on_startup': {'trigger': {'block': 'on_event'}},
+                'on_event': {
+                    'import_context': {
+                        'from_path': 'colors.yml',
+                        'from_section': '{event}',
+                        'to_section': 'colors',
+                    },
+                    'compile': {
+                        'content': 'theme.template',
+                        'target': 'theme',
+                    },
+                },
+            },
+        },
+        context=Context(),
+        directory=directory,
+    )
+    module = module_manager.modules['theme']
+    module.event_listener.event = lambda: module.current_event
+    module.event_listener.events = EVENTS
+    module.current_event = 'monday'
+    return module_manager, module
+
+
+def test_event_change_uses_pre_rendered_variant(tmpdir, caplog):
+    """Templates should be rendered for other events ahead of time."""
+    module_manager, module = themed_module_manager(tmpdir)
+    target = Path(tmpdir) / 'theme'
+    module_manager.finish_tasks()
+    assert target.read_text() == 'monday'
+
+    variants = module.event_variants
+    variants.thread.join()
+    assert {key[0] for key in variants.variants} == {'tuesday', 'wednesday'}
+    template = Path(tmpdir) / 'theme.template'
+    variant = variants.variants[('tuesday', template, target)]
+    assert variant.path.read_text() == 'tuesday'
+
+    module.current_event = 'tuesday'
+    caplog.clear()
+    module_manager.finish_tasks()
+    assert target.read_text() == 'tuesday'
+    assert not variant.path.exists()
+    assert 'pre-rendered for event "tuesday"' in caplog.text
+
+    # The previous event is rendered anew, while the consumed is not
+    variants.thread.join()
+    assert {key[0] for key in variants.variants} == {'monday', 'wednesday'}
+
+
+def test_outdated_variants_are_not_used(tmpdir, caplog):
+    """Variants rendered with other context values should be compiled."""
+    module_manager, module = themed_module_manager(tmpdir)
+    target = Path(tmpdir) / 'theme'
+    module_manager.finish_tasks()
+    module.event_variants.thread.join()
+
+    dump_yaml(
+        data={event: {'background': event.upper()} for event in EVENTS},
+        path=Path(tmpdir) / 'colors.yml',
+    )
+    module.current_event = 'tuesday'
+    caplog.clear()
+    module_manager.finish_tasks()
+    assert target.read_text() == 'TUESDAY'
+    assert 'pre-rendered' not in caplog.text
+
+
+def test_non_deterministic_templates_are_not_pre_rendered(tmpdir):
+    """Templates which might render differently should not be pre-rendered."""
+    module_manager, module = themed_module_manager(
+        tmpdir,
+        template='{{ env.HOME }}',
+    )
+    module_manager.finish_tasks()
+    assert module.event_variants.thread is None
+    assert module.event_variants.variants == {}
+
+
+def test_variants_are_only_rendered_when_enabled(tmpdir):
+    """Modules should not pre-render templates by default."""
+    module_manager, module = themed_module_manager(
+        tmpdir,
+        precompile_events=False,
+    )
+    module_manager.finish_tasks()
+    assert module.event_variants is None
@@ -0,0 +1,74 @@
+"""Tests for astrality.utils.copy."""
+
+import os
+import shutil
+
+import pytest
+
+from astrality import utils
+
+
+def test_copying_file_content_and_metadata(create_temp_files):
+    """Copies should have identical content and modification time."""
+    source, destination = create_temp_files(2)
+    source.write_bytes(os.urandom(200_000))
+    source.chmod(0o751)
+
+    utils.copy(source=source, destination=destination)
+
+    assert destination.read_bytes() == source.read_bytes()
+    assert destination.stat().st_mtime_ns == source.stat().st_mtime_ns
+    assert destination.stat().st_mode == source.stat().st_mode
+    assert utils.identical_files(source=source, destination=destination)
+
+
+def test_copying_into_directory(create_temp_files):
+    """Copying into directory should keep the file name."""
+    source, destination = create_temp_files(2)
+    source.write_text('content')
+
+    utils.copy(source=source, destination=destination.parent)
+    assert (destination.parent / source.name).read_text() == 'content'
+
+
+def test_copying_onto_itself(create_temp_files):
+    """Copying a file onto a symlink to itself should not truncate it."""
+    source, destination = create_temp_files(2)
+    source.write_text('content')
+    destination.unlink()
+    destination.symlink_to(source)
+
+    with pytest.raises(shutil.SameFileError):
+        utils.copy(source=source, destination=destination)
+    assert source.read_text() == 'content'
+
+
+def test_falling_back_to_buffered_copy(create_temp_files, monkeypatch):
+    """Unsupported kernel copy methods should fall back gracefully."""
+    source, destination = create_temp_files(2)
+    source.write_text('content')
+
+    def unsupported(*args, **kwargs):
+        raise OSError(utils.errno.EXDEV, 'Cross-device copy')
+
+    monkeypatch.setattr(utils.fcntl, 'ioctl', unsupported)
+    monkeypatch.setattr(utils.os, 'copy_file_range', unsupported, raising=False)
+    monkeypatch.setattr(utils.os, 'sendfile', unsupported)
+
+    utils.copy(source=source, destination=destination)
+    assert destination.read_text() == 'content'
+
+
+def test_identical_file_comparison_methods(create_temp_files):
+    """Files should be compared according to the compare parameter."""
+    source, destination = create_temp_files(2)
+    source.write_text('content')
+    destination.write_text('CONTENT')
+    os.utime(destination, ns=(0, source.stat().st_mtime_ns))
+
+    assert utils.identical_files(source, destination, compare='metadata')
+    assert not utils.identical_files(source, destination, compare='content')
+    assert not utils.identical_files(source, destination, compare='none')
+
+    destination.write_text('content')
+    assert utils.identical_files(source, destination, compare='content')
@@ -0,0 +1,335 @@
+"""
+Module for tracing the execution of module actions.
+
+Every hook registered with :data:`hooks` is invoked with an
+:class:`ActionEvent` when an action starts executing, and when it ends.
+Action blocks emit events in the same way, covering all actions of a given
+type within the block. When no hooks are registered, tracing is skipped.
+Two hook types are provided; :class:`ActionMetrics`, which aggregates latency
+statistics in memory, and :class:`JSONLinesExporter`, which appends events to
+a file for later analysis.
+
+Example usage:
+
+>>> from astrality import tracing
+>>> metrics = tracing.ActionMetrics()
+>>> tracing.hooks.register(metrics)
+>>> module_manager.finish_tasks()
+>>> metrics.summary()['compile']['p95']
+"""
+
+import functools
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+    cast,
+)
+
+
+class ActionEvent:
+    """
+    Event emitted when an action starts or ends its execution.
+
+    :ivar phase: Either 'start' or 'end'.
+    :ivar module: Name of module which the action belongs to.
+    :ivar action: Action type, for example 'compile', or 'block:compile' for
+        all compile actions of an action block.
+    :ivar options: User options of the action.
+    :ivar timestamp: Seconds since the epoch when the event was emitted.
+    :ivar duration: Seconds spent executing the action. None for start events.
+    :ivar bytes_written: Number of bytes written by the action.
+    :ivar files_touched: Number of files created or modified by the action.
+    """
+
+    __slots__ = (
+        'phase',
+        'module',
+        'action',
+        'options',
+        'timestamp',
+        'duration',
+        'bytes_written',
+        'files_touched',
+    )
+
+    def __init__(
+        self,
+        phase: str,
+        module: Optional[str],
+        action: str,
+        options: Any,
+        duration: Optional[float] = None,
+        bytes_written: int = 0,
+        files_touched: int = 0,
+    ) -> None:
+        """Construct action event."""
+        self.phase = phase
+        self.module = module
+        self.action = action
+        self.options = options
+        self.timestamp = time.time()
+        self.duration = duration
+        self.bytes_written = bytes_written
+        self.files_touched = files_touched
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return dictionary representation of action event."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return string representation of action event."""
+        return f'ActionEvent({self.as_dict()})'
+
+
+Hook = Callable[[ActionEvent], None]
+
+
+class HookRegistry:
+    """Registry of callables which are invoked with action events."""
+
+    def __init__(self) -> None:
+        """Construct empty hook registry."""
+        self._hooks: List[Hook] = []
+
+    def register(self, hook: Hook) -> None:
+        """
+        Register hook to be invoked with all future action events.
+
+        :param hook: Callable taking an ActionEvent as its only argument.
+        """
+        self._hooks.append(hook)
+
+    def unregister(self, hook: Hook) -> None:
+        """
+        Stop invoking hook with action events.
+
+        :param hook: Previously registered hook.
+        """
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            pass
+
+    def emit(self, event: ActionEvent) -> None:
+        """
+        Invoke all registered hooks with event.
+
+        Exceptions raised by hooks are logged and never propagated to the
+        action being executed.
+
+        :param event: ActionEvent to be passed to all hooks.
+        """
+        for hook in tuple(self._hooks):
+            try:
+                hook(event)
+            except Exception:
+                logger = logging.getLogger(__name__)
+                logger.exception(f'Action tracing hook {hook} failed.')
+
+    def __bool__(self) -> bool:
+        """Return True if any hooks are registered."""
+        return bool(self._hooks)
+
+
+# Application wide hook registry
+hooks = HookRegistry()
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+def traced(execute: F) -> F:
+    """
+    Decorate Action.execute method in order to emit action events.
+
+    The decorated method should increment `bytes_written` and `files_touched`
+    of the action object, which are reset before each execution.
+
+    :param execute: Action.execute method.
+    :return: Decorated method.
+    """
+    @functools.wraps(execute)
+    def wrapper(action, *args, **kwargs):
+        action.bytes_written = 0
+        action.files_touched = 0
+        if not hooks or action.null_object:
+            return execute(action, *args, **kwargs)
+
+        hooks.emit(ActionEvent(
+            phase='start',
+            module=action.module_name,
+            action=action.identifier,
+            options=action._options,
+        ))
+        start = time.perf_counter()
+        try:
+            return execute(action, *args, **kwargs)
+        finally:
+            hooks.emit(ActionEvent(
+                phase='end',
+                module=action.module_name,
+                action=action.identifier,
+                options=action._options,
+                duration=time.perf_counter() - start,
+                bytes_written=action.bytes_written,
+                files_touched=action.files_touched,
+            ))
+
+    return cast(F, wrapper)
+
+
+def traced_block(method: F) -> F:
+    """
+    Decorate ActionBlock method in order to emit action events.
+
+    The method name is used as the action type, prefixed with 'block:'.
+    Events are only emitted for action blocks containing actions of that
+    type, or any actions at all in the case of ActionBlock.execute.
+
+    :param method: ActionBlock method, for example ActionBlock.compile.
+    :return: Decorated method.
+    """
+    identifier = method.__name__
+    action_type = 'block:' + identifier
+
+    @functools.wraps(method)
+    def wrapper(action_block, *args, **kwargs):
+        options = action_block.action_block
+        if not hooks or not (
+            options if identifier == 'execute' else options.get(identifier)
+        ):
+            return method(action_block, *args, **kwargs)
+
+        hooks.emit(ActionEvent(
+            phase='start',
+            module=action_block.module_name,
+            action=action_type,
+            options=options,
+        ))
+        start = time.perf_counter()
+        try:
+            return method(action_block, *args, **kwargs)
+        finally:
+            hooks.emit(ActionEvent(
+                phase='end',
+                module=action_block.module_name,
+                action=action_type,
+                options=options,
+                duration=time.perf_counter() - start,
+            ))
+
+    return cast(F, wrapper)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Return percentile of values using the nearest-rank method.
+
+    :param values: Sorted list of values.
+    :param percent: Percentile between 0 and 100.
+    :return: Smallest value which is greater or equal to `percent` percent of
+        all values.
+    """
+    if not values:
+        return 0.0
+
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+# Number of recent durations per action type used for latency percentiles
+ACTION_METRICS_WINDOW = 1000
+
+
+class ActionMetrics:
+    """
+    Hook aggregating action execution statistics per action type.
+
+    Counts and totals cover all executions, while latency percentiles are
+    calculated from the most recent executions only, keeping memory usage
+    bounded in long running processes.
+
+    :param window: Number of recent durations kept per action type.
+    """
+
+    def __init__(self, window: int = ACTION_METRICS_WINDOW) -> None:
+        """Construct empty action metrics aggregator."""
+        self._lock = threading.Lock()
+        self.durations: DefaultDict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=window),
+        )
+        self.counts: DefaultDict[str, int] = defaultdict(int)
+        self.totals: DefaultDict[str, float] = defaultdict(float)
+        self.bytes_written: DefaultDict[str, int] = defaultdict(int)
+        self.files_touched: DefaultDict[str, int] = defaultdict(int)
+
+    def __call__(self, event: ActionEvent) -> None:
+        """Record action event."""
+        if event.phase != 'end':
+            return
+
+        with self._lock:
+            self.durations[event.action].append(event.duration or 0.0)
+            self.counts[event.action] += 1
+            self.totals[event.action] += event.duration or 0.0
+            self.bytes_written[event.action] += event.bytes_written
+            self.files_touched[event.action] += event.files_touched
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return statistics for each executed action type.
+
+        :return: Dictionary keyed by action type, with 'count', 'total',
+            'p50', and 'p95' latencies in seconds, in addition to
+            'bytes_written' and 'files_touched'. Percentiles only cover the
+            most recent executions.
+        """
+        summary = {}
+        with self._lock:
+            for action, durations in self.durations.items():
+                ordered = sorted(durations)
+                summary[action] = {
+                    'count': self.counts[action],
+                    'total': self.totals[action],
+                    'p50': percentile(ordered, 50),
+                    'p95': percentile(ordered, 95),
+                    'bytes_written': self.bytes_written[action],
+                    'files_touched': self.files_touched[action],
+                }
+
+        return summary
+
+
+class JSONLinesExporter:
+    """
+    Hook appending finished action events to a JSON lines file.
+
+    :param path: Path to file which events are appended to.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Construct JSON lines exporter."""
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ActionEvent) -> None:
+        """Append action event to file."""
+        if event.phase != 'end':
+            return
+
+        line = json.dumps(event.as_dict(), default=str) + '\n'
+        with self._lock, open(self.path, 'a') as jsonl_file:
+            jsonl_file.write(line)
@@ -1,18 +1,34 @@
 """General utility functions which are used across the application."""
 
+import errno
+import fcntl
+import hashlib
 import logging
+import os
+import pprint
 import re
 import shutil
 import subprocess
 from functools import partial
 from io import StringIO
 from pathlib import Path
-from typing import Any, Dict, List, TypeVar, Union
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    List,
+    NamedTuple,
+    TYPE_CHECKING,
+    TypeVar,
+    Union,
+)
 
 from yaml import dump, load  # noqa
 
-from astrality import compiler
-from astrality.context import Context
+from astrality.cache import compiled_yaml_cache
+
+if TYPE_CHECKING:
+    from astrality.context import Context  # noqa
 
 
 logger = logging.getLogger(__name__)
@@ -139,11 +155,12 @@ def resolve_targets(
             targets[content] = target
 
     else:
-        for file in content.glob('**/*'):
-            if file.is_dir():
-                continue
-            target_file = target / file.relative_to(content)
-            targets[file] = target_file
+        # os.walk uses directory entry types, avoiding one stat per file
+        for directory, _, filenames in os.walk(str(content)):
+            relative_directory = Path(directory).relative_to(content)
+            for filename in filenames:
+                targets[Path(directory, filename)] = \
+                    target / relative_directory / filename
 
     include_pattern = re.compile(include)
     filtered_targets: Dict[Path, Path] = {}
@@ -160,28 +177,101 @@ def resolve_targets(
     return filtered_targets
 
 
+class SymlinkPlan(NamedTuple):
+    """Symlinks partitioned by required work, see :func:`plan_symlinks`."""
+
+    # Symlinks to be created where nothing exists
+    create: Dict[Path, Path]
+
+    # Symlinks to be created where something else exists
+    replace: Dict[Path, Path]
+
+    # Symlinks which already point to the correct content
+    correct: Dict[Path, Path]
+
+
+def plan_symlinks(links: Dict[Path, Path]) -> SymlinkPlan:
+    """
+    Return plan for creating symlinks to content files.
+
+    Each symlink path is inspected with a single readlink system call in the
+    common case, only resolving paths when the existing link is not identical.
+
+    :param links: Dictionary with content keys and symlink path values.
+    :return: SymlinkPlan with content keys and symlink values.
+    """
+    plan = SymlinkPlan(create={}, replace={}, correct={})
+    for content, symlink in links.items():
+        try:
+            existing_link = os.readlink(symlink)
+        except FileNotFoundError:
+            plan.create[content] = symlink
+            continue
+        except OSError:
+            # Something which is not a symlink exists at the path, but it
+            # might still be the content itself through a symlinked directory.
+            if symlink == content \
+                    or os.path.realpath(symlink) == os.path.realpath(content):
+                plan.correct[content] = symlink
+            else:
+                plan.replace[content] = symlink
+            continue
+
+        if existing_link == str(content) \
+                or os.path.realpath(symlink) == os.path.realpath(content):
+            plan.correct[content] = symlink
+        else:
+            plan.replace[content] = symlink
+
+    return plan
+
+
 def compile_yaml(
     path: Path,
-    context: Context,
+    context: 'Context',
+    cache: bool = False,
 ) -> Dict:
     """
     Return datastructure from compiled YAML jinja2 template.
 
     :param path: YAML template file path.
     :param context: Jinja2 context.
+    :param cache: If True, results of templates which only depend on their
+        context are retrieved from, and stored in, the compiled configuration
+        cache.
     """
     if not path.is_file():  # pragma: no cover
         error_msg = f'Could not load config file "{path}".'
         logger.critical(error_msg)
         raise FileNotFoundError(error_msg)
 
+    key = None
+    if cache:
+        source = path.read_bytes()
+        key = compiled_yaml_cache().key(source=source, context=context)
+
+    if key:
+        try:
+            return compiled_yaml_cache().get(template=path, key=key)
+        except KeyError:
+            pass
+
+    # Jinja2 is only imported when templates actually need to be compiled
+    from astrality import compiler
+
     config_string = compiler.compile_template_to_string(
         template=path,
         context=context,
         shell_command_working_directory=path.parent,
     )
+    data = load(StringIO(config_string), Loader=Loader)
+
+    if key and compiler.is_deterministic(
+        source.decode('utf-8', errors='replace'),
+    ):
+        compiled_yaml_cache().set(template=path, key=key, data=data)
 
-    return load(StringIO(config_string), Loader=Loader)
+    return data
 
 
 def load_yaml(path: Path) -> Any:
@@ -221,6 +311,22 @@ def yaml_str(data: Any) -> str:
     )
 
 
+# ioctl request number for cloning file extents, see linux/fs.h
+FICLONE = 0x40049409
+
+# Errors indicating that a kernel copy method is unsupported for the file pair
+UNSUPPORTED_COPY_ERRNOS = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSUP,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EPERM,
+    errno.EXDEV,
+}
+
+
 def copy(
     source: Union[str, Path],
     destination: Union[str, Path],
@@ -229,15 +335,176 @@ def copy(
     """
     Copy source path content to destination path.
 
+    Regular files are copied within the kernel when possible, preferring
+    copy-on-write reflinks (FICLONE), then `os.copy_file_range`, and finally
+    `os.sendfile`, before falling back to ordinary buffered copying.
+    File metadata is copied as with `shutil.copy2`.
+
     :param source: Path to content to be copied.
     :param destination: New path for content.
     :param follow_symlinks: If True, symlinks are resolved before copying.
     """
-    shutil.copy2(
-        src=str(source),
-        dst=str(destination),
-        follow_symlinks=follow_symlinks,
-    )
+    source = Path(source)
+    destination = Path(destination)
+    if (not follow_symlinks and source.is_symlink()) or not source.is_file():
+        shutil.copy2(
+            src=str(source),
+            dst=str(destination),
+            follow_symlinks=follow_symlinks,
+        )
+        return
+
+    if destination.is_dir():
+        destination = destination / source.name
+
+    if destination.exists() and os.path.samefile(source, destination):
+        raise shutil.SameFileError(
+            f'"{source}" and "{destination}" are the same file',
+        )
+
+    with open(source, 'rb') as source_file, \
+            open(destination, 'wb') as destination_file:
+        _copy_file_content(
+            source_file=source_file,
+            destination_file=destination_file,
+        )
+
+    shutil.copystat(str(source), str(destination))
+
+
+def _copy_file_content(
+    source_file: BinaryIO,
+    destination_file: BinaryIO,
+) -> None:
+    """
+    Copy file content between two open file objects.
+
+    :param source_file: File opened for binary reading.
+    :param destination_file: Empty file opened for binary writing.
+    """
+    source_fd = source_file.fileno()
+    destination_fd = destination_file.fileno()
+
+    try:
+        fcntl.ioctl(destination_fd, FICLONE, source_fd)
+        return
+    except OSError as error:
+        if error.errno not in UNSUPPORTED_COPY_ERRNOS:
+            raise
+
+    size = os.fstat(source_fd).st_size
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range:
+        try:
+            _kernel_copy(
+                lambda offset: copy_file_range(
+                    source_fd,
+                    destination_fd,
+                    size - offset,
+                    offset,
+                    offset,
+                ),
+                size=size,
+            )
+            return
+        except OSError as error:
+            if error.errno not in UNSUPPORTED_COPY_ERRNOS:
+                raise
+            os.ftruncate(destination_fd, 0)
+
+    try:
+        _kernel_copy(
+            lambda offset: os.sendfile(
+                destination_fd,
+                source_fd,
+                offset,
+                size - offset,
+            ),
+            size=size,
+        )
+        return
+    except OSError as error:
+        if error.errno not in UNSUPPORTED_COPY_ERRNOS:
+            raise
+        os.ftruncate(destination_fd, 0)
+
+    os.lseek(source_fd, 0, os.SEEK_SET)
+    os.lseek(destination_fd, 0, os.SEEK_SET)
+    shutil.copyfileobj(source_file, destination_file)
+
+
+def _kernel_copy(copy_chunk, size: int) -> None:
+    """
+    Repeatedly invoke positional kernel copy function until size is reached.
+
+    :param copy_chunk: Callable taking the current offset and returning the
+        number of bytes copied.
+    :param size: Total number of bytes to be copied.
+    """
+    offset = 0
+    while offset < size:
+        copied = copy_chunk(offset)
+        if copied == 0:
+            break
+        offset += copied
+
+
+def identical_files(
+    source: Path,
+    destination: Path,
+    compare: str = 'metadata',
+) -> bool:
+    """
+    Return True if destination is considered identical to source.
+
+    :param source: Path to original file.
+    :param destination: Path to possible copy of source.
+    :param compare: Comparison method. 'metadata' compares size and
+        modification time, 'content' compares MD5 hashes of the file contents,
+        and 'none' never considers files identical.
+    :return: Boolean indicating if destination is identical to source.
+    """
+    if compare == 'none':
+        return False
+
+    if destination.is_symlink() or not destination.is_file():
+        return False
+
+    source_stat = source.stat()
+    destination_stat = destination.stat()
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+
+    if compare == 'metadata':
+        return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+    return file_hash(source) == file_hash(destination)
+
+
+def file_hash(path: Path) -> str:
+    """
+    Return MD5 hexdigest of file content.
+
+    :param path: Path to file to be hashed.
+    :return: MD5 hexdigest string.
+    """
+    md5 = hashlib.md5()
+    with open(path, 'rb') as file:
+        for chunk in iter(partial(file.read, 2 ** 16), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def fingerprint(data: Any) -> str:
+    """
+    Return MD5 hexdigest of data, identical across processes.
+
+    Dictionaries are ordered by key, such that insertion order is irrelevant.
+
+    :param data: Data structure consisting of builtin types.
+    :return: MD5 hexdigest string.
+    """
+    return hashlib.md5(pprint.pformat(data).encode('utf-8')).hexdigest()
 
 
 def move(
@@ -0,0 +1,300 @@
+"""
+Module for rendering templates ahead of event changes.
+
+Modules with `precompile_events: true` render the templates compiled by their
+on_event block for every event of their event listener in a background
+thread. When the event changes, the pre-rendered variant of each template is
+moved into place, instead of the template being rendered anew.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+from functools import partial
+from pathlib import Path
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+)
+
+from astrality import compiler
+from astrality.actions import CompileAction, ImportContextAction
+from astrality.context import Context, FileKey, imported_context_cache
+from astrality.xdg import XDG
+
+if TYPE_CHECKING:
+    from astrality.module import Module  # noqa
+
+# Identifier of variant: (event, template, target)
+VariantKey = Tuple[str, Path, Path]
+
+logger = logging.getLogger(__name__)
+
+
+class Variant(NamedTuple):
+    """Template rendered for a specific event."""
+
+    # Pre-rendered file
+    path: Path
+
+    # Path, modification time, and size of the template when rendered
+    file_key: FileKey
+
+    # Context keys used by the template, and the context it was rendered with
+    names: FrozenSet[str]
+    context: Context
+
+    # MD5 hexdigest of the rendered content
+    content_hash: str
+
+
+class Job(NamedTuple):
+    """Template to be rendered for a specific event."""
+
+    key: VariantKey
+    file_key: FileKey
+    names: FrozenSet[str]
+    context: Context
+    permissions: Optional[str]
+
+
+class EventVariants:
+    """
+    Templates of module on_event block, rendered for every event.
+
+    Only templates which render identically given identical context values
+    are pre-rendered, see :func:`astrality.compiler.is_deterministic`.
+    Variants are only used if neither the template nor the context values it
+    uses have been modified since it was rendered. Otherwise the template is
+    compiled as usual.
+
+    :param module: Module with event listener and on_event block.
+    """
+
+    def __init__(self, module: 'Module') -> None:
+        """Construct empty event variants object."""
+        self.module = module
+        self.directory = XDG().data(
+            resource='variants/' + hashlib.md5(
+                module.name.encode('utf-8'),
+            ).hexdigest(),
+            directory=True,
+        )
+        self.variants: Dict[VariantKey, Variant] = {}
+
+        # Incremented when rendering is restarted, stopping earlier renders
+        self.generation = 0
+        self.thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Render missing and outdated variants in a background thread.
+
+        Context is imported on the calling thread, as context imports are not
+        thread safe.
+        """
+        # Compile actions ask for pre-rendered variants before compiling
+        for compile_action in self.module.get_action_block(
+            name='on_event',
+        )._compile_actions:
+            compile_action.prerendered = self.swap
+
+        jobs = self.jobs()
+        with self._lock:
+            self.generation += 1
+            generation = self.generation
+
+        if not jobs:
+            return
+
+        self.thread = threading.Thread(
+            target=self.render,
+            args=(jobs, generation),
+            name=f'astrality-variants-{self.module.name}',
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop rendering variants after the template being rendered."""
+        with self._lock:
+            self.generation += 1
+
+    def jobs(self) -> List[Job]:
+        """
+        Return templates to be rendered for events other than the current.
+
+        :return: List of jobs for variants which are missing or outdated.
+        """
+        action_block = self.module.get_action_block(name='on_event')
+        current_event = self.module.event_listener.event()
+        creation_store = action_block._creation_store
+
+        jobs: List[Job] = []
+        for event in self.module.event_listener.events:
+            if event == current_event:
+                continue
+
+            replacer = partial(self.module.interpolate_string, event=event)
+            context = self.module.context_store.copy()
+            for options in action_block.action_options('import_context'):
+                ImportContextAction(
+                    options=options,
+                    directory=self.module.directory,
+                    replacer=replacer,
+                    context_store=context,
+                    creation_store=creation_store,
+                ).execute()
+
+            for options in action_block.action_options('compile'):
+                compile_action = CompileAction(
+                    options=copy.copy(options),
+                    directory=self.module.directory,
+                    replacer=replacer,
+                    context_store=context,
+                    creation_store=creation_store,
+                )
+                permissions = compile_action.option(key='permissions')
+                for template, target \
+                        in compile_action.compile_pairs().items():
+                    stat = template.stat()
+                    file_key = (str(template), stat.st_mtime_ns, stat.st_size)
+                    names = imported_context_cache().referenced_names(
+                        path=template,
+                        file_key=file_key,
+                    )
+                    if names is None:
+                        # Template might not render identically later on
+                        continue
+
+                    key = (event, template, target)
+                    variant = self.variants.get(key)
+                    if variant and self.valid(
+                        variant=variant,
+                        file_key=file_key,
+                        context=context,
+                    ):
+                        continue
+
+                    jobs.append(Job(
+                        key=key,
+                        file_key=file_key,
+                        names=names,
+                        context=context,
+                        permissions=permissions,
+                    ))
+
+        return jobs
+
+    def render(self, jobs: List[Job], generation: int) -> None:
+        """
+        Render variants, unless rendering is restarted in the mean time.
+
+        :param jobs: Jobs returned by :meth:`jobs`.
+        :param generation: Value of :attr:`generation` when started.
+        """
+        for job in jobs:
+            if generation != self.generation:
+                return
+
+            event, template, target = job.key
+            path = self.directory / (
+                hashlib.md5(
+                    f'{event}:{target}'.encode('utf-8'),
+                ).hexdigest()[:12] + '-' + target.name
+            )
+            rendering = path.with_name(f'.{path.name}.{generation}')
+            try:
+                content_hash = compiler.compile_template(
+                    template=template,
+                    target=rendering,
+                    context=job.context,
+                    shell_command_working_directory=self.module.directory,
+                    permissions=job.permissions,
+                    checksum=True,
+                )
+            except Exception:
+                logger.exception(
+                    f'[module/{self.module.name}] Could not render '
+                    f'"{template}" for event "{event}".',
+                )
+                continue
+
+            with self._lock:
+                if generation != self.generation:
+                    rendering.unlink()
+                    return
+
+                os.replace(str(rendering), str(path))
+                self.variants[job.key] = Variant(
+                    path=path,
+                    file_key=job.file_key,
+                    names=job.names,
+                    context=job.context,
+                    content_hash=content_hash or '',
+                )
+
+    def swap(self, template: Path, target: Path) -> Optional[str]:
+        """
+        Move variant for the current event into place, if up to date.
+
+        :param template: Path to template to be compiled.
+        :param target: Path to compilation target.
+        :return: MD5 hexdigest of moved content, or None if the template must
+            be compiled.
+        """
+        event = self.module.event_listener.event()
+        with self._lock:
+            variant = self.variants.pop((event, template, target), None)
+            if not variant:
+                return None
+
+            stat = template.stat()
+            if not self.valid(
+                variant=variant,
+                file_key=(str(template), stat.st_mtime_ns, stat.st_size),
+                context=self.module.context_store,
+            ):
+                return None
+
+            if target.is_symlink():
+                target = target.resolve()
+
+            try:
+                os.makedirs(target.parent, exist_ok=True)
+                os.replace(str(variant.path), str(target))
+            except OSError as error:
+                logger.debug(f'Could not move "{variant.path}": {error}')
+                return None
+
+        logger.info(
+            f'[Compiling] Template: "{template}" -> Target: "{target}" '
+            f'(pre-rendered for event "{event}")',
+        )
+        return variant.content_hash
+
+    @staticmethod
+    def valid(variant: Variant, file_key: FileKey, context: Context) -> bool:
+        """
+        Return True if variant renders identically to template with context.
+
+        :param variant: Rendered variant.
+        :param file_key: Path, modification time, and size of template.
+        :param context: Context the template would be rendered with.
+        """
+        if file_key != variant.file_key:
+            return False
+
+        return not any(
+            path[0] in variant.names
+            for path
+            in context.changed_paths(variant.context)
+        )